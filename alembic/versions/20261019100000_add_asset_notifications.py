@@ -0,0 +1,40 @@
+"""add asset notifications
+
+Revision ID: 59e14cf7c66e
+Revises: 44894dd8afab
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "59e14cf7c66e"
+down_revision = "44894dd8afab"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Notify listeners about any change in the asset table
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_asset_changed() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('asset_changed', TG_OP);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER asset_changed
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "Asset"
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_asset_changed();
+        """
+    )
+
+
+def downgrade():
+    op.execute('DROP TRIGGER IF EXISTS asset_changed ON "Asset";')
+    op.execute("DROP FUNCTION IF EXISTS notify_asset_changed();")
@@ -0,0 +1,40 @@
+"""add asset tracking
+
+Revision ID: 618ed1cd8d64
+Revises: 59e14cf7c66e
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+import sqlalchemy as sa  # type: ignore
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "618ed1cd8d64"
+down_revision = "59e14cf7c66e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "Asset",
+        sa.Column(
+            "tracked",
+            sa.BOOLEAN(),
+            server_default=sa.true(),
+            nullable=False,
+            comment="Points of the asset are received and stored.",
+        ),
+    )
+    op.create_unique_constraint("uq_Asset_symbol", "Asset", ["symbol"])
+
+    # Default assets were inserted with explicit ids, so the sequence has to catch up
+    op.execute(
+        """SELECT setval(pg_get_serial_sequence('"Asset"', 'id'), (SELECT MAX(id) FROM "Asset"));"""
+    )
+
+
+def downgrade():
+    op.drop_constraint("uq_Asset_symbol", "Asset", type_="unique")
+    op.drop_column("Asset", "tracked")
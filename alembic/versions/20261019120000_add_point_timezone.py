@@ -0,0 +1,40 @@
+"""add point timezone
+
+Revision ID: 3c5a7e91b2d4
+Revises: 618ed1cd8d64
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+import sqlalchemy as sa  # type: ignore
+from sqlalchemy.dialects.postgresql import TIMESTAMP  # type: ignore
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3c5a7e91b2d4"
+down_revision = "618ed1cd8d64"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Points were stored as naive UTC timestamps
+    op.alter_column(
+        "Point",
+        "ts",
+        type_=TIMESTAMP(timezone=True, precision=3),
+        existing_nullable=False,
+        existing_comment="Point timestamp.",
+        postgresql_using="ts AT TIME ZONE 'UTC'",
+    )
+
+
+def downgrade():
+    op.alter_column(
+        "Point",
+        "ts",
+        type_=sa.TIMESTAMP(),
+        existing_nullable=False,
+        existing_comment="Point timestamp.",
+        postgresql_using="ts AT TIME ZONE 'UTC'",
+    )
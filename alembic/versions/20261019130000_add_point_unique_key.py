@@ -0,0 +1,28 @@
+"""add point unique key
+
+Revision ID: 8b4d2e6f1a37
+Revises: 3c5a7e91b2d4
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8b4d2e6f1a37"
+down_revision = "3c5a7e91b2d4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Retried ticks could store a point twice, the first one is kept
+    op.execute(
+        """DELETE FROM "Point" AS duplicate USING "Point" AS original"""
+        """ WHERE duplicate.asset_id = original.asset_id"""
+        """ AND duplicate.ts = original.ts AND duplicate.id > original.id;"""
+    )
+    op.create_unique_constraint("uq_Point_asset_id_ts", "Point", ["asset_id", "ts"])
+
+
+def downgrade():
+    op.drop_constraint("uq_Point_asset_id_ts", "Point", type_="unique")
@@ -0,0 +1,37 @@
+"""add point archive
+
+Revision ID: d05e9c3b7f42
+Revises: 8b4d2e6f1a37
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+import sqlalchemy as sa  # type: ignore
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d05e9c3b7f42"
+down_revision = "8b4d2e6f1a37"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "PointArchive",
+        sa.Column("asset_id", sa.INTEGER(), nullable=False, comment="Asset ID."),
+        sa.Column("day", sa.DATE(), nullable=False, comment="UTC day of the points."),
+        sa.Column("count", sa.INTEGER(), nullable=False, comment="Number of points."),
+        sa.Column(
+            "data",
+            sa.LargeBinary(),
+            nullable=False,
+            comment="Points as a deflate-compressed binary history frame.",
+        ),
+        sa.ForeignKeyConstraint(["asset_id"], ["Asset.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("asset_id", "day"),
+    )
+
+
+def downgrade():
+    op.drop_table("PointArchive")
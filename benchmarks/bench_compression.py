@@ -0,0 +1,106 @@
+"""
+CPU/bandwidth trade-off of permessage-deflate parameters.
+
+Frames are compressed with zlib the way permessage-deflate does on the server side,
+so the numbers help to choose `WS_ASSETS_COMPRESSION_*` settings.
+
+Run with `python -m benchmarks.bench_compression`.
+"""
+import zlib
+from typing import List
+
+import orjson
+
+from benchmarks.common import get_history, measure, print_table
+
+LEVELS: List[int] = [1, 6, 9]
+WINDOW_BITS: List[int] = [9, 12, 15]
+CLIENTS: int = 1000
+
+
+def compress(compressor, payload: bytes) -> bytes:
+    """Compress a single message with a permessage-deflate stream."""
+
+    return compressor.compress(payload) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+def bench_history():
+    """Compression of a single 30-minute history frame."""
+
+    history: List[dict] = get_history()
+    payload: bytes = orjson.dumps(
+        {"action": "asset_history", "message": {"points": history}}
+    )
+
+    rows: List[list] = [["none", "-", len(payload), 1.0, 0.0]]
+
+    for level in LEVELS:
+        for window_bits in WINDOW_BITS:
+
+            def compress_history():
+                return compress(
+                    zlib.compressobj(level, zlib.DEFLATED, -window_bits), payload
+                )
+
+            size: int = len(compress_history())
+            rows.append(
+                [
+                    f"level={level}",
+                    window_bits,
+                    size,
+                    len(payload) / size,
+                    measure(compress_history, repeat=50),
+                ]
+            )
+
+    print(f"History frame, {len(history)} points")
+    print_table(["mode", "window bits", "bytes", "ratio", "us/frame"], rows)
+
+
+def bench_points():
+    """Broadcast of a single point frame to many clients."""
+
+    payload: bytes = orjson.dumps(
+        {"action": "point", "message": get_history(size=1)[0]}
+    )
+
+    rows: List[list] = [["none", len(payload), 0.0]]
+
+    for context_takeover in (True, False):
+        compressors: list = [
+            zlib.compressobj(6, zlib.DEFLATED, -15) for _ in range(CLIENTS)
+        ]
+
+        # Warm up context takeover streams, so they reflect a steady state
+        for compressor in compressors:
+            compress(compressor, payload)
+
+        sizes: List[int] = []
+
+        def broadcast():
+            sizes.clear()
+
+            for index, compressor in enumerate(compressors):
+                if not context_takeover:
+                    compressor = compressors[index] = zlib.compressobj(
+                        6, zlib.DEFLATED, -15
+                    )
+
+                sizes.append(len(compress(compressor, payload)))
+
+        duration: float = measure(broadcast, repeat=20)
+        rows.append(
+            [
+                "context takeover" if context_takeover else "no context takeover",
+                sum(sizes) // CLIENTS,
+                duration,
+            ]
+        )
+
+    print(f"Point frame broadcast to {CLIENTS} clients")
+    print_table(["mode", "bytes/client", "us/broadcast"], rows)
+
+
+if __name__ == "__main__":
+    bench_history()
+    bench_points()
@@ -0,0 +1,58 @@
+"""
+Size and encoding time of a history frame in full, delta and binary encodings.
+
+Run with `python -m benchmarks.bench_history_codec`.
+"""
+import zlib
+from typing import List
+
+from benchmarks.common import get_history, measure, print_table
+from ws_assets.models.asset import AssetPointRecord
+from ws_assets.tools.history_codec import encode_history_frame
+
+HISTORY_SIZES: List[int] = [30 * 60, 24 * 60 * 60]
+
+
+def deflate(payload: bytes) -> bytes:
+    """Compress a payload the way permessage-deflate does with default parameters."""
+
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+
+    return compressor.compress(payload) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+def bench_history_codec():
+    rows: List[list] = []
+
+    for size in HISTORY_SIZES:
+        history: List[AssetPointRecord] = [
+            AssetPointRecord(**point) for point in get_history(size=size)
+        ]
+        full_size: int = 0
+
+        for encoding in ("full", "delta", "binary"):
+
+            def encode():
+                return encode_history_frame(1, "EURUSD", history, encoding)
+
+            frame = encode()
+            full_size = full_size or len(frame.payload)
+
+            rows.append(
+                [
+                    size,
+                    encoding,
+                    len(frame.payload),
+                    len(deflate(frame.payload)),
+                    full_size / len(frame.payload),
+                    measure(encode, repeat=20),
+                ]
+            )
+
+    print_table(
+        ["points", "encoding", "bytes", "deflate bytes", "ratio", "us/frame"], rows
+    )
+
+
+if __name__ == "__main__":
+    bench_history_codec()
@@ -0,0 +1,154 @@
+"""
+Per-tick CPU and per-client memory of pydantic models and their lean counterparts.
+
+Run with `python -m benchmarks.bench_hot_path`.
+"""
+import tracemalloc
+from datetime import timedelta
+from typing import Any, Callable, List, Optional
+from uuid import UUID, uuid4
+
+import orjson
+from pydantic import Field
+from starlette.websockets import WebSocket
+
+from benchmarks.common import get_history, measure, print_table
+from ws_assets.models.asset import AssetPoint, AssetPointRecord
+from ws_assets.models.base import BaseClass
+from ws_assets.models.client import WebsocketClient
+from ws_assets.models.response import ResponseSubscribeHistory, ResponseSubscribePoint
+from ws_assets.tools.clock import EPOCH, to_epoch_milliseconds
+
+CLIENTS: int = 10000
+
+
+class PydanticWebsocketClient(BaseClass):
+    """`WebsocketClient` as it was before it became a slotted class."""
+
+    client_id: UUID = Field(default_factory=uuid4)
+    websocket: Any = Field()
+    is_subscribed: bool = Field(False)
+    asset_id: Optional[int] = Field()
+    compressor: Optional[Any] = Field()
+    batch: bool = Field(False)
+
+
+def get_rows(size: int) -> List[dict]:
+    """Rows as they are returned from the database."""
+
+    return [
+        {
+            "assetName": point["assetName"],
+            "time": EPOCH + timedelta(milliseconds=point["time"]),
+            "assetId": point["assetId"],
+            "value": point["value"],
+        }
+        for point in get_history(size=size)
+    ]
+
+
+def bench_tick():
+    """Creation and encoding of points of a single tick and a history frame."""
+
+    tick: List[dict] = get_rows(size=50)
+    history: List[dict] = get_rows(size=30 * 60)
+
+    def tick_pydantic():
+        for row in tick:
+            orjson.dumps(ResponseSubscribePoint(message=AssetPoint(**row)).dict())
+
+    def tick_record():
+        for row in tick:
+            orjson.dumps(
+                {
+                    "action": "point",
+                    "message": AssetPointRecord(
+                        row["assetName"],
+                        to_epoch_milliseconds(row["time"]),
+                        row["assetId"],
+                        row["value"],
+                    ),
+                }
+            )
+
+    def history_pydantic():
+        orjson.dumps(
+            ResponseSubscribeHistory(
+                message={"points": [AssetPoint(**row) for row in history]}
+            ).dict()
+        )
+
+    def history_record():
+        orjson.dumps(
+            {
+                "action": "asset_history",
+                "message": {
+                    "points": [
+                        AssetPointRecord(
+                            row["assetName"],
+                            to_epoch_milliseconds(row["time"]),
+                            row["assetId"],
+                            row["value"],
+                        )
+                        for row in history
+                    ]
+                },
+            }
+        )
+
+    rows: List[list] = [
+        [
+            f"tick, {len(tick)} points",
+            measure(tick_pydantic, repeat=200),
+            measure(tick_record, repeat=200),
+        ],
+        [
+            f"history, {len(history)} points",
+            measure(history_pydantic, repeat=20),
+            measure(history_record, repeat=20),
+        ],
+    ]
+
+    print("CPU")
+    print_table(["workload", "pydantic, us", "record, us"], rows)
+
+
+def allocated(factory: Callable) -> float:
+    """Return memory allocated per object created by `factory` in bytes."""
+
+    tracemalloc.start()
+    objects: list = [factory() for _ in range(CLIENTS)]
+    size: int = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    del objects
+
+    return size / CLIENTS
+
+
+def bench_client_memory():
+    """Memory used by a websocket client object."""
+
+    async def receive():
+        ...
+
+    async def send(message):
+        ...
+
+    websocket = WebSocket({"type": "websocket"}, receive=receive, send=send)
+
+    rows: List[list] = [
+        [
+            "websocket client",
+            allocated(lambda: PydanticWebsocketClient(websocket=websocket)),
+            allocated(lambda: WebsocketClient(websocket=websocket)),
+        ]
+    ]
+
+    print("Memory")
+    print_table(["object", "pydantic, bytes", "slotted, bytes"], rows)
+
+
+if __name__ == "__main__":
+    bench_tick()
+    bench_client_memory()
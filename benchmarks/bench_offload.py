@@ -0,0 +1,62 @@
+"""
+Event loop lag caused by encoding a long history inline and in a worker pool.
+
+Run with `python -m benchmarks.bench_offload`.
+"""
+import asyncio
+from typing import List
+
+from benchmarks.common import get_history, print_table
+from ws_assets.tools.frames import encode_frame
+from ws_assets.tools.loop_monitor import LoopLagMonitor
+from ws_assets.tools.offload import Offloader
+
+HISTORY_SIZES: List[int] = [30 * 60, 24 * 60 * 60]
+
+
+async def measure_lag(offloader: Offloader, history: List[dict]) -> float:
+    """Return the longest loop lag in milliseconds while a history frame is encoded."""
+
+    loop_monitor = LoopLagMonitor(interval=0.001, warning_lag=0)
+    task = asyncio.create_task(loop_monitor.start_sampling())
+
+    await asyncio.sleep(0.01)
+
+    for _ in range(5):
+        await offloader.run(
+            encode_frame,
+            {"action": "asset_history", "message": {"points": history}},
+            size=len(history) * 80,
+        )
+        await asyncio.sleep(0.01)
+
+    task.cancel()
+
+    return loop_monitor.max * 1e3
+
+
+async def bench_offload():
+    rows: List[list] = []
+
+    for size in HISTORY_SIZES:
+        history: List[dict] = get_history(size=size)
+        row: list = [size]
+
+        for offloader in (
+            Offloader(min_size=2**62),
+            Offloader(kind="thread", min_size=0),
+            Offloader(kind="process", min_size=0),
+        ):
+            row.append(await measure_lag(offloader=offloader, history=history))
+            offloader.close()
+
+        rows.append(row)
+
+    print_table(
+        ["points", "inline (ms)", "thread (ms)", "process (ms)"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(bench_offload())
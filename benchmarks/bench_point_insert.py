@@ -0,0 +1,120 @@
+"""
+Throughput of a backfill: multi-row INSERT and INSERT with upsert per tick, and binary COPY with upsert.
+
+Needs a migrated database from `WS_ASSETS_POSTGRESQL_DSN`, e.g. the one from `make up`.
+Written points are deleted afterwards.
+
+Run with `python -m benchmarks.bench_point_insert`.
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+import sqlalchemy as sa  # type: ignore
+
+from benchmarks.common import print_table
+from ws_assets.database.tables import Tables
+from ws_assets.settings import Settings
+from ws_assets.tools.asset_processor import AssetProcessor
+from ws_assets.tools.db_client import DBClient
+
+# Number of ticks in a backfill
+TICKS: List[int] = [100, 1000]
+
+# Far from real points, so they can be deleted afterwards
+START: datetime = datetime(2100, 1, 1, tzinfo=timezone.utc)
+
+
+def get_ticks(asset_ids: List[int], ticks: int, offset: int) -> List[List[dict]]:
+    """Points of every tick in the database format."""
+
+    return [
+        [
+            {
+                "asset_id": asset_id,
+                "value": 1.0 + tick * 1e-5,
+                "ts": START + timedelta(seconds=offset + tick),
+            }
+            for asset_id in asset_ids
+        ]
+        for tick in range(ticks)
+    ]
+
+
+async def bench_point_insert():
+    """Backfill with a statement per tick, as before, and in COPY batches."""
+
+    settings = Settings()
+
+    async with DBClient(dsn=settings.POSTGRESQL_DSN, pool_size=1) as db_client:
+        asset_ids: List[int] = [
+            row["id"]
+            for row in await db_client.fetchall(sa.select([Tables.asset.c.id]))
+        ]
+
+        # Writes every batch with COPY and with an INSERT
+        copy_processor, insert_processor = (
+            AssetProcessor(
+                dsn=settings.ASSETS_DSN,
+                http_client=None,  # type: ignore
+                db_client=db_client,
+                subscription_handler=None,  # type: ignore
+                copy_min_rows=copy_min_rows,
+            )
+            for copy_min_rows in (1, 0)
+        )
+
+        rows: List[list] = []
+        offset: int = 0
+
+        for ticks in TICKS:
+            row: list = [len(asset_ids), ticks]
+
+            for method in ("insert", "upsert", "copy"):
+                points: List[List[dict]] = get_ticks(
+                    asset_ids=asset_ids, ticks=ticks, offset=offset
+                )
+                offset += ticks
+
+                time_begin: float = time.perf_counter()
+
+                if method == "copy":
+                    await copy_processor.store_points(
+                        values=[value for values in points for value in values]
+                    )
+                elif method == "upsert":
+                    for values in points:
+                        await insert_processor.store_points(values=values)
+                else:
+                    for values in points:
+                        await db_client.fetchall(Tables.point.insert().values(values))
+
+                row.append(len(asset_ids) * ticks / (time.perf_counter() - time_begin))
+
+            # Repeated backfill only replaces points
+            time_begin = time.perf_counter()
+            await copy_processor.store_points(
+                values=[
+                    value
+                    for values in get_ticks(asset_ids, ticks, offset - ticks)
+                    for value in values
+                ]
+            )
+            row.append(len(asset_ids) * ticks / (time.perf_counter() - time_begin))
+
+            rows.append(row)
+
+        await db_client.fetchall(
+            sa.delete(Tables.point).where(Tables.point.c.ts >= START)
+        )
+
+    print("Rows per second")
+    print_table(
+        ["assets", "ticks", "insert", "upsert", "copy", "copy again"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(bench_point_insert())
@@ -0,0 +1,108 @@
+"""
+Tick throughput and per-stage time of the tick pipeline fed from a tick journal.
+
+Ticks are replayed without delays through `AssetProcessor` with in-memory history,
+quote cache and indicators. The database is mocked, so database time is not included.
+
+A journal recorded by a pod with `WS_ASSETS_TICK_JOURNAL_PATH` gives realistic load.
+Without one, a journal of random walks is generated with a fixed seed.
+
+Run with `python -m benchmarks.bench_replay [journal]`.
+"""
+import asyncio
+import sys
+import tempfile
+import time
+from typing import List
+
+import numpy as np
+
+from benchmarks.common import START_TIME, print_table
+from ws_assets.models.asset import Asset, AssetPointRecord
+from ws_assets.tools.asset_processor import AssetProcessor
+from ws_assets.tools.asset_registry import AssetRegistry, AssetSnapshot
+from ws_assets.tools.history_buffer import HistoryBuffers
+from ws_assets.tools.indicators import IndicatorEngine
+from ws_assets.tools.mocks.mock_db_client import MockDBClient
+from ws_assets.tools.tick_journal import TickJournal
+from ws_assets.tools.tick_replayer import TickReplayer
+from ws_assets.tools.tick_spans import TickSpans
+
+# Generated journal: assets quoted every tick and ticks a second apart
+ASSETS: int = 200
+TICKS: int = 3600
+
+
+def write_journal(path: str):
+    """Write random walks of `ASSETS` assets for `TICKS` ticks."""
+
+    random = np.random.default_rng(0)
+    mids: np.ndarray = np.cumsum(
+        random.normal(0, 0.00005, size=(TICKS, ASSETS)), axis=0
+    ) + random.uniform(0.5, 150, size=ASSETS)
+    asset_ids: np.ndarray = np.arange(1, ASSETS + 1)
+
+    with TickJournal(path=path) as journal:
+        for tick in range(TICKS):
+            journal.append(
+                asset_ids=asset_ids,
+                time=START_TIME + tick * 1000,
+                bids=mids[tick] - 0.0001,
+                asks=mids[tick] + 0.0001,
+            )
+
+
+async def discard(asset_points: List[AssetPointRecord]):
+    """Clients are not connected."""
+
+
+async def bench_replay(path: str):
+    """Replay every tick of a journal."""
+
+    with TickJournal(path=path) as journal:
+        asset_ids: List[int] = np.unique(journal.read()["asset_id"]).tolist()
+
+        asset_registry = AssetRegistry(db_client=MockDBClient())  # type: ignore
+        asset_registry.swap(
+            AssetSnapshot(
+                [Asset(id=asset_id, name=f"ASSET{asset_id}") for asset_id in asset_ids]
+            )
+        )
+
+        tick_spans = TickSpans()
+        asset_processor = AssetProcessor(
+            dsn=None,  # type: ignore
+            http_client=None,  # type: ignore
+            db_client=MockDBClient(),  # type: ignore
+            subscription_handler=discard,
+            asset_registry=asset_registry,
+            history_buffers=HistoryBuffers(window=30 * 60),
+            indicator_engine=IndicatorEngine(windows=[20, 60]),
+            indicator_handler=discard,  # type: ignore
+            tick_spans=tick_spans,
+        )
+
+        time_begin: float = time.perf_counter()
+        ticks: int = await TickReplayer(
+            journal=journal, asset_processor=asset_processor, speed=0
+        ).replay()
+        duration: float = time.perf_counter() - time_begin
+
+    print(f"{len(asset_ids)} assets, {ticks} ticks, {ticks / duration:.1f} ticks/s")
+    print()
+    print_table(
+        ["stage", "mean, us", "max, us"],
+        [
+            [stage, statistics.total / statistics.count * 1e6, statistics.max * 1e6]
+            for stage, statistics in tick_spans.stages.items()
+        ],
+    )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        asyncio.run(bench_replay(path=sys.argv[1]))
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            write_journal(path=f"{directory}/ticks.bin")
+            asyncio.run(bench_replay(path=f"{directory}/ticks.bin"))
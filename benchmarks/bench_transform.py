@@ -0,0 +1,76 @@
+"""
+Per-tick CPU of the rate transform for feeds of different sizes.
+
+Run with `python -m benchmarks.bench_transform`.
+"""
+import random
+from typing import List
+
+from benchmarks.common import measure, print_table
+from ws_assets.models.asset import Asset
+from ws_assets.tools.asset_registry import AssetSnapshot
+from ws_assets.tools.quote_transformer import QuoteTransformer
+
+FEED_SIZES: List[int] = [100, 1000, 10000]
+
+
+def get_rates(size: int) -> List[dict]:
+    """Rates as they are parsed from the asset endpoint."""
+
+    random.seed(size)
+
+    rates: List[dict] = []
+
+    for i in range(size):
+        bid: float = round(random.uniform(0.5, 2), 5)
+        rates.append(
+            {
+                "Symbol": f"SYM{i}",
+                "Bid": str(bid),
+                "Ask": str(round(bid + 0.0002, 5)),
+                "Spread": "2.00",
+                "ProductType": "1",
+            }
+        )
+
+    return rates
+
+
+def bench_transform():
+    """Transform of a feed where half of the instruments are tracked."""
+
+    rows: List[list] = []
+
+    for size in FEED_SIZES:
+        rates: List[dict] = get_rates(size)
+        assets = AssetSnapshot([Asset(id=i, name=f"SYM{i}") for i in range(0, size, 2)])
+
+        def transform_rows():
+            return [
+                {
+                    "asset_id": assets.name_to_id[rate["Symbol"]],
+                    "value": (float(rate["Bid"]) + float(rate["Ask"])) / 2,
+                }
+                for rate in rates
+                if rate["Symbol"] in assets.name_to_id
+            ]
+
+        quote_transformer = QuoteTransformer()
+
+        def transform_batch():
+            return quote_transformer.transform(rates=rates, assets=assets)
+
+        rows.append(
+            [
+                size,
+                measure(transform_rows, repeat=50),
+                measure(transform_batch, repeat=50),
+            ]
+        )
+
+    print("Transform of a single tick, half of the feed is tracked")
+    print_table(["feed size", "per-row, us", "batch, us"], rows)
+
+
+if __name__ == "__main__":
+    bench_transform()
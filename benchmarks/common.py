@@ -0,0 +1,57 @@
+import random
+import time
+from typing import Callable, List
+
+# Start of the generated history in epoch milliseconds
+START_TIME: int = 1647092464000
+
+
+def get_history(
+    asset_id: int = 1, asset_name: str = "EURUSD", size: int = 30 * 60
+) -> List[dict]:
+    """Generate a history of an asset with a point every second."""
+
+    random.seed(asset_id)
+
+    value: float = 1.09
+    points: List[dict] = []
+
+    for i in range(size):
+        value += random.gauss(0, 0.00005)
+        points.append(
+            {
+                "assetName": asset_name,
+                "time": START_TIME + i * 1000,
+                "assetId": asset_id,
+                "value": round(value, 6),
+            }
+        )
+
+    return points
+
+
+def measure(func: Callable, repeat: int) -> float:
+    """Return mean execution time of `func` in microseconds."""
+
+    time_begin: float = time.perf_counter()
+
+    for _ in range(repeat):
+        func()
+
+    return (time.perf_counter() - time_begin) / repeat * 1e6
+
+
+def print_table(header: List[str], rows: List[list]):
+    """Print results as a markdown table."""
+
+    print("| " + " | ".join(header) + " |")
+    print("|" + "|".join("---" for _ in header) + "|")
+
+    for row in rows:
+        print(
+            "| "
+            + " | ".join(f"{v:.1f}" if isinstance(v, float) else str(v) for v in row)
+            + " |"
+        )
+
+    print()
@@ -1,14 +1,16 @@
 import asyncio
 import random
-from datetime import datetime
-from typing import AsyncGenerator, List
+from datetime import datetime, timezone
+from typing import AsyncGenerator, Dict, List
 
 from fastapi import FastAPI
 from pytest_asyncio import fixture
 from starlette.testclient import TestClient
 
 from ws_assets.main import create_app
+from ws_assets.models.asset import Asset
 from ws_assets.tools.asset_processor import AssetProcessor
+from ws_assets.tools.asset_registry import AssetSnapshot
 from ws_assets.tools.mocks.mock_asset_processor import MockAssetProcessor
 from ws_assets.tools.mocks.mock_db_client import MockDBClient
 
@@ -24,13 +26,13 @@ def get_fetchall_asset_points() -> List[dict]:
     return [
         {
             "assetName": "EURUSD",
-            "time": datetime.utcnow(),
+            "time": datetime.now(timezone.utc),
             "assetId": 1,
             "value": random.random(),
         },
         {
             "assetName": "EURUSD",
-            "time": datetime.utcnow(),
+            "time": datetime.now(timezone.utc),
             "assetId": 1,
             "value": random.random(),
         },
@@ -40,7 +42,7 @@ def get_fetchall_asset_points() -> List[dict]:
 def get_fetchall_asset_points_without_asset_name() -> List[dict]:
     return [
         {
-            "time": datetime.utcnow(),
+            "time": datetime.now(timezone.utc),
             "assetId": 1,
             "value": random.random(),
         }
@@ -51,6 +53,12 @@ def get_response_text() -> str:
     return """null({"Rates":[{"Symbol":"EURUSD","Bid":"1.09107","Ask":"1.0913","Spread":"2.30","ProductType":"1",},{"Symbol":"COIN.us","Bid":"160.15","Ask":"160.27","Spread":"12.00","ProductType":"8",},{"Symbol":"USOil","Bid":"109.14","Ask":"109.18","Spread":"4.00","ProductType":"3",},{"Symbol":"FVRR.us","Bid":"63.29","Ask":"63.42","Spread":"13.00","ProductType":"8",},{"Symbol":"AUDCAD","Bid":"0.92935","Ask":"0.9302","Spread":"8.50","ProductType":"1",},{"Symbol":"US.ECOMM","Bid":"1806.63","Ask":"1808.02","Spread":"1.39","ProductType":"8",},{"Symbol":"TRAVEL","Bid":"3240.76","Ask":"3249.16","Spread":"8.40","ProductType":"8",}]}); """
 
 
+def set_assets(asset_processor: AssetProcessor, assets: Dict[int, str]):
+    asset_processor.asset_registry.swap(
+        AssetSnapshot([Asset(id=id, name=name) for id, name in assets.items()])
+    )
+
+
 def get_mock_db_client(return_fetchall: List[dict] = None) -> MockDBClient:
     return MockDBClient(return_fetchall=return_fetchall)
 
@@ -83,8 +91,12 @@ async def client() -> AsyncGenerator:
 
     app.state.DBClient = get_mock_db_client()
 
+    # Startup isn't run by the test client
+    app.state.Readiness.set_ready()
+
     app.state.AssetProcessor = MockAssetProcessor(
-        subscription_handler=app.state.WebsocketManager.broadcast_asset_points
+        subscription_handler=app.state.WebsocketManager.broadcast_asset_points,
+        indicator_handler=app.state.WebsocketManager.broadcast_indicators,
     )
     task = asyncio.create_task(app.state.AssetProcessor.start_receiving_asset_points())
 
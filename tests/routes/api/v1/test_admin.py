@@ -0,0 +1,101 @@
+from fastapi.testclient import TestClient
+
+from tests.conftest import get_fetchall_assets, get_mock_db_client
+from ws_assets.tools.asset_registry import AssetRegistry
+from ws_assets.tools.tick_spans import TickSpans
+
+
+async def test_admin_disabled(client: TestClient):
+    response = client.get("/api/v1/admin/assets")
+
+    assert response.status_code == 404
+
+
+async def test_admin_invalid_token(client: TestClient):
+    client.app.state.Settings.ADMIN_TOKEN = "token"
+
+    response = client.get(
+        "/api/v1/admin/assets", headers={"Authorization": "Bearer wrong"}
+    )
+
+    assert response.status_code == 401
+
+
+async def test_admin_get_assets(client: TestClient):
+    client.app.state.Settings.ADMIN_TOKEN = "token"
+    client.app.state.AssetRegistry = AssetRegistry(
+        db_client=get_mock_db_client(return_fetchall=get_fetchall_assets())  # type: ignore
+    )
+
+    response = client.get(
+        "/api/v1/admin/assets", headers={"Authorization": "Bearer token"}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == get_fetchall_assets()
+
+
+async def test_admin_add_assets(client: TestClient):
+    client.app.state.Settings.ADMIN_TOKEN = "token"
+    db_client = get_mock_db_client(return_fetchall=get_fetchall_assets())
+    queries: list = []
+
+    async def mock_fetchall(query, **kwargs):
+        queries.append(query.compile())
+
+        return get_fetchall_assets()
+
+    db_client.fetchall = mock_fetchall  # type: ignore
+    client.app.state.AssetRegistry = AssetRegistry(db_client=db_client)  # type: ignore
+
+    response = client.post(
+        "/api/v1/admin/assets",
+        headers={"Authorization": "Bearer token"},
+        json={"names": ["EURUSD", "USDJPY", "EURUSD"]},
+    )
+
+    assert response.status_code == 200
+
+    # Repeated names are inserted once
+    assert sorted(
+        value for key, value in queries[0].params.items() if key.startswith("symbol")
+    ) == ["EURUSD", "USDJPY"]
+
+
+async def test_admin_loop_status(client: TestClient):
+    client.app.state.Settings.ADMIN_TOKEN = "token"
+    client.app.state.LoopLagMonitor.add_sample(0.05)
+
+    tick_spans = TickSpans()
+    with tick_spans.span("insert"):
+        pass
+    client.app.state.AssetProcessor.tick_spans = tick_spans
+
+    response = client.get(
+        "/api/v1/admin/loop", headers={"Authorization": "Bearer token"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["maxLag"] == 0.05
+    assert response.json()["stages"]["insert"]["count"] == 1
+
+    # Maximum is reset by every request
+    response = client.get(
+        "/api/v1/admin/loop", headers={"Authorization": "Bearer token"}
+    )
+    assert response.json()["maxLag"] == 0
+
+
+async def test_admin_profile(client: TestClient):
+    client.app.state.Settings.ADMIN_TOKEN = "token"
+
+    response = client.post(
+        "/api/v1/admin/profile?duration=0.1", headers={"Authorization": "Bearer token"}
+    )
+
+    assert response.status_code == 200
+
+    # Every line is a stack and a number of samples
+    stack, count = response.text.splitlines()[0].rsplit(" ", 1)
+    assert ";" in stack
+    assert int(count) > 0
@@ -0,0 +1,46 @@
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from ws_assets.main import warm_up
+
+
+async def test_health_ready(client: TestClient):
+    response = client.get("/api/v1/health/ready")
+
+    assert response.status_code == 200
+    assert response.json()["ready"] is True
+
+    assert client.get("/api/v1/health/live").status_code == 200
+
+
+async def test_health_not_ready(client: TestClient):
+    client.app.state.Readiness.is_ready = False
+
+    response = client.get("/api/v1/health/ready")
+
+    assert response.status_code == 503
+    assert response.json() == {"ready": False, "error": None, "startup": {}}
+
+    # Websockets are refused until the service is ready
+    with pytest.raises(WebSocketDisconnect) as e:
+        with client.websocket_connect("/api/v1/websocket") as websocket:
+            websocket.receive_json()
+
+    assert e.value.code == 1013
+
+
+async def test_health_warm_up_failed(client: TestClient):
+    client.app.state.Readiness.is_ready = False
+    client.app.state.Settings.AUTO_APPLY_MIGRATIONS = False
+
+    # Mock database client can't be opened
+    await warm_up(client.app)  # type: ignore
+
+    response = client.get("/api/v1/health/ready")
+
+    assert response.status_code == 503
+    assert response.json()["error"].startswith("AttributeError")
+    assert "database" in response.json()["startup"]
+
+    assert client.get("/api/v1/health/live").status_code == 503
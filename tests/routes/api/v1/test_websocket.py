@@ -1,6 +1,12 @@
 import asyncio
+from typing import List
 
+import pytest
 from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from ws_assets.tools.frames import FRAME_HISTORY
+from ws_assets.tools.history_codec import decode_history_binary
 
 
 async def test_websocket_incorrect_not_dict(client: TestClient):
@@ -28,7 +34,7 @@ async def test_websocket_incorrect_wrong_action(client: TestClient):
             "action": "error",
             "message": {
                 "error_type": "ValidationError",
-                "error_text": "1 validation error for GenericRequest\naction\n  unexpected value; permitted: 'assets', 'subscribe' (type=value_error.const; given=test_action; permitted=('assets', 'subscribe'))",
+                "error_text": "1 validation error for GenericRequest\naction\n  unexpected value; permitted: 'assets', 'subscribe', 'unsubscribe', 'subscribe_indicators', 'unsubscribe_indicators', 'quote' (type=value_error.const; given=test_action; permitted=('assets', 'subscribe', 'unsubscribe', 'subscribe_indicators', 'unsubscribe_indicators', 'quote'))",
             },
         }
 
@@ -73,13 +79,13 @@ async def test_websocket_subscribe(client: TestClient):
                 "points": [
                     {
                         "assetName": "EURUSD",
-                        "time": 1647092464,
+                        "time": 1647092464000,
                         "assetId": 1,
                         "value": 1.0911849999999998,
                     },
                     {
                         "assetName": "EURUSD",
-                        "time": 1647092464,
+                        "time": 1647092464000,
                         "assetId": 1,
                         "value": 0.8911849999999998,
                     },
@@ -95,8 +101,293 @@ async def test_websocket_subscribe(client: TestClient):
             "action": "point",
             "message": {
                 "assetName": "EURUSD",
-                "time": 1647092464,
+                "time": 1647092464000,
                 "assetId": 1,
                 "value": 1.0911849999999998,
             },
         }
+
+
+async def test_websocket_subscribe_batch(client: TestClient):
+    with client.websocket_connect("/api/v1/websocket?batch=true") as websocket:
+        websocket.send_json({"action": "subscribe", "message": {"assetId": 1}})
+
+        data: dict = websocket.receive_json()
+
+        assert data["action"] == "asset_history"
+
+        await asyncio.sleep(2)
+
+        data = websocket.receive_json()
+
+        assert data == {
+            "action": "points",
+            "message": {
+                "points": [
+                    {
+                        "assetName": "EURUSD",
+                        "time": 1647092464000,
+                        "assetId": 1,
+                        "value": 1.0911849999999998,
+                    }
+                ]
+            },
+        }
+
+
+async def test_websocket_rate_limit(client: TestClient):
+    with client.websocket_connect("/api/v1/websocket") as websocket:
+        for _ in range(20):
+            websocket.send_json({"action": "assets", "message": {}})
+
+        actions: List[str] = [websocket.receive_json()["action"] for _ in range(20)]
+
+        assert actions[0] == "assets"
+        assert "error" in actions
+
+
+async def test_websocket_drain(client: TestClient):
+    with client.websocket_connect("/api/v1/websocket") as websocket:
+        websocket.send_json(
+            {"action": "subscribe_indicators", "message": {"assetId": 1, "window": 20}}
+        )
+        websocket.receive_json()
+
+        websocket_manager = client.app.state.WebsocketManager
+        (client_id,) = websocket_manager._clients_by_client_id
+
+        await websocket_manager.drain(reconnect_delay=1, reconnect_jitter=0)
+
+        data: dict = websocket.receive_json()
+
+        assert data == {"action": "reconnect", "message": {"delay": 1.0}}
+
+        # Closed sockets don't receive indicators
+        assert not websocket_manager._clients_by_indicator
+
+        # Requests which are still handled stop like after a disconnect
+        with pytest.raises(WebSocketDisconnect):
+            websocket_manager.add_subscription(client_id=client_id, asset_id=1)
+
+        await websocket_manager.send_error(
+            client_id=client_id, error_type="Error", error_text=""
+        )
+
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect("/api/v1/websocket") as websocket:
+            websocket.receive_json()
+
+
+async def test_websocket_unsubscribe(client: TestClient):
+    client.app.state.WebsocketManager._max_subscriptions = 2
+
+    with client.websocket_connect("/api/v1/websocket") as websocket:
+        for asset_id in (1, 2):
+            websocket.send_json(
+                {"action": "subscribe", "message": {"assetId": asset_id}}
+            )
+            websocket.receive_json()
+
+        websocket.send_json({"action": "unsubscribe", "message": {"assetId": 2}})
+        websocket.send_json({"action": "unsubscribe", "message": {"assetId": 2}})
+
+        data: dict = websocket.receive_json()
+
+        assert data == {
+            "action": "error",
+            "message": {
+                "error_type": "NotSubscribedError",
+                "error_text": "Not subscribed to asset ID: 2",
+            },
+        }
+
+
+async def test_websocket_subscription_limit(client: TestClient):
+    with client.websocket_connect("/api/v1/websocket") as websocket:
+        websocket.send_json({"action": "subscribe", "message": {"assetId": 1}})
+        websocket.receive_json()
+
+        # Existing subscriptions are kept
+        websocket.send_json({"action": "subscribe", "message": {"assetId": 2}})
+
+        data: dict = websocket.receive_json()
+
+        assert data == {
+            "action": "error",
+            "message": {
+                "error_type": "ServiceOverloadedError",
+                "error_text": "Service is overloaded: subscriptions per client. Try again later",
+            },
+        }
+        assert list(client.app.state.WebsocketManager._clients_by_asset_id) == [1]
+
+
+async def test_websocket_connection_limit(client: TestClient):
+    client.app.state.AdmissionController._max_connections = 1
+
+    with client.websocket_connect("/api/v1/websocket"):
+        with pytest.raises(WebSocketDisconnect) as e:
+            with client.websocket_connect("/api/v1/websocket") as websocket:
+                websocket.receive_json()
+
+        assert e.value.code == 1013
+
+
+async def test_websocket_subscribe_indicators(client: TestClient):
+    # Wait for the first tick
+    await asyncio.sleep(1.5)
+
+    with client.websocket_connect("/api/v1/websocket") as websocket:
+        websocket.send_json(
+            {"action": "subscribe_indicators", "message": {"assetId": 1, "window": 20}}
+        )
+
+        data: dict = websocket.receive_json()
+
+        assert data == {
+            "action": "indicator",
+            "message": {
+                "assetName": "EURUSD",
+                "time": 1647092464000,
+                "assetId": 1,
+                "window": 20,
+                "sma": 1.0911849999999998,
+                "ema": 1.0911849999999998,
+                "volatility": None,
+            },
+        }
+
+        websocket.send_json(
+            {"action": "subscribe_indicators", "message": {"assetId": 1, "window": 5}}
+        )
+
+        data = websocket.receive_json()
+
+        assert data == {
+            "action": "error",
+            "message": {
+                "error_type": "UnknownIndicatorWindowError",
+                "error_text": "Unknown indicator window: 5. Available windows: [20]",
+            },
+        }
+
+
+async def test_websocket_stale_status(client: TestClient):
+    await client.app.state.WebsocketManager.broadcast_status(  # type: ignore
+        stale=True, last_update=1647092464000
+    )
+
+    with client.websocket_connect("/api/v1/websocket") as websocket:
+        data: dict = websocket.receive_json()
+
+        assert data == {
+            "action": "status",
+            "message": {"stale": True, "lastUpdate": 1647092464000},
+        }
+
+
+async def test_websocket_subscribe_history_delta(client: TestClient):
+    with client.websocket_connect("/api/v1/websocket?history=delta") as websocket:
+        websocket.send_json({"action": "subscribe", "message": {"assetId": 1}})
+
+        data: dict = websocket.receive_json()
+
+        assert data == {
+            "action": "asset_history_delta",
+            "message": {
+                "assetName": "EURUSD",
+                "assetId": 1,
+                "count": 2,
+                "start": 1647092464000,
+                "interval": None,
+                "timeDeltas": [0],
+                "scale": 6,
+                "base": 1091185,
+                "valueDeltas": [-200000],
+            },
+        }
+
+
+async def test_websocket_subscribe_history_binary(client: TestClient):
+    with client.websocket_connect("/api/v1/websocket?history=binary") as websocket:
+        websocket.send_json({"action": "subscribe", "message": {"assetId": 1}})
+
+        data: bytes = websocket.receive_bytes()
+
+        assert data[:1] == FRAME_HISTORY
+        assert decode_history_binary(data) == (
+            1,
+            "EURUSD",
+            [(1647092464000, 1.091185), (1647092464000, 0.891185)],
+        )
+
+
+async def test_websocket_subscribe_max_rate(client: TestClient):
+    with client.websocket_connect("/api/v1/websocket") as websocket:
+        websocket.send_json(
+            {"action": "subscribe", "message": {"assetId": 1, "maxRate": 0.4}}
+        )
+
+        assert websocket.receive_json()["action"] == "asset_history"
+
+        # Ticks every second, but only the first point and one 2.5 seconds later are sent
+        await asyncio.sleep(4.5)
+
+        websocket.send_json({"action": "unsubscribe", "message": {"assetId": 3}})
+
+        actions: List[str] = []
+        while not actions or actions[-1] != "error":
+            actions.append(websocket.receive_json()["action"])
+
+        assert actions == ["point", "point", "error"]
+
+
+async def test_websocket_quote(client: TestClient):
+    # Wait for the first tick
+    await asyncio.sleep(1.5)
+
+    with client.websocket_connect("/api/v1/websocket") as websocket:
+        websocket.send_json({"action": "quote", "message": {"assetIds": [2, 1, 3]}})
+
+        data: dict = websocket.receive_json()
+
+        # Assets without points are omitted
+        assert data == {
+            "action": "quote",
+            "message": {
+                "points": [
+                    {
+                        "assetName": "USDJPY",
+                        "time": 1647092464000,
+                        "assetId": 2,
+                        "value": 0.8911849999999998,
+                    },
+                    {
+                        "assetName": "EURUSD",
+                        "time": 1647092464000,
+                        "assetId": 1,
+                        "value": 1.0911849999999998,
+                    },
+                ]
+            },
+        }
+
+        websocket.send_json({"action": "quote", "message": {"assetIds": [10]}})
+
+        assert (
+            websocket.receive_json()["message"]["error_type"] == "UnknownAssetIDError"
+        )
+
+
+async def test_websocket_subscribe_snapshot(client: TestClient):
+    await asyncio.sleep(1.5)
+
+    with client.websocket_connect("/api/v1/websocket") as websocket:
+        websocket.send_json(
+            {"action": "subscribe", "message": {"assetId": 1, "snapshot": True}}
+        )
+
+        data: dict = websocket.receive_json()
+
+        assert data["action"] == "quote"
+        assert [point["assetId"] for point in data["message"]["points"]] == [1]
@@ -0,0 +1,18 @@
+import asyncio
+
+from ws_assets.main import create_app, drain
+
+
+async def test_drain_before_warm_up():
+    app = create_app()
+
+    # Warm-up is still connecting to the database
+    app.state.WarmUpTask = asyncio.create_task(asyncio.sleep(60))
+    await asyncio.sleep(0)
+
+    await drain(app)
+
+    assert app.state.WarmUpTask.cancelled()
+
+    # Database client was never connected, but the remaining resources are closed
+    assert app.state.ClientSession.closed
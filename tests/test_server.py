@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+import uvicorn  # type: ignore
+from fastapi import FastAPI
+from starlette.websockets import WebSocket
+
+from ws_assets.__main__ import get_websocket_protocol
+from ws_assets.routers import api_v1_router
+from ws_assets.settings import Settings
+from ws_assets.tools.admission import AdmissionController
+from ws_assets.tools.readiness import Readiness
+from ws_assets.tools.websocket_manager import WebsocketManager
+
+websockets = pytest.importorskip("websockets")
+
+
+async def echo_app(scope, receive, send):
+    websocket = WebSocket(scope, receive=receive, send=send)
+    await websocket.accept()
+    await websocket.send_text(await websocket.receive_text())
+    await websocket.close()
+
+
+async def test_websocket_protocol_deflate(unused_tcp_port: int):
+    settings = Settings()
+    settings.COMPRESSION_WINDOW_BITS = 12
+    settings.COMPRESSION_CONTEXT_TAKEOVER = False
+
+    server = uvicorn.Server(
+        uvicorn.Config(
+            echo_app,
+            port=unused_tcp_port,
+            ws=get_websocket_protocol(settings),
+            lifespan="off",
+            log_level="error",
+        )
+    )
+    task = asyncio.create_task(server.serve())
+
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    try:
+        # Standard clients negotiate the extension with parameters from settings
+        async with websockets.connect(f"ws://127.0.0.1:{unused_tcp_port}") as websocket:
+            (extension,) = websocket.extensions
+            assert extension.name == "permessage-deflate"
+            assert extension.remote_no_context_takeover
+            assert extension.remote_max_window_bits == 12
+
+            await websocket.send('{"action":"assets"}')
+            assert await websocket.recv() == '{"action":"assets"}'
+    finally:
+        server.should_exit = True
+        await task
+
+
+@pytest.mark.parametrize("is_accepting, code", [(False, 1012), (True, 1013)])
+async def test_websocket_refused(unused_tcp_port: int, is_accepting: bool, code: int):
+    app = FastAPI()
+    app.include_router(api_v1_router)
+    app.state.Settings = Settings()
+    app.state.AssetProcessor = None
+    app.state.WebsocketManager = WebsocketManager()
+    app.state.WebsocketManager.is_accepting = is_accepting
+
+    # Websockets are refused until the service is ready
+    app.state.AdmissionController = AdmissionController(
+        websocket_manager=app.state.WebsocketManager, readiness=Readiness()
+    )
+
+    server = uvicorn.Server(
+        uvicorn.Config(
+            app,
+            port=unused_tcp_port,
+            ws="websockets",
+            lifespan="off",
+            log_level="error",
+        )
+    )
+    task = asyncio.create_task(server.serve())
+
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    try:
+        # Clients receive the close code instead of HTTP 403
+        async with websockets.connect(
+            f"ws://127.0.0.1:{unused_tcp_port}/api/v1/websocket"
+        ) as websocket:
+            with pytest.raises(websockets.ConnectionClosed):
+                await websocket.recv()
+
+            assert websocket.close_code == code
+    finally:
+        server.should_exit = True
+        await task
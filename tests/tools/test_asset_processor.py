@@ -1,6 +1,8 @@
-import json
-from typing import Dict, List
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
 
+import orjson
 import pytest
 
 from tests.conftest import (
@@ -9,10 +11,22 @@ from tests.conftest import (
     get_fetchall_asset_points_without_asset_name,
     get_fetchall_assets,
     get_response_text,
+    set_assets,
 )
-from ws_assets.exceptions import UnknownAssetIDError
-from ws_assets.models.asset import Asset, AssetPoint
+from ws_assets.exceptions import (
+    AssetHTTPRequestError,
+    ServiceOverloadedError,
+    UnknownAssetIDError,
+)
+from ws_assets.models.asset import Asset, AssetPointRecord
 from ws_assets.tools.asset_processor import AssetProcessor
+from ws_assets.tools.asset_registry import AssetSnapshot
+from ws_assets.tools.circuit_breaker import CircuitBreaker
+from ws_assets.tools.clock import to_epoch_milliseconds
+from ws_assets.tools.history_buffer import HistoryBuffers
+from ws_assets.tools.mocks.mock_db_client import MockDBClient
+from ws_assets.tools.point_archive import PointArchiver, encode_archive
+from ws_assets.tools.tick_spans import TickSpans
 
 
 async def test_fetch_assets():
@@ -27,8 +41,8 @@ async def test_fetch_assets():
     assert (
         len(assets)
         == len(return_fetchall)
-        == len(asset_processor._assets_name_to_id)
-        == len(asset_processor._assets_id_to_name)
+        == len(asset_processor.asset_registry.snapshot.name_to_id)
+        == len(asset_processor.asset_registry.snapshot.id_to_name)
     )
 
 
@@ -38,12 +52,14 @@ async def test_fetch_asset_history_correct():
         return_fetchall=return_fetchall
     )
 
-    asset_processor._assets_id_to_name = {1: "EURUSD"}
-    asset_history: List[AssetPoint] = await asset_processor.fetch_asset_history(
+    set_assets(asset_processor, {1: "EURUSD"})
+    asset_history: List[AssetPointRecord] = await asset_processor.fetch_asset_history(
         asset_id=1
     )
 
-    assert all([isinstance(asset_point, AssetPoint) for asset_point in asset_history])
+    assert all(
+        [isinstance(asset_point, AssetPointRecord) for asset_point in asset_history]
+    )
     assert len(asset_history) == len(return_fetchall)
 
 
@@ -53,12 +69,64 @@ async def test_fetch_asset_history_incorrect_asset_id():
         return_fetchall=return_fetchall
     )
 
-    asset_processor._assets_id_to_name = {2: "USDJPY"}
+    set_assets(asset_processor, {2: "USDJPY"})
 
     with pytest.raises(UnknownAssetIDError):
         await asset_processor.fetch_asset_history(asset_id=1)
 
 
+async def test_fetch_asset_history_overloaded():
+    return_fetchall: List[dict] = get_fetchall_asset_points()
+    asset_processor: AssetProcessor = get_asset_processor(
+        return_fetchall=return_fetchall
+    )
+    asset_processor._max_concurrent_history_fetches = 1
+
+    set_assets(asset_processor, {1: "EURUSD"})
+
+    async with asset_processor._history_slot():
+        with pytest.raises(ServiceOverloadedError):
+            await asset_processor.fetch_asset_history(asset_id=1)
+
+    assert len(await asset_processor.fetch_asset_history(asset_id=1)) == len(
+        return_fetchall
+    )
+
+
+async def test_fetch_asset_history_single_flight():
+    return_fetchall: List[dict] = get_fetchall_asset_points()
+    asset_processor: AssetProcessor = get_asset_processor(
+        return_fetchall=return_fetchall
+    )
+    asset_processor._history_cache_ttl = 60
+
+    queries: List[tuple] = []
+
+    async def mock_fetchall(*args, **kwargs) -> List[dict]:
+        queries.append(args)
+        await asyncio.sleep(0.1)
+
+        return return_fetchall
+
+    asset_processor._db_client.fetchall = mock_fetchall  # type: ignore
+
+    set_assets(asset_processor, {1: "EURUSD"})
+    asset_histories: List[List[AssetPointRecord]] = await asyncio.gather(
+        *[asset_processor.fetch_asset_history(asset_id=1) for _ in range(10)]
+    )
+
+    assert len(queries) == 1
+    assert all(asset_history is asset_histories[0] for asset_history in asset_histories)
+
+    # Result is cached
+    await asset_processor.fetch_asset_history(asset_id=1)
+    assert len(queries) == 1
+
+    # Different window is a different query
+    await asset_processor.fetch_asset_history(asset_id=1, time=60)
+    assert len(queries) == 2
+
+
 async def test_parse_asset_text():
     text: str = get_response_text()
     asset_processor: AssetProcessor = get_asset_processor()
@@ -70,39 +138,225 @@ async def test_parse_asset_text():
     assert isinstance(asset_points["Rates"], list)
 
 
-async def test_filter_unused_assets():
+async def test_receive_asset_point():
+    return_fetchall: List[dict] = get_fetchall_asset_points_without_asset_name()
+    asset_processor: AssetProcessor = get_asset_processor(
+        return_fetchall=return_fetchall
+    )
+    set_assets(asset_processor, {1: "EURUSD"})
+
+    results: List[AssetPointRecord] = []
+
+    async def mock_subscription_handler(asset_points: List[AssetPointRecord]):
+        results.extend(asset_points)
+
+    asset_processor._subscription_handler = mock_subscription_handler
+    asset_processor._tick_spans = TickSpans()
+
+    await asset_processor._receive_asset_point()
+
+    assert len(results) == 1
+    assert isinstance(results[0].time, int)
+
+    assert set(asset_processor._tick_spans.stages) == {
+        "fetch",
+        "parse",
+        "transform",
+        "insert",
+        "broadcast",
+        "indicators",
+    }
+
+
+async def test_fetch_assets_cached():
+    return_fetchall: List[dict] = get_fetchall_assets()
+    asset_processor: AssetProcessor = get_asset_processor(
+        return_fetchall=return_fetchall
+    )
+
+    await asset_processor.fetch_assets()
+    snapshot: AssetSnapshot = asset_processor.asset_registry.snapshot
+
+    # The database isn't queried again and the frame is encoded once
+    asset_processor._db_client.return_fetchall = []  # type: ignore
+
+    assert await asset_processor.fetch_assets() is snapshot.assets
+    assert await asset_processor.fetch_assets_frame() is snapshot.frame
+    assert orjson.loads(snapshot.frame.payload) == {
+        "action": "assets",
+        "message": {"assets": return_fetchall},
+    }
+
+
+async def test_discover_new_assets():
     text: str = get_response_text()
     asset_processor: AssetProcessor = get_asset_processor()
-    asset_processor._assets_id_to_name = {1: "EURUSD"}
-    asset_processor._assets_name_to_id = {"EURUSD": 1}
+    set_assets(asset_processor, {1: "EURUSD"})
 
-    asset_points: Dict[str, List[dict]] = asset_processor._parse_asset_text(text=text)
-    useful_asset_points: List[dict] = asset_processor._filter_unused_assets(
-        asset_points=asset_points
-    )
+    discovered: List[List[str]] = []
+
+    async def mock_discover_assets(names: List[str]):
+        discovered.append(names)
 
-    assert isinstance(useful_asset_points, list)
-    assert len(useful_asset_points) == 1
-    assert useful_asset_points[0] == json.loads(
-        '{"Symbol":"EURUSD","Bid":"1.09107","Ask":"1.0913","Spread":"2.30","ProductType":"1"}'
+    asset_processor.asset_registry.discover_assets = mock_discover_assets  # type: ignore
+
+    asset_processor._discover_new_assets(
+        asset_points=asset_processor._parse_asset_text(text=text),
+        assets=asset_processor.asset_registry.snapshot,
     )
+    await asset_processor._discovery_task  # type: ignore
 
+    assert len(discovered) == 1
+    assert "EURUSD" not in discovered[0]
+    assert "USOil" in discovered[0]
 
-async def test_receive_asset_point():
-    return_fetchall: List[dict] = get_fetchall_asset_points_without_asset_name()
+
+async def test_receive_asset_point_endpoint_outage():
     asset_processor: AssetProcessor = get_asset_processor(
-        return_fetchall=return_fetchall
+        return_fetchall=get_fetchall_asset_points_without_asset_name()
     )
-    asset_processor._assets_id_to_name = {1: "EURUSD"}
-    asset_processor._assets_name_to_id = {"EURUSD": 1}
+    set_assets(asset_processor, {1: "EURUSD"})
 
-    results: List[AssetPoint] = []
+    statuses: List[Tuple[bool, Optional[int]]] = []
 
-    async def mock_subscription_handler(asset_points: List[AssetPoint]):
-        results.extend(asset_points)
+    async def mock_subscription_handler(asset_points: List[AssetPointRecord]):
+        pass
+
+    async def mock_status_handler(stale: bool, last_update: Optional[int]):
+        statuses.append((stale, last_update))
+
+    async def mock_failing_request() -> str:
+        raise AssetHTTPRequestError(code=503, response="")
 
     asset_processor._subscription_handler = mock_subscription_handler
+    asset_processor._status_handler = mock_status_handler
+    asset_processor._circuit_breaker = CircuitBreaker(failure_threshold=2, jitter=0)
 
     await asset_processor._receive_asset_point()
+    last_update: Optional[int] = asset_processor._last_update
 
-    assert len(results) == 1
+    working_request = asset_processor._make_request_to_asset_endpoint
+    asset_processor._make_request_to_asset_endpoint = mock_failing_request  # type: ignore
+
+    # Errors don't escape the tick task
+    for _ in range(2):
+        await asset_processor._receive_asset_point()
+
+    assert asset_processor.circuit_breaker.state == "open"
+    assert not asset_processor.circuit_breaker.allow_request()
+    assert statuses == [(True, last_update)]
+
+    # Probe succeeds after the backoff delay
+    asset_processor.circuit_breaker._retry_at = 0
+    asset_processor._make_request_to_asset_endpoint = working_request  # type: ignore
+
+    assert asset_processor.circuit_breaker.allow_request()
+    await asset_processor._receive_asset_point()
+
+    assert asset_processor.circuit_breaker.state == "closed"
+    assert statuses[-1] == (False, asset_processor._last_update)
+
+
+async def test_warm_up_history():
+    now = datetime.now(timezone.utc)
+    asset_processor: AssetProcessor = get_asset_processor(
+        return_fetchall=[
+            {"asset_id": 1, "time": now - timedelta(seconds=2), "value": 1.0},
+            {"asset_id": 1, "time": now - timedelta(seconds=1), "value": 2.0},
+        ]
+    )
+    set_assets(asset_processor, {1: "EURUSD", 2: "USDJPY"})
+    asset_processor._history_buffers = HistoryBuffers(window=60)
+
+    await asset_processor.warm_up_history()
+
+    # History is answered from memory from now on
+    asset_processor._db_client.return_fetchall = None  # type: ignore
+
+    asset_history: List[AssetPointRecord] = await asset_processor.fetch_asset_history(
+        asset_id=1, time=60
+    )
+    assert [asset_point.value for asset_point in asset_history] == [1.0, 2.0]
+
+    assert await asset_processor.fetch_asset_history(asset_id=2, time=60) == []
+
+    # Stored points are appended
+    async def mock_subscription_handler(asset_points: List[AssetPointRecord]):
+        pass
+
+    asset_processor._subscription_handler = mock_subscription_handler
+    await asset_processor._receive_asset_point()
+
+    asset_history = await asset_processor.fetch_asset_history(asset_id=1, time=30)
+    assert len(asset_history) == 3
+    assert asset_history[-1].value == (1.09107 + 1.0913) / 2
+
+
+async def test_fetch_asset_history_archived():
+    now = datetime.now(timezone.utc)
+    asset_processor: AssetProcessor = get_asset_processor(
+        return_fetchall=[
+            # Backfilled into an archived day
+            {"time": now - timedelta(days=3, hours=12), "value": 0.5},
+            {"time": now - timedelta(days=2), "value": 2.0},
+            {"time": now, "value": 3.0},
+        ]
+    )
+    set_assets(asset_processor, {1: "EURUSD"})
+
+    # Archive of old days, one of them is still hot
+    asset_processor._point_archiver = PointArchiver(
+        db_client=MockDBClient(
+            return_fetchall=[
+                {
+                    "data": encode_archive(
+                        asset_id=1,
+                        points=[
+                            (to_epoch_milliseconds(now - timedelta(days=3)), 1.0),
+                            (to_epoch_milliseconds(now - timedelta(days=2)), 2.0),
+                        ],
+                        scale=8,
+                    )
+                }
+            ]
+        ),  # type: ignore
+        age=0,
+    )
+
+    asset_history: List[AssetPointRecord] = await asset_processor.fetch_asset_history(
+        asset_id=1, time=4 * 24 * 60 * 60
+    )
+    assert [asset_point.value for asset_point in asset_history] == [
+        0.5,
+        1.0,
+        2.0,
+        3.0,
+    ]
+
+    # Recent history doesn't read the archive
+    asset_processor._point_archiver._db_client = None  # type: ignore
+    assert len(await asset_processor.fetch_asset_history(asset_id=1, time=60)) == 3
+
+
+async def test_store_points_insert():
+    asset_processor: AssetProcessor = get_asset_processor()
+    statements: list = []
+
+    async def mock_fetchall(query, **kwargs):
+        statements.append(query.compile())
+
+    asset_processor._db_client.fetchall = mock_fetchall  # type: ignore
+
+    now = datetime.now(timezone.utc)
+    values: List[dict] = [
+        {"asset_id": asset_id, "value": 1.0, "ts": now} for asset_id in range(12000)
+    ]
+
+    # Replayed point replaces the earlier one in the same batch
+    await asset_processor.store_points(
+        values=values + [{"asset_id": 0, "value": 2.0, "ts": now}]
+    )
+
+    # Batches stay under the bind parameter limit
+    assert [len(statement.params) for statement in statements] == [32766, 3234]
+    assert statements[0].params["value_m0"] == 2.0
@@ -0,0 +1,63 @@
+from ws_assets.tools.circuit_breaker import CircuitBreaker
+
+
+def open_circuit(circuit_breaker: CircuitBreaker):
+    # Backoff delay is over
+    circuit_breaker._retry_at = 0
+
+
+async def test_circuit_breaker_opens():
+    circuit_breaker = CircuitBreaker(failure_threshold=2, base_delay=10, jitter=0)
+
+    assert not circuit_breaker.record_failure()
+    assert circuit_breaker.allow_request()
+
+    assert circuit_breaker.record_failure()
+    assert circuit_breaker.state == "open"
+    assert not circuit_breaker.allow_request()
+    assert 9 < circuit_breaker.retry_in <= 10
+
+    # Concurrent requests failing after the circuit opened don't extend the delay
+    for _ in range(5):
+        assert not circuit_breaker.record_failure()
+
+    assert 9 < circuit_breaker.retry_in <= 10
+    assert circuit_breaker._openings == 1
+
+
+async def test_circuit_breaker_half_open():
+    circuit_breaker = CircuitBreaker(failure_threshold=1, base_delay=10, jitter=0)
+    circuit_breaker.record_failure()
+    open_circuit(circuit_breaker)
+
+    # A single probe at a time
+    assert circuit_breaker.allow_request()
+    assert circuit_breaker.state == "half_open"
+    assert not circuit_breaker.allow_request()
+
+    # Failed probe doubles the delay and isn't reported as a new outage
+    assert not circuit_breaker.record_failure()
+    assert circuit_breaker.state == "open"
+    assert 19 < circuit_breaker.retry_in <= 20
+
+    open_circuit(circuit_breaker)
+    assert circuit_breaker.allow_request()
+
+    assert circuit_breaker.record_success()
+    assert circuit_breaker.state == "closed"
+    assert circuit_breaker.failures == 0
+    assert not circuit_breaker.record_success()
+
+
+async def test_circuit_breaker_backoff():
+    circuit_breaker = CircuitBreaker(
+        failure_threshold=1, base_delay=1, max_delay=60, jitter=0.5
+    )
+
+    for _ in range(100):
+        circuit_breaker.record_failure()
+        circuit_breaker.state = "half_open"
+
+    # Capped and randomized by at most half
+    circuit_breaker.record_failure()
+    assert 29 < circuit_breaker.retry_in <= 60
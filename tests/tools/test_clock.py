@@ -0,0 +1,26 @@
+from datetime import datetime, timedelta, timezone
+
+from ws_assets.tools.clock import Clock, to_epoch_milliseconds
+
+
+async def test_to_epoch_milliseconds():
+    value = datetime(2022, 3, 12, 13, 41, 4, 123999, tzinfo=timezone.utc)
+
+    assert to_epoch_milliseconds(value) == 1647092464123
+    assert to_epoch_milliseconds(value.replace(tzinfo=None)) == 1647092464123
+    assert (
+        to_epoch_milliseconds(value.astimezone(timezone(timedelta(hours=3))))
+        == 1647092464123
+    )
+
+
+async def test_clock_never_goes_backwards():
+    clock = Clock(resync_interval=0)
+
+    # System clock was stepped back
+    clock._last += 60
+    times = [clock.now() for _ in range(100)]
+
+    assert times == sorted(times)
+    assert all(time.tzinfo is not None for time in times)
+    assert all(time.microsecond % 1000 == 0 for time in times)
@@ -0,0 +1,12 @@
+from ws_assets.tools.frames import FRAME_HISTORY, encode_frame
+
+
+async def test_encode_frame():
+    frame = encode_frame({"action": "assets"})
+
+    assert frame.payload == b'{"action":"assets"}'
+    assert frame.text == '{"action":"assets"}'
+    assert not frame.is_binary
+
+    # Binary payloads are used as is
+    assert encode_frame(FRAME_HISTORY + b"\x00").is_binary
@@ -0,0 +1,64 @@
+from typing import List, Optional
+
+from ws_assets.models.asset import Asset, AssetPointRecord
+from ws_assets.tools.asset_registry import AssetSnapshot
+from ws_assets.tools.history_buffer import HistoryBuffers
+
+
+def get_times(asset_points: Optional[List[AssetPointRecord]]) -> List[int]:
+    assert asset_points is not None
+
+    return [asset_point.time for asset_point in asset_points]
+
+
+async def test_history_buffers_load():
+    history_buffers = HistoryBuffers(window=10)
+    history_buffers.load(
+        asset_ids=[1, 2],
+        since=1000,
+        rows=[
+            {"asset_id": 1, "time": 2000, "value": 1.0},
+            {"asset_id": 1, "time": 3000, "value": 2.0},
+        ],
+    )
+
+    assert get_times(history_buffers.get(1, "EURUSD", since=1000)) == [2000, 3000]
+    assert get_times(history_buffers.get(1, "EURUSD", since=2000)) == [3000]
+
+    # Asset without points is still answered from memory
+    assert history_buffers.get(2, "USDJPY", since=1000) == []
+
+    # Points before the loaded window may be missing
+    assert history_buffers.get(1, "EURUSD", since=0) is None
+    assert history_buffers.get(3, "GBPUSD", since=1000) is None
+
+
+async def test_history_buffers_append():
+    history_buffers = HistoryBuffers(window=10)
+    history_buffers.load(asset_ids=[1], since=0, rows=[])
+
+    for time in (1000, 3000, 2000, 12500):
+        history_buffers.append([AssetPointRecord("EURUSD", time, 1, time / 1000)])
+
+    # Out of order points are sorted, points older than the window are dropped
+    asset_points = history_buffers.get(1, "EURUSD", since=2500)
+    assert get_times(asset_points) == [3000, 12500]
+    assert asset_points[0] == AssetPointRecord("EURUSD", 3000, 1, 3.0)  # type: ignore
+
+    assert history_buffers.get(1, "EURUSD", since=2000) is None
+
+    # Replayed points replace values instead of duplicating them
+    for time in (3000, 12500):
+        history_buffers.append([AssetPointRecord("EURUSD", time, 1, 0.5)])
+
+    asset_points = history_buffers.get(1, "EURUSD", since=2500)
+    assert get_times(asset_points) == [3000, 12500]
+    assert [asset_point.value for asset_point in asset_points] == [0.5, 0.5]
+
+    # Buffer of a new asset starts with its first point
+    history_buffers.append([AssetPointRecord("USDJPY", 5000, 2, 100.0)])
+    assert get_times(history_buffers.get(2, "USDJPY", since=4999)) == [5000]
+    assert history_buffers.get(2, "USDJPY", since=4000) is None
+
+    history_buffers.retain_assets(AssetSnapshot([Asset(id=1, name="EURUSD")]))
+    assert history_buffers.get(2, "USDJPY", since=4999) is None
@@ -0,0 +1,122 @@
+from typing import List
+
+import orjson
+
+from ws_assets.models.asset import AssetPointRecord
+from ws_assets.tools.frames import FRAME_HISTORY
+from ws_assets.tools.history_codec import (
+    _BINARY_HEADER,
+    decode_history_binary,
+    encode_history_binary,
+    encode_history_delta,
+    encode_history_frame,
+)
+
+
+def get_history(times: List[int], values: List[float]) -> List[AssetPointRecord]:
+    return [
+        AssetPointRecord("EURUSD", time, 1, value) for time, value in zip(times, values)
+    ]
+
+
+async def test_encode_history_delta_interval():
+    payload: dict = encode_history_delta(
+        1, "EURUSD", get_history([1000, 2000, 3000], [1.091185, 1.09119, 1.09118])
+    )
+
+    assert payload == {
+        "action": "asset_history_delta",
+        "message": {
+            "assetName": "EURUSD",
+            "assetId": 1,
+            "count": 3,
+            "start": 1000,
+            "interval": 1000,
+            "timeDeltas": [],
+            "scale": 6,
+            "base": 1091185,
+            "valueDeltas": [5, -10],
+        },
+    }
+
+
+async def test_encode_history_delta_gaps():
+    message: dict = encode_history_delta(
+        1, "EURUSD", get_history([1000, 2000, 5000], [1.0, 1.0, 1.0])
+    )["message"]
+
+    assert message["interval"] is None
+    assert message["timeDeltas"] == [1000, 3000]
+    assert message["valueDeltas"] == [0, 0]
+
+    message = encode_history_delta(1, "EURUSD", [])["message"]
+
+    assert message["count"] == 0
+    assert message["start"] is None
+    assert message["base"] is None
+
+
+async def test_history_binary_round_trip():
+    times: List[int] = [1000, 2000, 3000, 7000]
+    values: List[float] = [1.091185, 1.09119, 1.09118, 150.25]
+
+    data: bytes = encode_history_binary(1, "EURUSD", get_history(times, values))
+
+    assert data[:1] == FRAME_HISTORY
+
+    # Value jump doesn't fit in 16 bits
+    assert data[_BINARY_HEADER.size - 3] == 4
+
+    asset_id, asset_name, points = decode_history_binary(data)
+
+    assert (asset_id, asset_name) == (1, "EURUSD")
+    assert [time for time, _ in points] == times
+    assert [round(value, 6) for _, value in points] == values
+
+    # Evenly spaced points and an empty history
+    assert decode_history_binary(
+        encode_history_binary(1, "EURUSD", get_history([1000, 2000], [1.0, 1.5]))
+    ) == (1, "EURUSD", [(1000, 1.0), (2000, 1.5)])
+    assert decode_history_binary(encode_history_binary(1, "EURUSD", [])) == (
+        1,
+        "EURUSD",
+        [],
+    )
+
+
+async def test_history_scale_round_trip():
+    times: List[int] = [1000, 2000, 3000]
+    values: List[float] = [0.00000012, 0.00000013, 0.00000011]
+
+    # Default scale loses values below 1e-6
+    frame = encode_history_frame(1, "SHIBUSD", get_history(times, values), "binary")
+    assert {value for _, value in decode_history_binary(frame.payload)[2]} == {0.0}
+
+    frame = encode_history_frame(
+        1, "SHIBUSD", get_history(times, values), "binary", scale=10
+    )
+    assert [value for _, value in decode_history_binary(frame.payload)[2]] == values
+
+    frame = encode_history_frame(
+        1, "SHIBUSD", get_history(times, values), "delta", scale=10
+    )
+    message: dict = orjson.loads(frame.payload)["message"]
+    assert message["scale"] == 10
+    assert message["base"] == 1200
+
+
+async def test_encode_history_frame_size():
+    asset_history: List[AssetPointRecord] = get_history(
+        [1647092464000 + i * 1000 for i in range(1800)],
+        [1.091185 + (i % 7) * 0.00001 for i in range(1800)],
+    )
+
+    full = encode_history_frame(1, "EURUSD", asset_history, "full")
+    delta = encode_history_frame(1, "EURUSD", asset_history, "delta")
+    binary = encode_history_frame(1, "EURUSD", asset_history, "binary")
+
+    assert orjson.loads(full.payload)["action"] == "asset_history"
+    assert not full.is_binary and not delta.is_binary and binary.is_binary
+
+    assert len(delta.payload) * 5 < len(full.payload)
+    assert len(binary.payload) * 20 < len(full.payload)
@@ -0,0 +1,54 @@
+import math
+import random
+import statistics
+from typing import List
+
+from ws_assets.models.asset import Asset, AssetPointRecord
+from ws_assets.models.indicator import IndicatorRecord
+from ws_assets.tools.asset_registry import AssetSnapshot
+from ws_assets.tools.indicators import IndicatorEngine, RollingStatistics
+
+
+async def test_rolling_statistics():
+    random.seed(0)
+    values: List[float] = [1 + random.random() / 100 for _ in range(100)]
+
+    rolling_statistics = RollingStatistics(window=10)
+
+    for i, value in enumerate(values):
+        rolling_statistics.update(value)
+
+        window: List[float] = values[max(i - 9, 0) : i + 1]
+        assert math.isclose(rolling_statistics.sma, statistics.mean(window))
+
+        returns: List[float] = [
+            math.log(b / a)
+            for a, b in zip(values[max(i - 10, 0) : i], values[max(i - 9, 1) : i + 1])
+        ]
+        if len(returns) < 2:
+            assert rolling_statistics.volatility is None
+        else:
+            assert math.isclose(
+                rolling_statistics.volatility, statistics.stdev(returns)  # type: ignore
+            )
+
+
+async def test_indicator_engine():
+    indicator_engine = IndicatorEngine(windows=[2, 3])
+
+    for time, value in enumerate([1.0, 2.0, 3.0]):
+        indicators: List[IndicatorRecord] = indicator_engine.update(
+            [AssetPointRecord("EURUSD", time, 1, value)]
+        )
+
+    assert [(indicator.window, indicator.sma) for indicator in indicators] == [
+        (2, 2.5),
+        (3, 2.0),
+    ]
+
+    # Stale tick is skipped
+    assert indicator_engine.update([AssetPointRecord("EURUSD", 1, 1, 10.0)]) == []
+    assert indicator_engine.get(asset_id=1, window=2).sma == 2.5  # type: ignore
+
+    indicator_engine.retain_assets(AssetSnapshot([Asset(id=2, name="USDJPY")]))
+    assert indicator_engine.get(asset_id=1, window=2) is None
@@ -0,0 +1,22 @@
+import asyncio
+import time
+
+from ws_assets.tools.loop_monitor import LoopLagMonitor
+
+
+async def test_loop_lag_monitor():
+    loop_monitor = LoopLagMonitor(interval=0.01, warning_lag=0)
+    task = asyncio.create_task(loop_monitor.start_sampling())
+
+    await asyncio.sleep(0.05)
+
+    # Blocks the event loop
+    time.sleep(0.1)
+    await asyncio.sleep(0.05)
+
+    task.cancel()
+
+    assert loop_monitor.samples > 1
+    assert loop_monitor.max >= 0.05
+    assert loop_monitor.reset_max() >= 0.05
+    assert loop_monitor.max == 0
@@ -0,0 +1,44 @@
+import threading
+
+import pytest
+
+from tests.conftest import get_response_text
+from ws_assets.exceptions import AssetParsingError
+from ws_assets.tools.asset_processor import AssetProcessor
+from ws_assets.tools.frames import encode_frame
+from ws_assets.tools.offload import Offloader
+
+
+def get_thread_id() -> int:
+    return threading.get_ident()
+
+
+async def test_offloader_threshold():
+    offloader = Offloader(kind="thread", workers=1, min_size=100)
+
+    # Small inputs are processed inline
+    assert await offloader.run(get_thread_id, size=99) == threading.get_ident()
+    assert await offloader.run(get_thread_id, size=100) != threading.get_ident()
+
+    offloader.close()
+
+
+async def test_offloader_process():
+    offloader = Offloader(kind="process", workers=1, min_size=0)
+
+    payload: dict = await offloader.run(
+        AssetProcessor._parse_asset_text, get_response_text(), size=1
+    )
+    assert payload["Rates"][0]["Symbol"] == "EURUSD"
+
+    # Frames are encoded in the worker
+    frame = await offloader.run(encode_frame, {"action": "assets"}, size=1)
+    assert frame.payload == b'{"action":"assets"}'
+
+    # Errors keep their message when they are passed back from the worker
+    with pytest.raises(AssetParsingError) as error:
+        await offloader.run(AssetProcessor._parse_asset_text, "null({); ", size=1)
+
+    assert str(error.value) == str(AssetParsingError(text="{"))
+
+    offloader.close()
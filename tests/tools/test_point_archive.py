@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta, timezone
+
+from ws_assets.tools.clock import to_epoch_milliseconds
+from ws_assets.tools.mocks.mock_db_client import MockDBClient
+from ws_assets.tools.point_archive import (
+    PointArchiver,
+    decode_archive,
+    encode_archive,
+    merge_points,
+)
+
+
+class FixedClock:
+    def __init__(self, now: datetime):
+        self._now: datetime = now
+
+    def now(self) -> datetime:
+        return self._now
+
+
+async def test_encode_archive():
+    points = [(1000 + index * 500, 1.09107 + index * 1e-8) for index in range(100)]
+
+    assert decode_archive(encode_archive(asset_id=1, points=points, scale=8)) == [
+        (time, round(value, 8)) for time, value in points
+    ]
+    assert decode_archive(encode_archive(asset_id=1, points=[], scale=8)) == []
+
+    # Late points replace archived points with the same time
+    assert merge_points(
+        archived=[(1000, 1.0), (2000, 2.0)], points=[(2000, 2.5), (1500, 1.5)]
+    ) == [(1000, 1.0), (1500, 1.5), (2000, 2.5)]
+
+
+async def test_point_archiver_cutoff():
+    point_archiver = PointArchiver(
+        db_client=MockDBClient(),  # type: ignore
+        age=24 * 60 * 60,
+        clock=FixedClock(datetime(2022, 3, 12, 13, 41, tzinfo=timezone.utc)),  # type: ignore
+    )
+
+    # Only whole days are archived
+    assert point_archiver.cutoff() == datetime(2022, 3, 11, tzinfo=timezone.utc)
+
+
+async def test_point_archiver_read():
+    day = datetime(2022, 3, 11, tzinfo=timezone.utc)
+    start = to_epoch_milliseconds(day)
+    point_archiver = PointArchiver(
+        db_client=MockDBClient(
+            return_fetchall=[
+                {
+                    "data": encode_archive(
+                        asset_id=1,
+                        points=[(start + 1000, 1.0), (start + 2000, 2.0)],
+                        scale=8,
+                    )
+                },
+            ]
+        ),  # type: ignore
+    )
+
+    asset_history = await point_archiver.read(
+        asset_id=1, asset_name="EURUSD", since=day + timedelta(seconds=1)
+    )
+
+    assert [(asset_point.time, asset_point.value) for asset_point in asset_history] == [
+        (start + 2000, 2.0)
+    ]
+    assert all(asset_point.assetName == "EURUSD" for asset_point in asset_history)
@@ -0,0 +1,38 @@
+from ws_assets.models.asset import Asset, AssetPointRecord
+from ws_assets.tools.asset_registry import AssetSnapshot
+from ws_assets.tools.quote_cache import QuoteCache
+
+
+async def test_quote_cache():
+    quote_cache = QuoteCache()
+    quote_cache.update(
+        [
+            AssetPointRecord("EURUSD", 2000, 1, 1.1),
+            AssetPointRecord("USDJPY", 2000, 2, 110.0),
+        ]
+    )
+
+    frame = quote_cache.frame([1, 3])
+    assert frame.payload == (
+        b'{"action":"quote","message":{"points":'
+        b'[{"assetName":"EURUSD","time":2000,"assetId":1,"value":1.1}]}}'
+    )
+
+    # Frames are reused until the next tick
+    assert quote_cache.frame([1, 3]) is frame
+
+    # Points of a slower previous tick don't replace newer ones
+    quote_cache.update(
+        [
+            AssetPointRecord("EURUSD", 1000, 1, 1.0),
+            AssetPointRecord("EURUSD", 3000, 1, 1.2),
+        ]
+    )
+    asset_point = quote_cache.get(1)
+    assert asset_point is not None and asset_point.value == 1.2
+    assert quote_cache.frame([1, 3]) is not frame
+
+    quote_cache.retain_assets(AssetSnapshot([Asset(id=2, name="USDJPY")]))
+
+    assert quote_cache.get(1) is None
+    assert quote_cache.get(2) is not None
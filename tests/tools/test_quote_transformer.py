@@ -0,0 +1,75 @@
+from typing import Dict, List
+
+import numpy as np
+
+from tests.conftest import get_asset_processor, get_response_text, set_assets
+from ws_assets.tools.asset_processor import AssetProcessor
+from ws_assets.tools.asset_registry import AssetSnapshot
+from ws_assets.tools.quote_transformer import QuoteBatch, QuoteTransformer
+
+
+def get_rates() -> List[dict]:
+    asset_processor: AssetProcessor = get_asset_processor()
+    asset_points: Dict[str, List[dict]] = asset_processor._parse_asset_text(
+        text=get_response_text()
+    )
+
+    return asset_points["Rates"]
+
+
+async def test_transform():
+    asset_processor: AssetProcessor = get_asset_processor()
+    set_assets(asset_processor, {1: "EURUSD", 2: "AUDCAD"})
+    assets: AssetSnapshot = asset_processor.asset_registry.snapshot
+
+    # Pip size is only known for EURUSD
+    quotes: QuoteBatch = QuoteTransformer(pip_sizes={"EURUSD": 0.0001}).transform(
+        rates=get_rates(), assets=assets
+    )
+
+    assert len(quotes) == 2
+    assert quotes.asset_names == ["EURUSD", "AUDCAD"]
+    assert quotes.asset_ids.tolist() == [1, 2]
+    assert quotes.mids.tolist() == [
+        (1.09107 + 1.0913) / 2,
+        (0.92935 + 0.9302) / 2,
+    ]
+    assert np.allclose(quotes.spreads, [1.0913 - 1.09107, 0.9302 - 0.92935])
+    assert np.isclose(quotes.spread_pips[0], 2.3)
+    assert np.isnan(quotes.spread_pips[1])
+
+
+async def test_transform_layout_cached():
+    asset_processor: AssetProcessor = get_asset_processor()
+    set_assets(asset_processor, {1: "EURUSD"})
+    assets: AssetSnapshot = asset_processor.asset_registry.snapshot
+
+    quote_transformer = QuoteTransformer()
+    quote_transformer.transform(rates=get_rates(), assets=assets)
+    positions: List[int] = quote_transformer._positions
+
+    quote_transformer.transform(rates=get_rates(), assets=assets)
+    assert quote_transformer._positions is positions
+
+    # Feed layout changed
+    quotes: QuoteBatch = quote_transformer.transform(
+        rates=get_rates()[::-1], assets=assets
+    )
+    assert quote_transformer._positions is not positions
+    assert quotes.asset_names == ["EURUSD"]
+
+    # Snapshot changed
+    set_assets(asset_processor, {1: "EURUSD", 2: "USOil"})
+    quotes = quote_transformer.transform(
+        rates=get_rates(), assets=asset_processor.asset_registry.snapshot
+    )
+    assert quotes.asset_names == ["EURUSD", "USOil"]
+
+
+async def test_transform_empty():
+    quotes: QuoteBatch = QuoteTransformer().transform(
+        rates=[], assets=AssetSnapshot([])
+    )
+
+    assert len(quotes) == 0
+    assert quotes.mids.tolist() == []
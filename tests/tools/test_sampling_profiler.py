@@ -0,0 +1,28 @@
+import asyncio
+import time
+
+import pytest
+
+from ws_assets.exceptions import ServiceOverloadedError
+from ws_assets.tools.sampling_profiler import SamplingProfiler
+
+
+def busy_function():
+    time.sleep(0.2)
+
+
+async def test_sampling_profiler():
+    profiler = SamplingProfiler(interval=0.001)
+    profile = asyncio.create_task(profiler.profile(duration=0.1))
+
+    # Only one profile at a time
+    await asyncio.sleep(0)
+    with pytest.raises(ServiceOverloadedError):
+        await profiler.profile(duration=0.1)
+
+    # The event loop thread is sampled
+    busy_function()
+    stacks: str = await profile
+
+    assert "busy_function (test_sampling_profiler.py" in stacks
+    assert "test_sampling_profiler (test_sampling_profiler.py" in stacks
@@ -0,0 +1,158 @@
+import os
+from datetime import timedelta
+from typing import List
+
+import numpy as np
+from sqlalchemy.dialects import postgresql  # type: ignore
+
+from tests.conftest import get_asset_processor, set_assets
+from ws_assets.models.asset import AssetPointRecord
+from ws_assets.tools.asset_processor import AssetProcessor
+from ws_assets.tools.clock import EPOCH
+from ws_assets.tools.mocks.mock_db_client import MockDBClient
+from ws_assets.tools.tick_journal import TickJournal
+from ws_assets.tools.tick_replayer import TickReplayer
+
+
+def write_journal(path: str, ticks: int):
+    # Small growth, so the file is remapped a few times
+    with TickJournal(path=path, growth=64) as journal:
+        for i in range(ticks):
+            journal.append(
+                asset_ids=np.array([1, 2, 3]),
+                time=1647092464000 + i * 1000,
+                bids=np.array([1.0, 2.0, 3.0]) + i,
+                asks=np.array([1.5, 2.5, 3.5]) + i,
+            )
+
+
+async def test_tick_journal(tmp_path):
+    path: str = str(tmp_path / "ticks.bin")
+    write_journal(path=path, ticks=10)
+
+    with TickJournal(path=path) as journal:
+        assert journal.count == 30
+
+        records: np.ndarray = journal.read(since=1647092466000, until=1647092468000)
+        ticks: list = list(journal.iterate_ticks(records))
+
+    assert [time for time, _ in ticks] == [1647092466000, 1647092467000]
+    assert ticks[0][1]["asset_id"].tolist() == [1, 2, 3]
+    assert ticks[0][1]["bid"].tolist() == [3.0, 4.0, 5.0]
+    assert ticks[1][1]["ask"].tolist() == [4.5, 5.5, 6.5]
+
+
+async def test_tick_journal_read_ticks(tmp_path):
+    path: str = str(tmp_path / "ticks.bin")
+    write_journal(path=path, ticks=10)
+
+    with TickJournal(path=path) as journal:
+        # Chunks end in the middle of ticks, which are still read whole
+        ticks: list = list(
+            journal.read_ticks(since=1647092465000, until=1647092472000, chunk_size=4)
+        )
+        expected: list = list(
+            journal.iterate_ticks(
+                journal.read(since=1647092465000, until=1647092472000)
+            )
+        )
+
+    assert [time for time, _ in ticks] == [time for time, _ in expected]
+    assert all(
+        np.array_equal(records, expected_records)
+        for (_, records), (_, expected_records) in zip(ticks, expected)
+    )
+    assert [len(records) for _, records in ticks] == [3] * 7
+
+
+async def test_tick_journal_rotation(tmp_path):
+    path: str = str(tmp_path / "ticks.bin")
+
+    # Header and 4 ticks of 3 records fit
+    with TickJournal(path=path, growth=64, max_size=16 + 12 * 28, backups=2) as journal:
+        for i in range(10):
+            journal.append(
+                asset_ids=np.array([1, 2, 3]),
+                time=1647092464000 + i * 1000,
+                bids=np.array([1.0, 2.0, 3.0]),
+                asks=np.array([1.5, 2.5, 3.5]),
+            )
+
+    assert os.path.getsize(path) <= 16 + 12 * 28
+    assert not os.path.exists(f"{path}.3")
+
+    # Oldest ticks are deleted, others are split between files by whole ticks
+    times: List[List[int]] = []
+    for journal_path in (f"{path}.2", f"{path}.1", path):
+        with TickJournal(path=journal_path) as journal:
+            times.append(sorted(set(journal.read()["time"].tolist())))
+
+    assert [len(tick_times) for tick_times in times] == [4, 4, 2]
+    assert times[2][-1] == 1647092464000 + 9 * 1000
+
+
+async def test_tick_replayer(tmp_path):
+    path: str = str(tmp_path / "ticks.bin")
+    write_journal(path=path, ticks=5)
+
+    asset_processor: AssetProcessor = get_asset_processor(return_fetchall=[])
+    set_assets(asset_processor, {1: "EURUSD", 2: "USDJPY"})
+
+    results: List[AssetPointRecord] = []
+
+    async def mock_subscription_handler(asset_points: List[AssetPointRecord]):
+        results.extend(asset_points)
+
+    asset_processor._subscription_handler = mock_subscription_handler
+
+    with TickJournal(path=path) as journal:
+        ticks: int = await TickReplayer(
+            journal=journal, asset_processor=asset_processor, speed=0
+        ).replay(since=1647092465000)
+
+    assert ticks == 4
+    assert [asset_point.assetName for asset_point in results[:2]] == [
+        "EURUSD",
+        "USDJPY",
+    ]
+    assert results[0] == AssetPointRecord("EURUSD", 1647092465000, 1, 2.25)
+
+
+async def test_tick_replayer_backfill(tmp_path):
+    path: str = str(tmp_path / "ticks.bin")
+    write_journal(path=path, ticks=5)
+
+    asset_processor: AssetProcessor = get_asset_processor(return_fetchall=[])
+    asset_processor._copy_min_rows = 4
+    set_assets(asset_processor, {1: "EURUSD", 2: "USDJPY"})
+
+    queries: list = []
+
+    async def mock_fetchall(query, *args, **kwargs) -> list:
+        queries.append(query)
+
+        return []
+
+    db_client: MockDBClient = asset_processor._db_client  # type: ignore
+    db_client.fetchall = mock_fetchall  # type: ignore
+
+    with TickJournal(path=path) as journal:
+        ticks: int = await TickReplayer(
+            journal=journal, asset_processor=asset_processor, speed=0
+        ).backfill(batch_size=4)
+
+    assert ticks == 5
+
+    # Two full batches are copied, the last tick is inserted
+    assert [len(records) for records in db_client.copied_records] == [4, 4]
+    assert db_client.copied_records[0][0] == (
+        1,
+        1.25,
+        EPOCH + timedelta(seconds=1647092464),
+    )
+    assert len(queries) == 1
+
+    # Existing points are replaced
+    assert "ON CONFLICT (asset_id, ts) DO UPDATE SET value = excluded.value" in str(
+        queries[0].compile(dialect=postgresql.dialect())
+    )
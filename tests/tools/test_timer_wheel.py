@@ -0,0 +1,57 @@
+import asyncio
+from typing import List
+
+from ws_assets.tools.timer_wheel import TimerWheel
+
+
+async def test_timer_wheel():
+    loop = asyncio.get_running_loop()
+    fired: List[tuple] = []
+
+    timer_wheel: TimerWheel[str] = TimerWheel(
+        callback=lambda items: fired.extend((item, loop.time()) for item in items),
+        resolution=0.01,
+        slots=8,
+    )
+
+    time_begin: float = loop.time()
+
+    timer_wheel.schedule("a", 0.03)
+    timer_wheel.schedule("b", 0.05)
+    # Longer than a full turn of the wheel
+    timer_wheel.schedule("c", 0.12)
+    timer_wheel.schedule("d", 0.02)
+    timer_wheel.cancel("d")
+
+    assert len(timer_wheel) == 3 and "a" in timer_wheel
+
+    await asyncio.sleep(0.2)
+
+    assert [item for item, _ in fired] == ["a", "b", "c"]
+
+    # Items never fire early
+    for (item, fire_time), delay in zip(fired, (0.03, 0.05, 0.12)):
+        assert fire_time - time_begin >= delay
+
+    # Task stops without items
+    assert not timer_wheel and timer_wheel._task is None
+
+
+async def test_timer_wheel_reschedule():
+    fired: List[str] = []
+
+    timer_wheel: TimerWheel[str] = TimerWheel(callback=fired.extend, resolution=0.01)
+
+    timer_wheel.schedule("a", 0.01)
+    timer_wheel.schedule("a", 0.05)
+
+    await asyncio.sleep(0.03)
+    assert fired == []
+
+    await asyncio.sleep(0.05)
+    assert fired == ["a"]
+
+    timer_wheel.schedule("b", 1)
+    timer_wheel.clear()
+
+    assert not timer_wheel and timer_wheel._task is None
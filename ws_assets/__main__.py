@@ -1,13 +1,92 @@
+import asyncio
+import signal
+from types import FrameType
+from typing import Optional, Type
+
 import uvicorn  # type: ignore
+from fastapi import FastAPI
+from loguru import logger
 
+from ws_assets.main import drain
 from ws_assets.settings import Settings
 
+
+class Server(uvicorn.Server):
+    """
+    uvicorn server which drains the app before closing connections.
+
+    uvicorn closes websockets before the shutdown event, so clients
+    wouldn't receive reconnect hints from the shutdown handler.
+    """
+
+    def __init__(self, config: uvicorn.Config):
+        super().__init__(config=config)
+
+        self._drain_task: Optional[asyncio.Task] = None
+
+    def handle_exit(self, sig: signal.Signals, frame: FrameType):
+        # The second signal shuts the server down right away
+        if self._drain_task is not None:
+            return super().handle_exit(sig, frame)
+
+        self._drain_task = asyncio.ensure_future(self._drain_and_exit(sig, frame))
+
+    async def _drain_and_exit(self, sig: signal.Signals, frame: FrameType):
+        try:
+            # Find the app under middlewares added by uvicorn
+            app = self.config.loaded_app
+            while not isinstance(app, FastAPI) and hasattr(app, "app"):
+                app = app.app
+
+            await drain(app)
+        except Exception as e:
+            logger.exception(e)
+        finally:
+            super().handle_exit(sig, frame)
+
+
+def get_websocket_protocol(settings: Settings) -> Type[asyncio.Protocol]:
+    """
+    uvicorn websocket protocol which negotiates permessage-deflate (RFC 7692) with settings.
+
+    uvicorn only turns the extension on or off, so its parameters are set here.
+    """
+
+    # Imported here, since websockets is only required to serve
+    from uvicorn.protocols.websockets.websockets_impl import WebSocketProtocol
+    from websockets.extensions.permessage_deflate import ServerPerMessageDeflateFactory
+
+    class DeflateWebSocketProtocol(WebSocketProtocol):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+
+            self.available_extensions = [
+                ServerPerMessageDeflateFactory(
+                    server_no_context_takeover=not settings.COMPRESSION_CONTEXT_TAKEOVER,
+                    # Window is only announced if it is smaller than the default
+                    server_max_window_bits=settings.COMPRESSION_WINDOW_BITS
+                    if settings.COMPRESSION_WINDOW_BITS < 15
+                    else None,
+                    compress_settings={"level": settings.COMPRESSION_LEVEL},
+                )
+            ]
+
+    return DeflateWebSocketProtocol
+
+
 if __name__ == "__main__":
     settings = Settings()
 
-    uvicorn.run(
-        "ws_assets.main:create_app",
-        host=settings.HOST,
-        port=settings.PORT,
-        log_level="error",
-    )
+    Server(
+        config=uvicorn.Config(
+            "ws_assets.main:create_app",
+            factory=True,
+            host=settings.HOST,
+            port=settings.PORT,
+            log_level="error",
+            ws=get_websocket_protocol(settings)
+            if settings.COMPRESSION_ENABLED
+            else "auto",
+            ws_per_message_deflate=settings.COMPRESSION_ENABLED,
+        )
+    ).run()
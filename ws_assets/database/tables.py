@@ -1,9 +1,13 @@
-from datetime import datetime
+from datetime import datetime, timezone
 
 import sqlalchemy as sa  # type: ignore
+from sqlalchemy.dialects.postgresql import TIMESTAMP  # type: ignore
 
 metadata = sa.MetaData()
 
+# Channel of notifications about changes in the asset table
+ASSET_NOTIFICATION_CHANNEL: str = "asset_changed"
+
 
 class Tables:
     asset = sa.Table(
@@ -16,7 +20,17 @@ class Tables:
             autoincrement=True,
             comment="Unique asset ID.",
         ),
-        sa.Column("symbol", sa.TEXT, nullable=False, comment="Asset name."),
+        sa.Column(
+            "symbol", sa.TEXT, nullable=False, unique=True, comment="Asset name."
+        ),
+        sa.Column(
+            "tracked",
+            sa.BOOLEAN,
+            nullable=False,
+            default=True,
+            server_default=sa.true(),
+            comment="Points of the asset are received and stored.",
+        ),
     )
 
     point = sa.Table(
@@ -39,10 +53,32 @@ class Tables:
         sa.Column("value", sa.FLOAT, nullable=False, comment="Asset value."),
         sa.Column(
             "ts",
-            sa.TIMESTAMP,
+            TIMESTAMP(timezone=True, precision=3),
             nullable=False,
-            default=datetime.utcnow,
+            default=lambda: datetime.now(timezone.utc),
             comment="Point timestamp.",
             index=True,
         ),
+        # Retried ticks and backfills replace points instead of duplicating them
+        sa.UniqueConstraint("asset_id", "ts", name="uq_Point_asset_id_ts"),
+    )
+
+    point_archive = sa.Table(
+        "PointArchive",
+        metadata,
+        sa.Column(
+            "asset_id",
+            sa.INTEGER,
+            sa.ForeignKey("Asset.id", ondelete="CASCADE"),
+            primary_key=True,
+            comment="Asset ID.",
+        ),
+        sa.Column("day", sa.DATE, primary_key=True, comment="UTC day of the points."),
+        sa.Column("count", sa.INTEGER, nullable=False, comment="Number of points."),
+        sa.Column(
+            "data",
+            sa.LargeBinary,
+            nullable=False,
+            comment="Points as a deflate-compressed binary history frame.",
+        ),
     )
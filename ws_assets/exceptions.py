@@ -1,3 +1,6 @@
+from typing import List, Optional
+
+
 # request
 class RequestParsingError(Exception):
     def __init__(self, request_type: str):
@@ -6,6 +9,35 @@ class RequestParsingError(Exception):
         )
 
 
+class RateLimitExceededError(Exception):
+    def __init__(self, rate: float):
+        super().__init__(f"Too many requests. Allowed rate: {rate} requests per second")
+
+
+class ServiceOverloadedError(Exception):
+    def __init__(self, resource: str):
+        super().__init__(f"Service is overloaded: {resource}. Try again later")
+
+
+# subscriptions
+class NotSubscribedError(Exception):
+    def __init__(self, asset_id: int, window: Optional[int] = None):
+        if window is None:
+            super().__init__(f"Not subscribed to asset ID: {asset_id}")
+        else:
+            super().__init__(
+                f"Not subscribed to indicators of asset ID: {asset_id} with window: {window}"
+            )
+
+
+# indicators
+class UnknownIndicatorWindowError(Exception):
+    def __init__(self, window: int, windows: List[int]):
+        super().__init__(
+            f"Unknown indicator window: {window}. Available windows: {windows}"
+        )
+
+
 # assets
 class AssetHTTPRequestError(Exception):
     def __init__(self, code: int, response: str):
@@ -18,6 +50,12 @@ class AssetParsingError(Exception):
     def __init__(self, text: str):
         super().__init__(f"Failed to parse asset data from: {text}")
 
+        self.text: str = text
+
+    def __reduce__(self):
+        # Raised in offload worker processes, so it is pickled with the original text
+        return AssetParsingError, (self.text,)
+
 
 class UnknownAssetIDError(Exception):
     def __init__(self, asset_id: int):
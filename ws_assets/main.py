@@ -1,23 +1,185 @@
 import asyncio
-from pathlib import Path
+from contextlib import contextmanager
+from typing import Iterator
 
 from aiohttp import ClientSession
 from fastapi import FastAPI
 from loguru import logger
 
-from alembic import command
-from alembic.config import Config
-from ws_assets.routers import api_v1_router, ui_router
+from ws_assets.migrations import apply_migrations
+from ws_assets.routers import api_v1_router, get_ui_router
 from ws_assets.settings import Settings
+from ws_assets.tools.admission import AdmissionController
 from ws_assets.tools.asset_processor import AssetProcessor
+from ws_assets.tools.asset_registry import AssetRegistry
+from ws_assets.tools.circuit_breaker import CircuitBreaker
 from ws_assets.tools.db_client import DBClient
+from ws_assets.tools.history_buffer import HistoryBuffers
+from ws_assets.tools.indicators import IndicatorEngine
+from ws_assets.tools.loop_monitor import LoopLagMonitor
+from ws_assets.tools.offload import Offloader
+from ws_assets.tools.point_archive import PointArchiver
+from ws_assets.tools.quote_cache import QuoteCache
+from ws_assets.tools.readiness import Readiness
+from ws_assets.tools.sampling_profiler import SamplingProfiler
+from ws_assets.tools.tick_journal import TickJournal
+from ws_assets.tools.tick_spans import TickSpans
 from ws_assets.tools.websocket_manager import WebsocketManager
 
 
+async def warm_up(app: FastAPI):
+    """
+    Prepare the service in background, so the server starts answering health checks at once.
+
+    Websockets are refused until the service is ready.
+    """
+
+    settings: Settings = app.state.Settings
+    readiness: Readiness = app.state.Readiness
+
+    try:
+        # Alembic runs synchronously, so it is moved off the event loop
+        if settings.AUTO_APPLY_MIGRATIONS:
+            with readiness.stage("migrations"):
+                await asyncio.get_running_loop().run_in_executor(
+                    None, apply_migrations, settings.POSTGRESQL_DSN
+                )
+
+        # DBClient
+        with readiness.stage("database"):
+            await app.state.DBClient.open()
+
+        if settings.POSTGRESQL_PRE_PING == "background":
+            app.state.Tasks.append(
+                asyncio.create_task(app.state.DBClient.start_checking_pool())
+            )
+
+        if settings.POSTGRESQL_REPLICA_DSN:
+            app.state.Tasks.append(
+                asyncio.create_task(app.state.DBClient.start_checking_replica())
+            )
+
+        # AssetRegistry
+        with readiness.stage("assets"):
+            await app.state.AssetRegistry.refresh()
+
+        # First subscribes after a restart are answered from memory, like later ones
+        with readiness.stage("history"):
+            await app.state.AssetProcessor.warm_up_history()
+
+        app.state.Tasks.append(
+            asyncio.create_task(app.state.AssetRegistry.start_refreshing())
+        )
+
+        if settings.ASSETS_LISTEN_NOTIFICATIONS:
+            app.state.Tasks.append(
+                asyncio.create_task(app.state.AssetRegistry.start_listening())
+            )
+
+        # PointArchiver
+        if app.state.PointArchiver is not None:
+            app.state.Tasks.append(
+                asyncio.create_task(app.state.PointArchiver.start_compacting())
+            )
+
+        # TickJournal
+        if app.state.TickJournal is not None:
+            app.state.TickJournal.open()
+
+        # AssetProcessor
+        app.state.ReceivingTask = asyncio.create_task(
+            app.state.AssetProcessor.start_receiving_asset_points()
+        )
+
+        readiness.set_ready()
+    except Exception as e:
+        logger.exception(e)
+        readiness.set_failed(error=e)
+
+
+@contextmanager
+def log_errors(stage: str) -> Iterator[None]:
+    """Log an error of a shutdown stage, so the following stages still run."""
+
+    try:
+        yield
+    except Exception as e:
+        logger.exception(f"Failed to {stage}: {e}")
+
+
+async def drain(app: FastAPI):
+    """
+    Stop the service in order: stop accepting websockets, stop receiving points,
+    finish points in progress, disconnect clients, then close resources.
+
+    Safe to call more than once.
+    """
+
+    if app.state.IsDrained:
+        return
+
+    app.state.IsDrained = True
+
+    settings: Settings = app.state.Settings
+
+    # New websockets are rejected from now on
+    app.state.WebsocketManager.is_accepting = False
+    app.state.Readiness.is_ready = False
+
+    if app.state.WarmUpTask is not None:
+        app.state.WarmUpTask.cancel()
+
+        # Warm-up may hold database connections, so it stops before they are closed
+        try:
+            await app.state.WarmUpTask
+        except asyncio.CancelledError:
+            pass
+
+    # AssetProcessor
+    if app.state.ReceivingTask is not None:
+        app.state.ReceivingTask.cancel()
+
+    with log_errors("finish ticks"):
+        await app.state.AssetProcessor.wait_for_ticks(timeout=settings.DRAIN_TIMEOUT)
+
+    # TickJournal
+    if app.state.TickJournal is not None:
+        with log_errors("close the tick journal"):
+            app.state.TickJournal.close()
+
+    # WebsocketManager
+    with log_errors("disconnect clients"):
+        await app.state.WebsocketManager.drain(
+            reconnect_delay=settings.DRAIN_RECONNECT_DELAY,
+            reconnect_jitter=settings.DRAIN_RECONNECT_JITTER,
+        )
+
+    # Background tasks
+    for task in app.state.Tasks:
+        task.cancel()
+
+    # DBClient, which is not connected if warm-up failed or was cancelled
+    with log_errors("close the database client"):
+        await app.state.DBClient.close()
+
+    # Offloader
+    if app.state.Offloader is not None:
+        with log_errors("stop the offload pool"):
+            app.state.Offloader.close()
+
+    # ClientSession
+    with log_errors("close the HTTP session"):
+        await app.state.ClientSession.close()
+
+
 def create_app() -> FastAPI:
     try:
+        # Readiness
+        readiness = Readiness()
+
         # App
         app = FastAPI(title="WS Asset")
+        app.state.Readiness = readiness
 
         # Settings
         app.state.Settings = Settings()
@@ -26,76 +188,173 @@ def create_app() -> FastAPI:
         app.include_router(api_v1_router)
 
         if app.state.Settings.ENABLE_UI:
-            app.include_router(ui_router)
+            app.include_router(get_ui_router())
 
         # Middlewares
         ...
 
+        # Offloader
+        app.state.Offloader = (
+            Offloader(
+                kind=app.state.Settings.OFFLOAD_EXECUTOR,
+                workers=app.state.Settings.OFFLOAD_WORKERS,
+                min_size=app.state.Settings.OFFLOAD_MIN_SIZE,
+            )
+            if app.state.Settings.OFFLOAD_EXECUTOR != "off"
+            else None
+        )
+
         # WebsocketManager
-        app.state.WebsocketManager = WebsocketManager()
+        app.state.WebsocketManager = WebsocketManager(
+            batch_window=app.state.Settings.BROADCAST_BATCH_WINDOW,
+            max_subscriptions=app.state.Settings.MAX_SUBSCRIPTIONS_PER_CLIENT,
+            offloader=app.state.Offloader,
+            throttle_resolution=app.state.Settings.THROTTLE_RESOLUTION,
+            history_scale=app.state.Settings.HISTORY_SCALE,
+        )
+
+        # AdmissionController
+        app.state.AdmissionController = AdmissionController(
+            websocket_manager=app.state.WebsocketManager,
+            max_connections=app.state.Settings.MAX_CONNECTIONS,
+            max_broadcast_latency=app.state.Settings.MAX_BROADCAST_LATENCY,
+            max_memory=app.state.Settings.MAX_MEMORY * 1024 * 1024,
+            readiness=readiness,
+        )
 
         # DBClient
         app.state.DBClient = DBClient(
             dsn=app.state.Settings.POSTGRESQL_DSN,
             pool_size=app.state.Settings.POSTGRESQL_POOL_SIZE,
+            replica_dsn=app.state.Settings.POSTGRESQL_REPLICA_DSN,
+            replica_max_lag=app.state.Settings.POSTGRESQL_REPLICA_MAX_LAG,
+            replica_check_interval=app.state.Settings.POSTGRESQL_REPLICA_CHECK_INTERVAL,
+            max_overflow=app.state.Settings.POSTGRESQL_MAX_OVERFLOW,
+            pool_timeout=app.state.Settings.POSTGRESQL_POOL_TIMEOUT,
+            pool_recycle=app.state.Settings.POSTGRESQL_POOL_RECYCLE,
+            pre_ping=app.state.Settings.POSTGRESQL_PRE_PING,
+            health_check_interval=app.state.Settings.POSTGRESQL_HEALTH_CHECK_INTERVAL,
         )
 
         # ClientSession
         app.state.ClientSession = ClientSession()
 
+        # AssetRegistry
+        app.state.AssetRegistry = AssetRegistry(
+            db_client=app.state.DBClient,
+            refresh_interval=app.state.Settings.ASSETS_REFRESH_INTERVAL,
+        )
+
+        # Subscriptions to removed assets are dropped on every pod
+        app.state.AssetRegistry.add_listener(app.state.WebsocketManager.retain_assets)
+
+        # IndicatorEngine
+        app.state.IndicatorEngine = IndicatorEngine(
+            windows=app.state.Settings.INDICATOR_WINDOWS
+        )
+        app.state.AssetRegistry.add_listener(app.state.IndicatorEngine.retain_assets)
+
+        # QuoteCache
+        app.state.QuoteCache = QuoteCache()
+        app.state.AssetRegistry.add_listener(app.state.QuoteCache.retain_assets)
+
+        # HistoryBuffers
+        app.state.HistoryBuffers = (
+            HistoryBuffers(window=app.state.Settings.HISTORY_BUFFER_WINDOW)
+            if app.state.Settings.HISTORY_BUFFER_WINDOW
+            else None
+        )
+
+        if app.state.HistoryBuffers is not None:
+            app.state.AssetRegistry.add_listener(app.state.HistoryBuffers.retain_assets)
+
+        # TickJournal
+        app.state.TickJournal = (
+            TickJournal(
+                path=app.state.Settings.TICK_JOURNAL_PATH,
+                max_size=app.state.Settings.TICK_JOURNAL_MAX_SIZE * 1024 * 1024,
+                backups=app.state.Settings.TICK_JOURNAL_BACKUPS,
+            )
+            if app.state.Settings.TICK_JOURNAL_PATH
+            else None
+        )
+
+        # PointArchiver
+        app.state.PointArchiver = (
+            PointArchiver(
+                db_client=app.state.DBClient,
+                age=app.state.Settings.POINT_ARCHIVE_AGE,
+                interval=app.state.Settings.POINT_ARCHIVE_INTERVAL,
+                scale=app.state.Settings.POINT_ARCHIVE_SCALE,
+            )
+            if app.state.Settings.POINT_ARCHIVE_AGE
+            else None
+        )
+
+        # Monitoring
+        app.state.LoopLagMonitor = LoopLagMonitor(
+            interval=app.state.Settings.LOOP_LAG_INTERVAL,
+            warning_lag=app.state.Settings.LOOP_LAG_WARNING,
+        )
+        app.state.SamplingProfiler = SamplingProfiler()
+
         # AssetProcessor
         app.state.AssetProcessor = AssetProcessor(
             dsn=app.state.Settings.ASSETS_DSN,
             http_client=app.state.ClientSession,
             db_client=app.state.DBClient,
             subscription_handler=app.state.WebsocketManager.broadcast_asset_points,
+            asset_registry=app.state.AssetRegistry,
+            auto_discovery=app.state.Settings.ASSETS_AUTO_DISCOVERY,
+            max_concurrent_history_fetches=app.state.Settings.MAX_CONCURRENT_HISTORY_FETCHES,
+            history_queue_timeout=app.state.Settings.HISTORY_QUEUE_TIMEOUT,
+            history_cache_ttl=app.state.Settings.HISTORY_CACHE_TTL,
+            history_buffers=app.state.HistoryBuffers,
+            quote_cache=app.state.QuoteCache,
+            indicator_engine=app.state.IndicatorEngine,
+            indicator_handler=app.state.WebsocketManager.broadcast_indicators,
+            tick_journal=app.state.TickJournal,
+            circuit_breaker=CircuitBreaker(
+                failure_threshold=app.state.Settings.ASSETS_FAILURE_THRESHOLD,
+                base_delay=app.state.Settings.ASSETS_BACKOFF_DELAY,
+                max_delay=app.state.Settings.ASSETS_BACKOFF_MAX_DELAY,
+                jitter=app.state.Settings.ASSETS_BACKOFF_JITTER,
+            ),
+            status_handler=app.state.WebsocketManager.broadcast_status,
+            error_log_interval=app.state.Settings.ASSETS_ERROR_LOG_INTERVAL,
+            tick_spans=TickSpans() if app.state.Settings.TICK_SPANS_ENABLED else None,
+            offloader=app.state.Offloader,
+            copy_min_rows=app.state.Settings.POSTGRESQL_COPY_MIN_ROWS,
+            point_archiver=app.state.PointArchiver,
+            pip_sizes=app.state.Settings.ASSET_PIP_SIZES,
         )
 
+        # Background tasks
+        app.state.ReceivingTask = None
+        app.state.Tasks = []
+        app.state.IsDrained = False
+
+        app.state.WarmUpTask = None
+
         # Event handlers
         @app.on_event("startup")
         async def startup():
-            try:
-                # Alembic
-                if app.state.Settings.AUTO_APPLY_MIGRATIONS:
-                    alembic_config = Config(
-                        str(Path(__file__).parent.parent / "alembic.ini")
-                    )
-                    alembic_config.set_main_option(
-                        "script_location", str(Path(__file__).parent.parent / "alembic")
-                    )
-                    alembic_config.set_main_option(
-                        "sqlalchemy.url", app.state.Settings.POSTGRESQL_DSN
-                    )
-                    command.upgrade(alembic_config, "head")
-
-                # DBClient
-                await app.state.DBClient.open()
-
-                # AssetProcessor
-                await app.state.AssetProcessor.fetch_assets()
-                asyncio.create_task(
-                    app.state.AssetProcessor.start_receiving_asset_points()
+            if app.state.Settings.LOOP_LAG_INTERVAL:
+                app.state.Tasks.append(
+                    asyncio.create_task(app.state.LoopLagMonitor.start_sampling())
                 )
 
-                print(
-                    f"Running on http://{app.state.Settings.HOST}:{app.state.Settings.PORT}"
-                )
-            except Exception as e:
-                logger.exception(e)
+            app.state.WarmUpTask = asyncio.create_task(warm_up(app))
 
-                raise e
+            print(
+                f"Running on http://{app.state.Settings.HOST}:{app.state.Settings.PORT}"
+            )
 
         @app.on_event("shutdown")
         async def shutdown():
             try:
-                # DBClient
-                await app.state.DBClient.close()
-
-                # ClientSession
-                await app.state.ClientSession.close()
-
-                # Give a chance to coroutines to finish their tasks
-                await asyncio.sleep(2)
+                # Usually the app is already drained by the server before connections are closed
+                await drain(app)
             except Exception as e:
                 logger.exception(e)
 
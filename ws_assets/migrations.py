@@ -0,0 +1,33 @@
+"""
+Apply database migrations and exit.
+
+Run with `python -m ws_assets.migrations`, e.g. as an init container,
+so pods don't run migrations on every start.
+"""
+from pathlib import Path
+
+from ws_assets.settings import Settings
+
+_ROOT: Path = Path(__file__).parent.parent
+
+
+def apply_migrations(dsn: str):
+    """
+    Upgrade the database to the latest revision. Blocks, so run it in a thread from async code.
+
+    :param dsn: PostgreSQL DSN.
+    """
+
+    # Alembic is only needed here, so it isn't imported on every start
+    from alembic import command
+    from alembic.config import Config
+
+    alembic_config = Config(str(_ROOT / "alembic.ini"))
+    alembic_config.set_main_option("script_location", str(_ROOT / "alembic"))
+    alembic_config.set_main_option("sqlalchemy.url", dsn)
+
+    command.upgrade(alembic_config, "head")
+
+
+if __name__ == "__main__":
+    apply_migrations(dsn=Settings().POSTGRESQL_DSN)
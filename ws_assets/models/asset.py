@@ -1,8 +1,10 @@
+from dataclasses import dataclass
 from datetime import datetime
 
 from pydantic import Field, validator
 
 from ws_assets.models.base import BaseClass
+from ws_assets.tools.clock import to_epoch_milliseconds
 
 
 class Asset(BaseClass):
@@ -12,13 +14,29 @@ class Asset(BaseClass):
 
 class AssetPoint(BaseClass):
     assetName: str = Field(description="Asset name.")
-    time: int = Field(description="Point timestamp.")
+    time: int = Field(description="Point timestamp in epoch milliseconds.")
     assetId: int = Field(description="Asset ID.")
     value: float = Field(description="Asset value.")
 
     @validator("time", pre=True)
     def timestamp(cls, v, values, **kwargs):
         if isinstance(v, datetime):
-            return v.timestamp()
+            return to_epoch_milliseconds(v)
 
         return v
+
+
+@dataclass
+class AssetPointRecord:
+    """
+    Lightweight counterpart of `AssetPoint` used on ingest, broadcast and history paths.
+
+    Has no validation and is serialized by orjson directly into the `AssetPoint` schema.
+    """
+
+    __slots__ = ("assetName", "time", "assetId", "value")
+
+    assetName: str
+    time: int
+    assetId: int
+    value: float
@@ -1,21 +1,73 @@
-from typing import Any, Optional
+from typing import Dict, List, Optional, Tuple
 from uuid import UUID, uuid4
 
-from pydantic import Field, validator
 from starlette.websockets import WebSocket
 
-from ws_assets.models.base import BaseClass
+from ws_assets.models.asset import AssetPointRecord
+from ws_assets.tools.history_codec import HistoryEncoding
 
 
-class WebsocketClient(BaseClass):
-    client_id: UUID = Field(description="Client ID.", default_factory=uuid4)
-    websocket: Any = Field(description="Client websocket.")
-    is_subscribed: bool = Field(False, description="Flag for subscription.")
-    asset_id: Optional[int] = Field(description="Asset ID.")
+class WebsocketClient:
+    __slots__ = (
+        "client_id",
+        "websocket",
+        "asset_ids",
+        "indicator_keys",
+        "batch",
+        "history_encoding",
+        "throttles",
+    )
 
-    @validator("websocket", pre=True)
-    def websocket_type(cls, v, values, **kwargs):
-        if not isinstance(v, WebSocket):
-            raise TypeError(f"Unexpected websocket type: {type(v).__name__}")
+    def __init__(self, websocket: WebSocket):
+        """
+        Websocket client and its subscriptions.
 
-        return v
+        A plain slotted class, since there is one instance per connection
+        and nothing to validate except the websocket type.
+
+        :param websocket: client websocket.
+        """
+
+        if not isinstance(websocket, WebSocket):
+            raise TypeError(f"Unexpected websocket type: {type(websocket).__name__}")
+
+        self.client_id: UUID = uuid4()
+        self.websocket: WebSocket = websocket
+
+        # Subscriptions in order of creation
+        self.asset_ids: List[int] = []
+
+        # Indicator subscriptions as (asset id, window) in order of creation
+        self.indicator_keys: List[Tuple[int, int]] = []
+
+        # Receive all points of a tick in one frame
+        self.batch: bool = False
+
+        # Encoding of history frames
+        self.history_encoding: HistoryEncoding = "full"
+
+        # Subscriptions with a maximum update rate by asset id
+        self.throttles: Dict[int, "ThrottledSubscription"] = {}
+
+
+class ThrottledSubscription:
+    __slots__ = ("client", "asset_id", "interval", "asset_point", "next_send")
+
+    def __init__(self, client: WebsocketClient, asset_id: int, interval: float):
+        """
+        Subscription which receives only the latest point at most once per `interval`.
+
+        :param client: subscribed client.
+        :param asset_id: asset id.
+        :param interval: minimal time in seconds between updates.
+        """
+
+        self.client: WebsocketClient = client
+        self.asset_id: int = asset_id
+        self.interval: float = interval
+
+        # Latest point which wasn't sent yet
+        self.asset_point: Optional[AssetPointRecord] = None
+
+        # Event loop time before which the next update can't be sent
+        self.next_send: float = 0.0
@@ -0,0 +1,13 @@
+from typing import Dict, Optional
+
+from pydantic import Field
+
+from ws_assets.models.base import BaseClass
+
+
+class ReadinessStatus(BaseClass):
+    ready: bool = Field(description="Service accepts websockets.")
+    error: Optional[str] = Field(description="Error which stopped the startup.")
+    startup: Dict[str, float] = Field(
+        description="Duration of every finished startup stage in seconds."
+    )
@@ -0,0 +1,45 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from pydantic import Field
+
+from ws_assets.models.base import BaseClass
+
+
+class Indicator(BaseClass):
+    assetName: str = Field(description="Asset name.")
+    time: int = Field(description="Timestamp of the last point in epoch milliseconds.")
+    assetId: int = Field(description="Asset ID.")
+    window: int = Field(description="Window length in ticks.")
+    sma: float = Field(description="Simple moving average.")
+    ema: float = Field(description="Exponential moving average.")
+    volatility: Optional[float] = Field(
+        description="Standard deviation of log returns. Null until there are 2 returns."
+    )
+
+
+@dataclass
+class IndicatorRecord:
+    """
+    Lightweight counterpart of `Indicator` used on the ingest and broadcast paths.
+
+    Has no validation and is serialized by orjson directly into the `Indicator` schema.
+    """
+
+    __slots__ = (
+        "assetName",
+        "time",
+        "assetId",
+        "window",
+        "sma",
+        "ema",
+        "volatility",
+    )
+
+    assetName: str
+    time: int
+    assetId: int
+    window: int
+    sma: float
+    ema: float
+    volatility: Optional[float]
@@ -0,0 +1,26 @@
+from typing import Dict
+
+from pydantic import Field
+
+from ws_assets.models.base import BaseClass
+
+
+class StageStatus(BaseClass):
+    count: int = Field(description="Number of measured ticks.")
+    total: float = Field(description="Total duration in seconds.")
+    max: float = Field(description="Longest duration in seconds.")
+    last: float = Field(description="Duration in the last tick in seconds.")
+
+
+class LoopStatus(BaseClass):
+    samples: int = Field(description="Number of event loop lag samples.")
+    lag: float = Field(description="Last event loop lag in seconds.")
+    averageLag: float = Field(
+        description="Exponential moving average of event loop lag in seconds."
+    )
+    maxLag: float = Field(
+        description="Longest event loop lag in seconds since the previous request."
+    )
+    stages: Dict[str, StageStatus] = Field(
+        description="Durations of tick stages. Empty if spans are disabled."
+    )
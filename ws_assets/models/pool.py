@@ -0,0 +1,18 @@
+from pydantic import Field
+
+from ws_assets.models.base import BaseClass
+
+
+class PoolStatus(BaseClass):
+    size: int = Field(description="Number of connections kept in the pool.")
+    checkedIn: int = Field(description="Idle connections in the pool.")
+    checkedOut: int = Field(description="Connections in use.")
+    overflow: int = Field(description="Connections in use above the pool size.")
+    checkouts: int = Field(description="Total number of checkouts.")
+    checkoutWaitTotal: float = Field(
+        description="Total time in seconds spent waiting for a connection."
+    )
+    checkoutWaitMax: float = Field(
+        description="Longest time in seconds spent waiting for a connection."
+    )
+    timeouts: int = Field(description="Number of checkouts which timed out.")
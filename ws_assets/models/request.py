@@ -1,13 +1,37 @@
-from typing import Literal
+from typing import List, Literal, Optional
 
-from pydantic import Field, validator
+from pydantic import Extra, Field, validator
 
 from ws_assets.models.base import BaseClass
 
 
+# connection
+class ConnectionParameters(BaseClass):
+    """Parameters passed in the query string of the websocket URL."""
+
+    batch: bool = Field(
+        False, description="Receive `points` frames instead of `point` frames."
+    )
+    history: Literal["full", "delta", "binary"] = Field(
+        "full",
+        description="Encoding of history: `asset_history`, `asset_history_delta` or binary frames.",
+    )
+
+    class Config:
+        # Browsers and proxies may add their own parameters
+        extra = Extra.ignore
+
+
 # generic
 class GenericRequest(BaseClass):
-    action: Literal["assets", "subscribe"] = Field(description="Action type.")
+    action: Literal[
+        "assets",
+        "subscribe",
+        "unsubscribe",
+        "subscribe_indicators",
+        "unsubscribe_indicators",
+        "quote",
+    ] = Field(description="Action type.")
     message: dict = Field(description="Message object.")
 
 
@@ -29,8 +53,58 @@ class RequestAssets(BaseClass):
 # "subscribe"
 class RequestSubscribeMessage(BaseClass):
     assetId: int = Field(description="Asset ID.")
+    maxRate: Optional[float] = Field(
+        description="Maximum number of updates per second. Only the latest point is sent.",
+        gt=0,
+    )
+    snapshot: bool = Field(
+        False,
+        description="Send the latest point as a `quote` frame instead of the history.",
+    )
 
 
 class RequestSubscribe(BaseClass):
     action: Literal["subscribe"] = Field(description="Action type.")
     message: RequestSubscribeMessage = Field(description="Message object.")
+
+
+# "unsubscribe"
+class RequestUnsubscribeMessage(BaseClass):
+    assetId: int = Field(description="Asset ID.")
+
+
+class RequestUnsubscribe(BaseClass):
+    action: Literal["unsubscribe"] = Field(description="Action type.")
+    message: RequestUnsubscribeMessage = Field(description="Message object.")
+
+
+# "subscribe_indicators"
+class RequestSubscribeIndicatorsMessage(BaseClass):
+    assetId: int = Field(description="Asset ID.")
+    window: int = Field(description="Window length in ticks.")
+
+
+class RequestSubscribeIndicators(BaseClass):
+    action: Literal["subscribe_indicators"] = Field(description="Action type.")
+    message: RequestSubscribeIndicatorsMessage = Field(description="Message object.")
+
+
+# "unsubscribe_indicators"
+class RequestUnsubscribeIndicators(BaseClass):
+    action: Literal["unsubscribe_indicators"] = Field(description="Action type.")
+    message: RequestSubscribeIndicatorsMessage = Field(description="Message object.")
+
+
+# "quote"
+class RequestQuoteMessage(BaseClass):
+    assetIds: List[int] = Field(description="Asset IDs.", min_items=1, max_items=100)
+
+
+class RequestQuote(BaseClass):
+    action: Literal["quote"] = Field(description="Action type.")
+    message: RequestQuoteMessage = Field(description="Message object.")
+
+
+# admin
+class RequestAddAssets(BaseClass):
+    names: List[str] = Field(description="Asset names.", min_items=1)
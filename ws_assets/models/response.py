@@ -1,9 +1,10 @@
-from typing import List, Literal
+from typing import List, Literal, Optional
 
 from pydantic import Field
 
 from ws_assets.models.asset import Asset, AssetPoint
 from ws_assets.models.base import BaseClass
+from ws_assets.models.indicator import Indicator
 
 
 # "error"
@@ -39,6 +40,87 @@ class ResponseSubscribeHistory(BaseClass):
     message: ResponseSubscribeHistoryMessage = Field(description="Message object.")
 
 
+class ResponseHistoryDeltaMessage(BaseClass):
+    assetName: str = Field(description="Asset name.")
+    assetId: int = Field(description="Asset ID.")
+    count: int = Field(description="Number of points.")
+    start: Optional[int] = Field(
+        description="Time of the first point in epoch milliseconds."
+    )
+    interval: Optional[int] = Field(
+        description="Time between points in milliseconds if points are evenly spaced."
+    )
+    timeDeltas: List[int] = Field(
+        description="Differences between times of consecutive points if there is no interval."
+    )
+    scale: int = Field(description="Number of decimal digits in values.")
+    base: Optional[int] = Field(
+        description="Value of the first point multiplied by `10 ** scale`."
+    )
+    valueDeltas: List[int] = Field(
+        description="Differences between consecutive values multiplied by `10 ** scale`."
+    )
+
+
+class ResponseHistoryDelta(BaseClass):
+    action: Literal["asset_history_delta"] = Field(
+        "asset_history_delta", description="Action type."
+    )
+    message: ResponseHistoryDeltaMessage = Field(description="Message object.")
+
+
 class ResponseSubscribePoint(BaseClass):
     action: Literal["point"] = Field("point", description="Action type.")
     message: AssetPoint = Field(description="Message object.")
+
+
+class ResponseSubscribePointsMessage(BaseClass):
+    points: List[AssetPoint] = Field(description="List of asset points.")
+
+
+class ResponseSubscribePoints(BaseClass):
+    action: Literal["points"] = Field("points", description="Action type.")
+    message: ResponseSubscribePointsMessage = Field(description="Message object.")
+
+
+# "quote"
+class ResponseQuoteMessage(BaseClass):
+    points: List[AssetPoint] = Field(
+        description="Latest point of every requested asset which has points."
+    )
+
+
+class ResponseQuote(BaseClass):
+    action: Literal["quote"] = Field("quote", description="Action type.")
+    message: ResponseQuoteMessage = Field(description="Message object.")
+
+
+# "subscribe_indicators"
+class ResponseIndicator(BaseClass):
+    action: Literal["indicator"] = Field("indicator", description="Action type.")
+    message: Indicator = Field(description="Message object.")
+
+
+# "reconnect"
+class ResponseReconnectMessage(BaseClass):
+    delay: float = Field(description="Time in seconds to wait before reconnecting.")
+
+
+class ResponseReconnect(BaseClass):
+    action: Literal["reconnect"] = Field("reconnect", description="Action type.")
+    message: ResponseReconnectMessage = Field(description="Message object.")
+
+
+# "status"
+class ResponseStatusMessage(BaseClass):
+    stale: bool = Field(
+        description="Quotes are not updated because the upstream is unavailable."
+    )
+    lastUpdate: Optional[int] = Field(
+        description="Time of the last received tick in epoch milliseconds."
+    )
+
+
+class ResponseStatus(BaseClass):
+    action: Literal["status"] = Field("status", description="Action type.")
+    message: ResponseStatusMessage = Field(description="Message object.")
@@ -0,0 +1,86 @@
+"""
+Backfill the database from a tick journal.
+
+Run with `python -m ws_assets.replay <journal>... [--speed N|max] [--since MS] [--until MS]`.
+Rotated journals are passed oldest first, e.g. `ticks.bin.1 ticks.bin`.
+"""
+import argparse
+import asyncio
+from typing import List, Optional
+
+from aiohttp import ClientSession
+
+from ws_assets.models.asset import AssetPointRecord
+from ws_assets.settings import Settings
+from ws_assets.tools.asset_processor import AssetProcessor
+from ws_assets.tools.asset_registry import AssetRegistry
+from ws_assets.tools.db_client import DBClient
+from ws_assets.tools.tick_journal import TickJournal
+from ws_assets.tools.tick_replayer import TickReplayer
+
+
+async def discard(asset_points: List[AssetPointRecord]):
+    """Points are not broadcast during backfills."""
+
+
+async def backfill(paths: List[str], speed: float, since: int, until: Optional[int]):
+    settings = Settings()
+
+    async with DBClient(
+        dsn=settings.POSTGRESQL_DSN, pool_size=settings.POSTGRESQL_POOL_SIZE
+    ) as db_client, ClientSession() as http_client:
+        asset_registry = AssetRegistry(db_client=db_client)
+        await asset_registry.refresh()
+
+        asset_processor = AssetProcessor(
+            dsn=settings.ASSETS_DSN,
+            http_client=http_client,
+            db_client=db_client,
+            subscription_handler=discard,
+            asset_registry=asset_registry,
+            copy_min_rows=settings.POSTGRESQL_COPY_MIN_ROWS,
+        )
+
+        for path in paths:
+            with TickJournal(path=path) as journal:
+                tick_replayer = TickReplayer(
+                    journal=journal, asset_processor=asset_processor, speed=speed
+                )
+
+                # Without delays ticks are written in large batches
+                if speed:
+                    await tick_replayer.replay(
+                        since=since, until=until, broadcast=False
+                    )
+                else:
+                    await tick_replayer.backfill(since=since, until=until)
+
+
+def parse_speed(value: str) -> float:
+    return 0 if value == "max" else float(value)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "journals", nargs="+", help="Paths to tick journals, oldest first."
+    )
+    parser.add_argument(
+        "--speed",
+        type=parse_speed,
+        default=0,
+        help="Replay speed relative to real time or `max`.",
+    )
+    parser.add_argument(
+        "--since", type=int, default=0, help="Start time in epoch milliseconds."
+    )
+    parser.add_argument(
+        "--until", type=int, default=None, help="End time in epoch milliseconds."
+    )
+    args = parser.parse_args()
+
+    asyncio.run(
+        backfill(
+            paths=args.journals, speed=args.speed, since=args.since, until=args.until
+        )
+    )
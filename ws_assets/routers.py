@@ -1,20 +1,20 @@
 from fastapi import APIRouter
 
-from ws_assets.routes import ui
-from ws_assets.routes.api.v1 import websocket
-from ws_assets.settings import Settings
-
-settings = Settings()
+from ws_assets.routes.api.v1 import admin, health, websocket
 
 # /api/v1
 api_v1_router = APIRouter(tags=["v1"])
 
-for endpoints in (websocket,):
+for endpoints in (websocket, admin, health):
     api_v1_router.include_router(endpoints.router, prefix="/api/v1")
 
 
-# UI
-ui_router = APIRouter(tags=["UI"])
+def get_ui_router() -> APIRouter:
+    """Create the UI router. The page is rarely enabled, so it is imported on demand."""
+
+    from ws_assets.routes import ui
+
+    ui_router = APIRouter(tags=["UI"])
+    ui_router.include_router(ui.router)
 
-for endpoints in (ui,):
-    ui_router.include_router(endpoints.router)
+    return ui_router
@@ -0,0 +1,125 @@
+import hmac
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from starlette.responses import PlainTextResponse
+from starlette.status import (
+    HTTP_401_UNAUTHORIZED,
+    HTTP_404_NOT_FOUND,
+    HTTP_409_CONFLICT,
+)
+
+from ws_assets.exceptions import ServiceOverloadedError, UnknownAssetIDError
+from ws_assets.models.asset import Asset
+from ws_assets.models.monitoring import LoopStatus, StageStatus
+from ws_assets.models.pool import PoolStatus
+from ws_assets.models.request import RequestAddAssets
+from ws_assets.tools.asset_processor import AssetProcessor
+from ws_assets.tools.asset_registry import AssetRegistry
+from ws_assets.tools.db_client import DBClient
+from ws_assets.tools.loop_monitor import LoopLagMonitor
+from ws_assets.tools.sampling_profiler import SamplingProfiler
+from ws_assets.tools.tick_spans import TickSpans
+
+
+async def verify_admin_token(request: Request, authorization: str = Header("")):
+    """Check the bearer token. Admin API is disabled if the token isn't configured."""
+
+    admin_token: str = request.app.state.Settings.ADMIN_TOKEN
+
+    if not admin_token:
+        raise HTTPException(
+            status_code=HTTP_404_NOT_FOUND, detail="Admin API is disabled."
+        )
+    if not hmac.compare_digest(
+        authorization.encode(), f"Bearer {admin_token}".encode()
+    ):
+        raise HTTPException(status_code=HTTP_401_UNAUTHORIZED, detail="Invalid token.")
+
+
+router = APIRouter(
+    prefix="/admin", tags=["Admin"], dependencies=[Depends(verify_admin_token)]
+)
+
+
+@router.get("/assets", response_model=List[Asset])
+async def get_assets(request: Request):
+    """List tracked assets."""
+
+    asset_registry: AssetRegistry = request.app.state.AssetRegistry
+
+    return (await asset_registry.refresh()).assets
+
+
+@router.post("/assets", response_model=List[Asset])
+async def add_assets(request: Request, data: RequestAddAssets):
+    """Start tracking assets. Unknown assets are created."""
+
+    asset_registry: AssetRegistry = request.app.state.AssetRegistry
+
+    return await asset_registry.add_assets(names=data.names)
+
+
+@router.delete("/assets/{asset_id}", status_code=204)
+async def remove_asset(request: Request, asset_id: int):
+    """Stop tracking an asset and drop subscriptions to it."""
+
+    asset_registry: AssetRegistry = request.app.state.AssetRegistry
+
+    try:
+        await asset_registry.remove_asset(asset_id=asset_id)
+    except UnknownAssetIDError as e:
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail=str(e))
+
+
+@router.get("/pool", response_model=Dict[str, PoolStatus])
+async def get_pool_status(request: Request):
+    """State of database connection pools."""
+
+    db_client: DBClient = request.app.state.DBClient
+
+    return db_client.get_pool_status()
+
+
+@router.get("/loop", response_model=LoopStatus)
+async def get_loop_status(request: Request):
+    """Event loop lag and durations of tick stages."""
+
+    loop_monitor: LoopLagMonitor = request.app.state.LoopLagMonitor
+    asset_processor: AssetProcessor = request.app.state.AssetProcessor
+    tick_spans: Optional[TickSpans] = asset_processor.tick_spans
+
+    return LoopStatus(
+        samples=loop_monitor.samples,
+        lag=loop_monitor.last,
+        averageLag=loop_monitor.average,
+        maxLag=loop_monitor.reset_max(),
+        stages={
+            stage: StageStatus(
+                count=statistics.count,
+                total=statistics.total,
+                max=statistics.max,
+                last=statistics.last,
+            )
+            for stage, statistics in (
+                tick_spans.stages.items() if tick_spans is not None else ()
+            )
+        },
+    )
+
+
+@router.post("/profile", response_class=PlainTextResponse)
+async def profile(request: Request, duration: float = Query(5, gt=0)):
+    """
+    Profile the event loop for `duration` seconds.
+
+    Returns stacks in the collapsed format for flame graph tools.
+    """
+
+    profiler: SamplingProfiler = request.app.state.SamplingProfiler
+    max_duration: float = request.app.state.Settings.PROFILER_MAX_DURATION
+
+    try:
+        return await profiler.profile(duration=min(duration, max_duration))
+    except ServiceOverloadedError as e:
+        raise HTTPException(status_code=HTTP_409_CONFLICT, detail=str(e))
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Request
+from starlette.responses import JSONResponse
+from starlette.status import HTTP_200_OK, HTTP_503_SERVICE_UNAVAILABLE
+
+from ws_assets.models.health import ReadinessStatus
+from ws_assets.tools.readiness import Readiness
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router.get("/live")
+async def get_liveness(request: Request):
+    """Fails only if the startup has failed, so the pod is restarted."""
+
+    readiness: Readiness = request.app.state.Readiness
+
+    return JSONResponse(
+        {"error": readiness.error},
+        status_code=HTTP_503_SERVICE_UNAVAILABLE if readiness.error else HTTP_200_OK,
+    )
+
+
+@router.get("/ready", response_model=ReadinessStatus)
+async def get_readiness(request: Request):
+    """Succeeds once assets are loaded and until the service starts draining."""
+
+    readiness: Readiness = request.app.state.Readiness
+
+    return JSONResponse(
+        ReadinessStatus(
+            ready=readiness.is_ready, error=readiness.error, startup=readiness.stages
+        ).dict(),
+        status_code=HTTP_200_OK if readiness.is_ready else HTTP_503_SERVICE_UNAVAILABLE,
+    )
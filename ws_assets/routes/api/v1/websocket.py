@@ -1,59 +1,226 @@
-from typing import List
+from typing import Callable, Coroutine, Dict, Optional, Tuple, Type
 from uuid import UUID
 
+import orjson
 from fastapi import APIRouter
 from loguru import logger
+from starlette.status import WS_1012_SERVICE_RESTART, WS_1013_TRY_AGAIN_LATER
 from starlette.websockets import WebSocket, WebSocketDisconnect
 
-from ws_assets.exceptions import RequestParsingError
-from ws_assets.models.asset import Asset, AssetPoint
-from ws_assets.models.request import GenericRequest, RequestAssets, RequestSubscribe
+from ws_assets.exceptions import RateLimitExceededError, RequestParsingError
+from ws_assets.models.base import BaseClass
+from ws_assets.models.indicator import IndicatorRecord
+from ws_assets.models.request import (
+    GenericRequest,
+    RequestAssets,
+    RequestQuote,
+    RequestSubscribe,
+    RequestSubscribeIndicators,
+    RequestUnsubscribe,
+    RequestUnsubscribeIndicators,
+)
+from ws_assets.settings import Settings
+from ws_assets.tools.admission import AdmissionController
 from ws_assets.tools.asset_processor import AssetProcessor
+from ws_assets.tools.frames import SharedFrame
+from ws_assets.tools.rate_limiter import RateLimiter
 from ws_assets.tools.websocket_manager import WebsocketManager
 
 router = APIRouter(tags=["Websocket"])
 
 
+async def handle_assets(
+    request: RequestAssets,
+    client_id: UUID,
+    websocket_manager: WebsocketManager,
+    asset_processor: AssetProcessor,
+):
+    assets: SharedFrame = await asset_processor.fetch_assets_frame()
+    await websocket_manager.send_assets(client_id=client_id, assets=assets)
+
+
+async def handle_subscribe(
+    request: RequestSubscribe,
+    client_id: UUID,
+    websocket_manager: WebsocketManager,
+    asset_processor: AssetProcessor,
+):
+    asset_id: int = request.message.assetId
+
+    # Over the limit, the request fails before history is queried
+    websocket_manager.check_subscription_limit(client_id=client_id, asset_id=asset_id)
+
+    # The latest point is answered from memory without the history query
+    if request.message.snapshot:
+        await websocket_manager.send_quotes(
+            client_id=client_id,
+            quotes=asset_processor.get_quotes_frame(asset_ids=[asset_id]),
+        )
+    else:
+        await websocket_manager.send_asset_history(
+            client_id=client_id,
+            asset_history=await asset_processor.fetch_asset_history(asset_id=asset_id),
+            asset_id=asset_id,
+            asset_name=asset_processor.get_asset_name(asset_id=asset_id),
+        )
+
+    # If `send_asset_history` executes for a relatively long time,
+    # some points may be lost
+    websocket_manager.add_subscription(
+        client_id=client_id, asset_id=asset_id, max_rate=request.message.maxRate
+    )
+
+
+async def handle_quote(
+    request: RequestQuote,
+    client_id: UUID,
+    websocket_manager: WebsocketManager,
+    asset_processor: AssetProcessor,
+):
+    await websocket_manager.send_quotes(
+        client_id=client_id,
+        quotes=asset_processor.get_quotes_frame(asset_ids=request.message.assetIds),
+    )
+
+
+async def handle_unsubscribe(
+    request: RequestUnsubscribe,
+    client_id: UUID,
+    websocket_manager: WebsocketManager,
+    asset_processor: AssetProcessor,
+):
+    websocket_manager.remove_subscription(
+        client_id=client_id, asset_id=request.message.assetId
+    )
+
+
+async def handle_subscribe_indicators(
+    request: RequestSubscribeIndicators,
+    client_id: UUID,
+    websocket_manager: WebsocketManager,
+    asset_processor: AssetProcessor,
+):
+    asset_processor.get_asset_name(asset_id=request.message.assetId)
+    asset_processor.indicator_engine.check_window(window=request.message.window)
+
+    websocket_manager.add_indicator_subscription(
+        client_id=client_id,
+        asset_id=request.message.assetId,
+        window=request.message.window,
+    )
+
+    # Current values, so the client doesn't wait for the next tick
+    indicator: Optional[IndicatorRecord] = asset_processor.indicator_engine.get(
+        asset_id=request.message.assetId, window=request.message.window
+    )
+
+    if indicator is not None:
+        await websocket_manager.send_indicator(client_id=client_id, indicator=indicator)
+
+
+async def handle_unsubscribe_indicators(
+    request: RequestUnsubscribeIndicators,
+    client_id: UUID,
+    websocket_manager: WebsocketManager,
+    asset_processor: AssetProcessor,
+):
+    websocket_manager.remove_indicator_subscription(
+        client_id=client_id,
+        asset_id=request.message.assetId,
+        window=request.message.window,
+    )
+
+
+# Request model and handler for every action
+HANDLERS: Dict[str, Tuple[Type[BaseClass], Callable[..., Coroutine]]] = {
+    "assets": (RequestAssets, handle_assets),
+    "subscribe": (RequestSubscribe, handle_subscribe),
+    "unsubscribe": (RequestUnsubscribe, handle_unsubscribe),
+    "subscribe_indicators": (RequestSubscribeIndicators, handle_subscribe_indicators),
+    "unsubscribe_indicators": (
+        RequestUnsubscribeIndicators,
+        handle_unsubscribe_indicators,
+    ),
+    "quote": (RequestQuote, handle_quote),
+}
+
+
+async def receive_request(websocket: WebSocket) -> dict:
+    """Receive a text or binary message and decode it with orjson."""
+
+    message: dict = await websocket.receive()
+
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message["code"])
+
+    raw_data = orjson.loads(
+        message["text"] if message.get("text") is not None else message["bytes"]
+    )
+
+    if not isinstance(raw_data, dict):
+        raise RequestParsingError(request_type=type(raw_data).__name__)
+
+    return raw_data
+
+
 @router.websocket("/websocket")
 async def websocket_endpoint(websocket: WebSocket):
     websocket_manager: WebsocketManager = websocket.app.state.WebsocketManager
     asset_processor: AssetProcessor = websocket.app.state.AssetProcessor
+    settings: Settings = websocket.app.state.Settings
+    admission_controller: AdmissionController = websocket.app.state.AdmissionController
+
+    # Websockets are accepted before they are refused, since closing a handshake
+    # is answered with HTTP 403 and clients never receive the close code
+
+    # Service is shutting down, clients should connect to another instance
+    if not websocket_manager.is_accepting:
+        await websocket.accept()
+        await websocket.close(code=WS_1012_SERVICE_RESTART)
+
+        return
+
+    # Refusing a new websocket is cheaper than degrading existing clients
+    refuse_reason: Optional[str] = admission_controller.refuse_reason()
+
+    if refuse_reason is not None:
+        logger.warning(f"Websocket is refused: {refuse_reason}")
+        await websocket.accept()
+        await websocket.close(code=WS_1013_TRY_AGAIN_LATER)
+
+        return
 
     client_id: UUID = await websocket_manager.add_client(websocket=websocket)
 
+    # Requests are rejected before any work is done,
+    # so a single connection can't monopolize the event loop or the database
+    rate_limiter = RateLimiter(
+        rate=settings.REQUEST_RATE_LIMIT, burst=settings.REQUEST_RATE_BURST
+    )
+
     while True:
         try:
-            raw_data: dict = await websocket.receive_json()
+            raw_data: dict = await receive_request(websocket)
+
+            if not rate_limiter.acquire():
+                raise RateLimitExceededError(rate=settings.REQUEST_RATE_LIMIT)
 
-            # Parse request
-            if not isinstance(raw_data, dict):
-                raise RequestParsingError(request_type=type(raw_data).__name__)
+            # Parse request in a single pass with a model of the action
+            action = raw_data.get("action")
 
-            data: GenericRequest = GenericRequest(**raw_data)
+            if not isinstance(action, str) or action not in HANDLERS:
+                # Raises a validation error with a list of permitted actions
+                GenericRequest(**raw_data)
+
+            model, handler = HANDLERS[action]
 
             # Handle request logic
-            if data.action == "assets":
-                request_assets: RequestAssets = RequestAssets(**data.dict())
-
-                assets: List[Asset] = await asset_processor.fetch_assets()
-                await websocket_manager.send_assets(client_id=client_id, assets=assets)
-            elif data.action == "subscribe":
-                request_subscribe: RequestSubscribe = RequestSubscribe(**data.dict())
-
-                asset_history: List[
-                    AssetPoint
-                ] = await asset_processor.fetch_asset_history(
-                    asset_id=request_subscribe.message.assetId
-                )
-                await websocket_manager.send_asset_history(
-                    client_id=client_id, asset_history=asset_history
-                )
-
-                # If `send_asset_history` executes for a relatively long time,
-                # some points may be lost
-                websocket_manager.add_subscription(
-                    client_id=client_id, asset_id=request_subscribe.message.assetId
-                )
+            await handler(
+                request=model.parse_obj(raw_data),
+                client_id=client_id,
+                websocket_manager=websocket_manager,
+                asset_processor=asset_processor,
+            )
         except WebSocketDisconnect:
             websocket_manager.remove_client(client_id=client_id)
 
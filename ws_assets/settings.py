@@ -1,4 +1,4 @@
-from typing import List, Literal
+from typing import Dict, List, Literal
 
 from pydantic import BaseSettings, Field
 
@@ -17,11 +17,269 @@ class Settings(BaseSettings):
         description="Automatically apply database migrations on service start.",
     )
 
+    ADMIN_TOKEN: str = Field(
+        "",
+        env="WS_ASSETS_ADMIN_TOKEN",
+        description="Bearer token of the admin API. Admin API is disabled if empty.",
+    )
+
     # Assets
     ASSETS_DSN: str = Field(
         "https://ratesjson.fxcm.com/DataDisplayer",
         description="A full path to the endpoint which returns asset data.",
     )
+    ASSETS_REFRESH_INTERVAL: float = Field(
+        "60",
+        env="WS_ASSETS_ASSETS_REFRESH_INTERVAL",
+        description="Time in seconds between reloads of the asset list from the database.",
+        gt=0,
+    )
+    ASSETS_AUTO_DISCOVERY: bool = Field(
+        "FALSE",
+        env="WS_ASSETS_ASSETS_AUTO_DISCOVERY",
+        description="Start tracking new assets from the asset endpoint automatically.",
+    )
+    ASSET_PIP_SIZES: Dict[str, float] = Field(
+        {},
+        env="WS_ASSETS_ASSET_PIP_SIZES",
+        description='Pip size by asset name used to express spreads in pips, e.g. {"EURUSD": 0.0001, "USDJPY": 0.01}.',
+    )
+    ASSETS_LISTEN_NOTIFICATIONS: bool = Field(
+        "TRUE",
+        env="WS_ASSETS_ASSETS_LISTEN_NOTIFICATIONS",
+        description="Reload the asset list on database notifications about its changes.",
+    )
+    ASSETS_FAILURE_THRESHOLD: int = Field(
+        "3",
+        env="WS_ASSETS_ASSETS_FAILURE_THRESHOLD",
+        description="Number of consecutive failed requests after which the asset endpoint is backed off.",
+        ge=1,
+    )
+    ASSETS_BACKOFF_DELAY: float = Field(
+        "1",
+        env="WS_ASSETS_ASSETS_BACKOFF_DELAY",
+        description="First delay in seconds before probing the asset endpoint. Doubles after every failed probe.",
+        gt=0,
+    )
+    ASSETS_BACKOFF_MAX_DELAY: float = Field(
+        "60",
+        env="WS_ASSETS_ASSETS_BACKOFF_MAX_DELAY",
+        description="Maximum delay in seconds before probing the asset endpoint.",
+        gt=0,
+    )
+    ASSETS_BACKOFF_JITTER: float = Field(
+        "0.5",
+        env="WS_ASSETS_ASSETS_BACKOFF_JITTER",
+        description="Fraction of the backoff delay which is random.",
+        ge=0,
+        le=1,
+    )
+    ASSETS_ERROR_LOG_INTERVAL: float = Field(
+        "60",
+        env="WS_ASSETS_ASSETS_ERROR_LOG_INTERVAL",
+        description="Minimal time in seconds between logged errors of the asset endpoint. Not limited if 0.",
+        ge=0,
+    )
+
+    # Compression
+    COMPRESSION_ENABLED: bool = Field(
+        "TRUE",
+        env="WS_ASSETS_COMPRESSION_ENABLED",
+        description="Allow clients to negotiate permessage-deflate compression of frames.",
+    )
+    COMPRESSION_LEVEL: int = Field(
+        "6",
+        env="WS_ASSETS_COMPRESSION_LEVEL",
+        description="Deflate compression level (0-9).",
+        ge=0,
+        le=9,
+    )
+    COMPRESSION_WINDOW_BITS: int = Field(
+        "15",
+        env="WS_ASSETS_COMPRESSION_WINDOW_BITS",
+        description="Maximum deflate window size in bits (9-15).",
+        ge=9,
+        le=15,
+    )
+    COMPRESSION_CONTEXT_TAKEOVER: bool = Field(
+        "TRUE",
+        env="WS_ASSETS_COMPRESSION_CONTEXT_TAKEOVER",
+        description="Keep the compression context of the server between frames.",
+    )
+
+    # Requests
+    REQUEST_RATE_LIMIT: float = Field(
+        "5",
+        env="WS_ASSETS_REQUEST_RATE_LIMIT",
+        description="Maximum number of requests per second from a single connection.",
+        gt=0,
+    )
+    REQUEST_RATE_BURST: int = Field(
+        "10",
+        env="WS_ASSETS_REQUEST_RATE_BURST",
+        description="Maximum number of requests from a single connection in a burst.",
+        ge=1,
+    )
+
+    TICK_JOURNAL_PATH: str = Field(
+        "",
+        env="WS_ASSETS_TICK_JOURNAL_PATH",
+        description="Path to the journal of received quotes. Disabled if empty.",
+    )
+    TICK_JOURNAL_MAX_SIZE: int = Field(
+        "1024",
+        env="WS_ASSETS_TICK_JOURNAL_MAX_SIZE",
+        description="Maximum size of the journal in megabytes, after which it is rotated. Unlimited if 0.",
+        ge=0,
+    )
+    TICK_JOURNAL_BACKUPS: int = Field(
+        "1",
+        env="WS_ASSETS_TICK_JOURNAL_BACKUPS",
+        description="Number of rotated journals kept.",
+        ge=0,
+    )
+
+    # Indicators
+    INDICATOR_WINDOWS: List[int] = Field(
+        [20, 60],
+        env="WS_ASSETS_INDICATOR_WINDOWS",
+        description="Window lengths in ticks of moving averages and volatility, e.g. [20, 60]. Disabled if empty.",
+    )
+
+    # Admission
+    MAX_CONNECTIONS: int = Field(
+        "0",
+        env="WS_ASSETS_MAX_CONNECTIONS",
+        description="Maximum number of websocket clients. Unlimited if 0.",
+        ge=0,
+    )
+    MAX_SUBSCRIPTIONS_PER_CLIENT: int = Field(
+        "1",
+        env="WS_ASSETS_MAX_SUBSCRIPTIONS_PER_CLIENT",
+        description="Maximum number of subscriptions of a single client. New ones are rejected over the limit.",
+        ge=1,
+    )
+    MAX_CONCURRENT_HISTORY_FETCHES: int = Field(
+        "5",
+        env="WS_ASSETS_MAX_CONCURRENT_HISTORY_FETCHES",
+        description="Maximum number of history queries at once. Unlimited if 0.",
+        ge=0,
+    )
+    HISTORY_QUEUE_TIMEOUT: float = Field(
+        "1",
+        env="WS_ASSETS_HISTORY_QUEUE_TIMEOUT",
+        description="Time in seconds a history query waits for its turn. Rejected at once if 0.",
+        ge=0,
+    )
+    HISTORY_CACHE_TTL: float = Field(
+        "1",
+        env="WS_ASSETS_HISTORY_CACHE_TTL",
+        description="Time in seconds a history query result is reused for the same asset. Disabled if 0.",
+        ge=0,
+    )
+    HISTORY_BUFFER_WINDOW: int = Field(
+        "1800",
+        env="WS_ASSETS_HISTORY_BUFFER_WINDOW",
+        description="Time in seconds of recent history kept in memory for every asset and loaded on start. Disabled if 0.",
+        ge=0,
+    )
+    HISTORY_SCALE: int = Field(
+        "6",
+        env="WS_ASSETS_HISTORY_SCALE",
+        description="Number of decimal digits kept in values of delta and binary history frames.",
+        ge=0,
+        le=12,
+    )
+    MAX_BROADCAST_LATENCY: float = Field(
+        "0",
+        env="WS_ASSETS_MAX_BROADCAST_LATENCY",
+        description="Average broadcast duration in seconds above which new websockets are refused. Disabled if 0.",
+        ge=0,
+    )
+    MAX_MEMORY: int = Field(
+        "0",
+        env="WS_ASSETS_MAX_MEMORY",
+        description="Resident memory in megabytes above which new websockets are refused. Disabled if 0.",
+        ge=0,
+    )
+
+    # Broadcast
+    BROADCAST_BATCH_WINDOW: float = Field(
+        "0",
+        env="WS_ASSETS_BROADCAST_BATCH_WINDOW",
+        description="Time in seconds to accumulate points before a broadcast. Disabled if 0.",
+        ge=0,
+    )
+    THROTTLE_RESOLUTION: float = Field(
+        "0.1",
+        env="WS_ASSETS_THROTTLE_RESOLUTION",
+        description="Tick of the timer wheel which sends updates of subscriptions with `maxRate` in seconds.",
+        gt=0,
+    )
+
+    # Shutdown
+    DRAIN_TIMEOUT: float = Field(
+        "5",
+        env="WS_ASSETS_DRAIN_TIMEOUT",
+        description="Time in seconds to wait for points in progress during shutdown.",
+        ge=0,
+    )
+    DRAIN_RECONNECT_DELAY: float = Field(
+        "1",
+        env="WS_ASSETS_DRAIN_RECONNECT_DELAY",
+        description="Minimal time in seconds clients wait before reconnecting after shutdown.",
+        ge=0,
+    )
+    DRAIN_RECONNECT_JITTER: float = Field(
+        "10",
+        env="WS_ASSETS_DRAIN_RECONNECT_JITTER",
+        description="Maximum random time in seconds added to the reconnect delay.",
+        ge=0,
+    )
+
+    # Offload
+    OFFLOAD_EXECUTOR: Literal["thread", "process", "off"] = Field(
+        "process",
+        env="WS_ASSETS_OFFLOAD_EXECUTOR",
+        description="Worker pool which parses large rate pages and encodes large history frames.",
+    )
+    OFFLOAD_WORKERS: int = Field(
+        "2",
+        env="WS_ASSETS_OFFLOAD_WORKERS",
+        description="Number of workers in the offload pool.",
+        ge=1,
+    )
+    OFFLOAD_MIN_SIZE: int = Field(
+        "65536",
+        env="WS_ASSETS_OFFLOAD_MIN_SIZE",
+        description="Minimal size in bytes of a page or a frame to process in the offload pool.",
+        ge=0,
+    )
+
+    # Monitoring
+    LOOP_LAG_INTERVAL: float = Field(
+        "0.1",
+        env="WS_ASSETS_LOOP_LAG_INTERVAL",
+        description="Time in seconds between event loop lag samples. Disabled if 0.",
+        ge=0,
+    )
+    LOOP_LAG_WARNING: float = Field(
+        "0.1",
+        env="WS_ASSETS_LOOP_LAG_WARNING",
+        description="Event loop lag in seconds above which a warning is logged. Disabled if 0.",
+        ge=0,
+    )
+    TICK_SPANS_ENABLED: bool = Field(
+        "FALSE",
+        env="WS_ASSETS_TICK_SPANS_ENABLED",
+        description="Measure durations of tick stages.",
+    )
+    PROFILER_MAX_DURATION: float = Field(
+        "30",
+        env="WS_ASSETS_PROFILER_MAX_DURATION",
+        description="Maximum time in seconds of an on-demand event loop profile.",
+        gt=0,
+    )
 
     # Logging
     LOG_LEVEL: Literal[
@@ -37,7 +295,78 @@ class Settings(BaseSettings):
     POSTGRESQL_POOL_SIZE: int = Field(
         "10",
         env="WS_ASSETS_POSTGRESQL_POOL_SIZE",
-        description="PostgreSQL maximum pool size.",
+        description="Number of PostgreSQL connections kept in the pool.",
+    )
+    POSTGRESQL_MAX_OVERFLOW: int = Field(
+        "10",
+        env="WS_ASSETS_POSTGRESQL_MAX_OVERFLOW",
+        description="Number of PostgreSQL connections allowed above the pool size.",
+        ge=0,
+    )
+    POSTGRESQL_POOL_TIMEOUT: float = Field(
+        "30",
+        env="WS_ASSETS_POSTGRESQL_POOL_TIMEOUT",
+        description="Time in seconds to wait for a free PostgreSQL connection.",
+        gt=0,
+    )
+    POSTGRESQL_POOL_RECYCLE: int = Field(
+        "1800",
+        env="WS_ASSETS_POSTGRESQL_POOL_RECYCLE",
+        description="Maximum age of a PostgreSQL connection in seconds. Disabled if -1.",
+        ge=-1,
+    )
+    POSTGRESQL_PRE_PING: Literal["checkout", "background", "off"] = Field(
+        "background",
+        env="WS_ASSETS_POSTGRESQL_PRE_PING",
+        description="When PostgreSQL connections are checked: on every checkout, in background or never.",
+    )
+    POSTGRESQL_HEALTH_CHECK_INTERVAL: float = Field(
+        "10",
+        env="WS_ASSETS_POSTGRESQL_HEALTH_CHECK_INTERVAL",
+        description="Time in seconds between background checks of PostgreSQL connections.",
+        gt=0,
+    )
+    POSTGRESQL_REPLICA_DSN: str = Field(
+        "",
+        env="WS_ASSETS_POSTGRESQL_REPLICA_DSN",
+        description="PostgreSQL read replica DSN. Selects go to the primary if empty.",
+    )
+    POSTGRESQL_REPLICA_MAX_LAG: float = Field(
+        "5",
+        env="WS_ASSETS_POSTGRESQL_REPLICA_MAX_LAG",
+        description="Maximum replication lag in seconds to read from the replica.",
+        ge=0,
+    )
+    POSTGRESQL_REPLICA_CHECK_INTERVAL: float = Field(
+        "1",
+        env="WS_ASSETS_POSTGRESQL_REPLICA_CHECK_INTERVAL",
+        description="Time in seconds between replication lag checks.",
+        gt=0,
+    )
+    POSTGRESQL_COPY_MIN_ROWS: int = Field(
+        "1000",
+        env="WS_ASSETS_POSTGRESQL_COPY_MIN_ROWS",
+        description="Minimal number of points written with binary COPY instead of INSERT. COPY is disabled if 0.",
+        ge=0,
+    )
+    POINT_ARCHIVE_AGE: int = Field(
+        "0",
+        env="WS_ASSETS_POINT_ARCHIVE_AGE",
+        description="Age in seconds after which whole days of points are moved into the compressed archive. Disabled if 0.",
+        ge=0,
+    )
+    POINT_ARCHIVE_INTERVAL: float = Field(
+        "3600",
+        env="WS_ASSETS_POINT_ARCHIVE_INTERVAL",
+        description="Time in seconds between compactions of old points into the archive.",
+        gt=0,
+    )
+    POINT_ARCHIVE_SCALE: int = Field(
+        "8",
+        env="WS_ASSETS_POINT_ARCHIVE_SCALE",
+        description="Number of decimal digits kept in archived values.",
+        ge=0,
+        le=12,
     )
 
     @classmethod
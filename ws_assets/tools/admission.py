@@ -0,0 +1,70 @@
+import os
+from typing import Optional
+
+from ws_assets.tools.readiness import Readiness
+from ws_assets.tools.websocket_manager import WebsocketManager
+
+_PAGE_SIZE: int = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def get_memory_usage() -> int:
+    """Return resident memory of the current process in bytes, or 0 if unknown."""
+
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        websocket_manager: WebsocketManager,
+        max_connections: int = 0,
+        max_broadcast_latency: float = 0,
+        max_memory: int = 0,
+        readiness: Optional[Readiness] = None,
+    ):
+        """
+        Decides whether a new websocket is accepted.
+
+        New handshakes are refused before existing clients are degraded:
+        when the pod is full, broadcasts are getting slow or memory runs out.
+        Every limit is disabled if 0.
+
+        :param websocket_manager: storage of websocket clients.
+        :param max_connections: maximum number of websocket clients.
+        :param max_broadcast_latency: maximum average broadcast duration in seconds.
+        :param max_memory: maximum resident memory of the process in bytes.
+        :param readiness: readiness of the service. Websockets are refused until it is ready.
+        """
+
+        self._websocket_manager: WebsocketManager = websocket_manager
+        self._max_connections: int = max_connections
+        self._max_broadcast_latency: float = max_broadcast_latency
+        self._max_memory: int = max_memory
+        self._readiness: Optional[Readiness] = readiness
+
+    def refuse_reason(self) -> Optional[str]:
+        """Return the reason to refuse a new websocket, or None if it can be accepted."""
+
+        if self._readiness is not None and not self._readiness.is_ready:
+            return "service is not ready"
+
+        if (
+            self._max_connections
+            and self._websocket_manager.client_count >= self._max_connections
+        ):
+            return "connection limit"
+
+        if (
+            self._max_broadcast_latency
+            and self._websocket_manager.broadcast_latency > self._max_broadcast_latency
+        ):
+            return "broadcast latency"
+
+        if self._max_memory and get_memory_usage() > self._max_memory:
+            return "memory limit"
+
+        return None
@@ -1,20 +1,52 @@
 import asyncio
+import heapq
+from contextlib import asynccontextmanager, nullcontext
 from datetime import datetime, timedelta
-from typing import Callable, Coroutine, Dict, List
+from typing import (
+    AsyncIterator,
+    Callable,
+    ContextManager,
+    Coroutine,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 import orjson
 import sqlalchemy as sa  # type: ignore
 from aiohttp import ClientSession
 from loguru import logger
+from sqlalchemy.dialects.postgresql import insert  # type: ignore
 
 from ws_assets.database.tables import Tables
 from ws_assets.exceptions import (
     AssetHTTPRequestError,
     AssetParsingError,
+    ServiceOverloadedError,
     UnknownAssetIDError,
 )
-from ws_assets.models.asset import Asset, AssetPoint
+from ws_assets.models.asset import Asset, AssetPointRecord
+from ws_assets.models.indicator import IndicatorRecord
+from ws_assets.tools.asset_registry import AssetRegistry, AssetSnapshot
+from ws_assets.tools.circuit_breaker import CircuitBreaker
+from ws_assets.tools.clock import Clock, to_epoch_milliseconds
 from ws_assets.tools.db_client import DBClient
+from ws_assets.tools.frames import SharedFrame
+from ws_assets.tools.history_buffer import HistoryBuffers
+from ws_assets.tools.indicators import IndicatorEngine
+from ws_assets.tools.offload import Offloader
+from ws_assets.tools.point_archive import PointArchiver
+from ws_assets.tools.quote_cache import QuoteCache
+from ws_assets.tools.quote_transformer import QuoteBatch, QuoteTransformer
+from ws_assets.tools.rate_limiter import RateLimiter
+from ws_assets.tools.tick_journal import TickJournal
+from ws_assets.tools.tick_spans import TickSpans
+
+# PostgreSQL accepts at most 32767 bind parameters, each point takes 3
+_MAX_INSERT_ROWS: int = 32767 // 3
 
 
 class AssetProcessor:
@@ -23,14 +55,35 @@ class AssetProcessor:
         dsn: str,
         http_client: ClientSession,
         db_client: DBClient,
-        subscription_handler: Callable[[List[AssetPoint]], Coroutine],
+        subscription_handler: Callable[[List[AssetPointRecord]], Coroutine],
         http_request_timeout: float = 1.0,
+        asset_registry: Optional[AssetRegistry] = None,
+        auto_discovery: bool = False,
+        max_concurrent_history_fetches: int = 0,
+        history_queue_timeout: float = 0,
+        history_cache_ttl: float = 0,
+        history_buffers: Optional[HistoryBuffers] = None,
+        quote_cache: Optional[QuoteCache] = None,
+        clock: Optional[Clock] = None,
+        indicator_engine: Optional[IndicatorEngine] = None,
+        indicator_handler: Optional[
+            Callable[[List[IndicatorRecord]], Coroutine]
+        ] = None,
+        tick_journal: Optional[TickJournal] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        status_handler: Optional[Callable[[bool, Optional[int]], Coroutine]] = None,
+        error_log_interval: float = 60,
+        tick_spans: Optional[TickSpans] = None,
+        offloader: Optional[Offloader] = None,
+        copy_min_rows: int = 0,
+        point_archiver: Optional[PointArchiver] = None,
+        pip_sizes: Optional[Dict[str, float]] = None,
     ):
         """
         Main logic for working with assets and asset points.
 
         To start working with the class we need to call 2 methods:
-            `receive_assets_from_database` in order to receive a list of assets from the database
+            `fetch_assets` in order to receive a list of assets from the database
             `start_receiving_asset_points` in order to start receiving assets points from the endpoint
 
         :param dsn: endpoint with asset data.
@@ -38,72 +91,382 @@ class AssetProcessor:
         :param db_client: database client.
         :param subscription_handler: coroutine that broadcasts asset points to clients.
         :param http_request_timeout: timeout during http requests.
+        :param asset_registry: cache of tracked assets.
+        :param auto_discovery: start tracking new assets from the endpoint automatically.
+        :param max_concurrent_history_fetches: maximum number of history queries at once. Unlimited if 0.
+        :param history_queue_timeout: time in seconds a history query waits for its turn. Rejected at once if 0.
+        :param history_cache_ttl: time in seconds a history query result is reused. Disabled if 0.
+        :param history_buffers: recent history of every asset kept in memory. Not kept if None.
+        :param quote_cache: latest point of every asset.
+        :param clock: source of point timestamps.
+        :param indicator_engine: rolling statistics updated with every tick.
+        :param indicator_handler: coroutine that broadcasts indicators to clients.
+        :param tick_journal: journal of received quotes. Not written if None.
+        :param circuit_breaker: breaker around requests to the asset endpoint.
+        :param status_handler: coroutine that tells clients whether quotes are stale.
+        :param error_log_interval: minimal time in seconds between logged endpoint errors.
+        :param tick_spans: timing of tick stages. Not measured if None.
+        :param offloader: worker pool which parses large rate pages. Parsed inline if None.
+        :param copy_min_rows: minimal number of points written with binary COPY. Disabled if 0.
+        :param point_archiver: archive of old points merged into history. Not read if None.
+        :param pip_sizes: pip size by asset name used to express spreads in pips.
         """
 
         self._dsn: str = dsn
         self._http_client: ClientSession = http_client
         self._db_client: DBClient = db_client
         self._subscription_handler: Callable[
-            [List[AssetPoint]], Coroutine
+            [List[AssetPointRecord]], Coroutine
         ] = subscription_handler
         self._http_request_timeout: float = http_request_timeout
+        self._clock: Clock = clock or Clock()
+
+        # Registry where assets are stored
+        self._asset_registry: AssetRegistry = asset_registry or AssetRegistry(
+            db_client=db_client
+        )
+
+        self._auto_discovery: bool = auto_discovery
+        self._discovery_task: Optional[asyncio.Task] = None
+
+        self._max_concurrent_history_fetches: int = max_concurrent_history_fetches
+        self._history_queue_timeout: float = history_queue_timeout
+
+        # Created on first use to bind it to the running event loop
+        self._history_semaphore: Optional[asyncio.Semaphore] = None
+
+        # Identical history requests share a single query and its result,
+        # keyed on asset id and time window
+        self._history_cache_ttl: float = history_cache_ttl
+        self._history_fetches: Dict[Tuple[int, int], asyncio.Future] = {}
+        self._history_cache: Dict[
+            Tuple[int, int], Tuple[float, List[AssetPointRecord]]
+        ] = {}
+
+        # Recent history is answered from memory once buffers are loaded
+        self._history_buffers: Optional[HistoryBuffers] = history_buffers
+
+        self._quote_cache: QuoteCache = quote_cache or QuoteCache()
+
+        self._indicator_engine: IndicatorEngine = indicator_engine or IndicatorEngine(
+            windows=[]
+        )
+        self._indicator_handler: Optional[
+            Callable[[List[IndicatorRecord]], Coroutine]
+        ] = indicator_handler
+
+        self._tick_journal: Optional[TickJournal] = tick_journal
+
+        # Requests are skipped while the endpoint is unavailable
+        self._circuit_breaker: CircuitBreaker = circuit_breaker or CircuitBreaker()
+        self._status_handler: Optional[
+            Callable[[bool, Optional[int]], Coroutine]
+        ] = status_handler
+
+        # Time of the last received tick in epoch milliseconds
+        self._last_update: Optional[int] = None
+
+        # Endpoint errors are logged at most once per interval during outages
+        self._error_log_limiter: Optional[RateLimiter] = (
+            RateLimiter(rate=1 / error_log_interval, burst=1)
+            if error_log_interval
+            else None
+        )
+        self._suppressed_errors: int = 0
+
+        self._tick_spans: Optional[TickSpans] = tick_spans
+        self._offloader: Optional[Offloader] = offloader
+        self._copy_min_rows: int = copy_min_rows
+        self._point_archiver: Optional[PointArchiver] = point_archiver
+
+        # Positions of tracked assets in the feed are reused between ticks
+        self._quote_transformer: QuoteTransformer = QuoteTransformer(
+            pip_sizes=pip_sizes
+        )
+
+        # Ticks which are still writing or broadcasting their points
+        self._tick_tasks: Set[asyncio.Task] = set()
+
+    @property
+    def asset_registry(self) -> AssetRegistry:
+        return self._asset_registry
+
+    @property
+    def quote_cache(self) -> QuoteCache:
+        return self._quote_cache
+
+    @property
+    def indicator_engine(self) -> IndicatorEngine:
+        return self._indicator_engine
+
+    @property
+    def quote_transformer(self) -> QuoteTransformer:
+        return self._quote_transformer
+
+    @property
+    def circuit_breaker(self) -> CircuitBreaker:
+        return self._circuit_breaker
 
-        # Dictionary where assets will be stored
-        self._assets_name_to_id: Dict[str, int] = {}
-        self._assets_id_to_name: Dict[int, str] = {}
+    @property
+    def tick_spans(self) -> Optional[TickSpans]:
+        return self._tick_spans
+
+    def _span(self, stage: str) -> ContextManager:
+        """Measure a tick stage if spans are enabled."""
+
+        if self._tick_spans is None:
+            return nullcontext()
+
+        return self._tick_spans.span(stage)
+
+    async def _get_asset_snapshot(self) -> AssetSnapshot:
+        """Return cached assets, loading them from the database on first use."""
+
+        if not self._asset_registry.is_loaded:
+            return await self._asset_registry.refresh()
+
+        return self._asset_registry.snapshot
 
     async def fetch_assets(self) -> List[Asset]:
-        """Receive a list of current assets from the database and cache them."""
+        """Receive a list of current assets."""
 
-        raw_assets: List[dict] = await self._db_client.fetchall(
-            sa.select([Tables.asset.c.id, Tables.asset.c.symbol.label("name")]).where(
-                True
-            )
+        return (await self._get_asset_snapshot()).assets
+
+    async def fetch_assets_frame(self) -> SharedFrame:
+        """Receive a pre-encoded `assets` frame."""
+
+        return (await self._get_asset_snapshot()).frame
+
+    def get_asset_name(self, asset_id: int) -> str:
+        """Return the name of a tracked asset or raise `UnknownAssetIDError`."""
+
+        asset_name: Optional[str] = self._asset_registry.snapshot.id_to_name.get(
+            asset_id
         )
-        assets: List[Asset] = [Asset(**raw_asset) for raw_asset in raw_assets]
 
-        # Cache assets
-        # Useful during the first request on startup. Probably useless afterwards
-        self._assets_name_to_id = {asset.name: asset.id for asset in assets}
-        self._assets_id_to_name = {asset.id: asset.name for asset in assets}
+        if asset_name is None:
+            raise UnknownAssetIDError(asset_id=asset_id)
+
+        return asset_name
+
+    def get_quotes_frame(self, asset_ids: List[int]) -> SharedFrame:
+        """
+        Return a pre-encoded `quote` frame with the latest points of assets.
+
+        Answered from memory, so it doesn't touch the database.
+        Raises `UnknownAssetIDError` if an asset isn't tracked.
+        """
+
+        for asset_id in asset_ids:
+            self.get_asset_name(asset_id=asset_id)
+
+        return self._quote_cache.frame(asset_ids)
+
+    @asynccontextmanager
+    async def _history_slot(self) -> AsyncIterator[None]:
+        """Wait for a free history query slot or raise `ServiceOverloadedError`."""
+
+        if not self._max_concurrent_history_fetches:
+            yield
+            return
 
-        return assets
+        if self._history_semaphore is None:
+            self._history_semaphore = asyncio.Semaphore(
+                self._max_concurrent_history_fetches
+            )
+
+        if not self._history_semaphore.locked():
+            # Doesn't block
+            await self._history_semaphore.acquire()
+        elif not self._history_queue_timeout:
+            raise ServiceOverloadedError(resource="history fetches")
+        else:
+            try:
+                await asyncio.wait_for(
+                    self._history_semaphore.acquire(),
+                    timeout=self._history_queue_timeout,
+                )
+            except asyncio.TimeoutError:
+                raise ServiceOverloadedError(resource="history fetches")
+
+        try:
+            yield
+        finally:
+            self._history_semaphore.release()
 
     async def fetch_asset_history(
         self, asset_id: int, time: int = 30 * 60
-    ) -> List[AssetPoint]:
+    ) -> List[AssetPointRecord]:
         """
         Receive a list of asset points for the last `time` seconds.
 
+        Concurrent requests for the same asset and window wait for a single query.
+        The returned list is shared between callers and must not be modified.
+
         :param asset_id: asset id.
         :param time: number of seconds.
         """
 
-        if asset_id not in self._assets_id_to_name:
-            raise UnknownAssetIDError(asset_id=asset_id)
+        asset_name: str = self.get_asset_name(asset_id=asset_id)
+
+        key: Tuple[int, int] = (asset_id, time)
+        loop = asyncio.get_running_loop()
+
+        cached = self._history_cache.get(key)
+        if cached is not None and cached[0] > loop.time():
+            return cached[1]
+
+        fetch: Optional[asyncio.Future] = self._history_fetches.get(key)
+        if fetch is None:
+            fetch = asyncio.ensure_future(
+                self._query_asset_history(
+                    asset_id=asset_id, asset_name=asset_name, time=time
+                )
+            )
+            self._history_fetches[key] = fetch
+            fetch.add_done_callback(
+                lambda fetch: self._finish_history_fetch(key, fetch)
+            )
+
+        # A disconnected client must not cancel the query for others
+        return await asyncio.shield(fetch)
+
+    def _finish_history_fetch(self, key: Tuple[int, int], fetch: asyncio.Future):
+        """Forget a finished query and cache its result."""
+
+        self._history_fetches.pop(key, None)
+
+        if fetch.cancelled() or fetch.exception() is not None:
+            return
+
+        if self._history_cache_ttl:
+            now: float = asyncio.get_running_loop().time()
+
+            # Drop expired results, so the cache doesn't keep removed assets forever
+            for expired_key in [
+                cache_key
+                for cache_key, (expires_at, _) in self._history_cache.items()
+                if expires_at <= now
+            ]:
+                del self._history_cache[expired_key]
+
+            self._history_cache[key] = (now + self._history_cache_ttl, fetch.result())
+
+    async def _query_asset_history(
+        self, asset_id: int, asset_name: str, time: int
+    ) -> List[AssetPointRecord]:
+        """Query asset points for the last `time` seconds from memory or the database."""
+
+        since: datetime = self._clock.now() - timedelta(seconds=time)
+
+        if self._history_buffers is not None:
+            buffered_asset_points: Optional[
+                List[AssetPointRecord]
+            ] = self._history_buffers.get(
+                asset_id=asset_id,
+                asset_name=asset_name,
+                since=to_epoch_milliseconds(since),
+            )
+
+            if buffered_asset_points is not None:
+                return buffered_asset_points
+
+        archived_asset_points: List[AssetPointRecord] = []
+
+        # Asset name is known, so there is no need to join the asset table
+        async with self._history_slot():
+            raw_asset_points: List[dict] = await self._db_client.fetchall(
+                sa.select([Tables.point.c.ts.label("time"), Tables.point.c.value])
+                .where(Tables.point.c.ts > since)
+                .where(Tables.point.c.asset_id == asset_id)
+                .order_by(Tables.point.c.ts)
+            )
+
+            if (
+                self._point_archiver is not None
+                and since < self._point_archiver.cutoff()
+            ):
+                archived_asset_points = await self._point_archiver.read(
+                    asset_id=asset_id, asset_name=asset_name, since=since
+                )
+        asset_points: List[AssetPointRecord] = [
+            AssetPointRecord(
+                asset_name,
+                self._to_timestamp(raw_asset_point["time"]),
+                asset_id,
+                raw_asset_point["value"],
+            )
+            for raw_asset_point in raw_asset_points
+        ]
+
+        if archived_asset_points:
+            # Days being compacted may briefly be both archived and hot
+            hot_times: Set[int] = {asset_point.time for asset_point in asset_points}
+            asset_points = list(
+                heapq.merge(
+                    [
+                        asset_point
+                        for asset_point in archived_asset_points
+                        if asset_point.time not in hot_times
+                    ],
+                    asset_points,
+                    key=lambda asset_point: asset_point.time,
+                )
+            )
+
+        return asset_points
+
+    async def warm_up_history(self):
+        """Load recent history of all tracked assets into buffers with a single query."""
+
+        if self._history_buffers is None:
+            return
+
+        assets: AssetSnapshot = await self._get_asset_snapshot()
+        since: datetime = self._clock.now() - timedelta(
+            seconds=self._history_buffers.window
+        )
 
         raw_asset_points: List[dict] = await self._db_client.fetchall(
             sa.select(
                 [
-                    Tables.asset.c.symbol.label("assetName"),
+                    Tables.point.c.asset_id,
                     Tables.point.c.ts.label("time"),
-                    Tables.asset.c.id.label("assetId"),
                     Tables.point.c.value,
                 ]
             )
-            .select_from(
-                Tables.point.join(
-                    Tables.asset, onclause=Tables.point.c.asset_id == Tables.asset.c.id
-                )
-            )
-            .where(Tables.point.c.ts > datetime.utcnow() - timedelta(seconds=time))
-            .where(Tables.asset.c.id == asset_id)
+            .where(Tables.point.c.ts > since)
+            .where(Tables.point.c.asset_id.in_(list(assets.id_to_name)))
+            .order_by(Tables.point.c.ts),
+            # Buffers are never reloaded, so they must not miss points lagging on the replica
+            replica=False,
         )
-        asset_points: List[AssetPoint] = [
-            AssetPoint(**raw_asset_point) for raw_asset_point in raw_asset_points
-        ]
 
-        return asset_points
+        self._history_buffers.load(
+            asset_ids=assets.id_to_name,
+            since=to_epoch_milliseconds(since),
+            rows=[
+                {
+                    "asset_id": raw_asset_point["asset_id"],
+                    "time": self._to_timestamp(raw_asset_point["time"]),
+                    "value": raw_asset_point["value"],
+                }
+                for raw_asset_point in raw_asset_points
+            ],
+        )
+
+        logger.info(
+            f"Loaded {len(raw_asset_points)} recent points of {len(assets.id_to_name)} assets"
+        )
+
+    @staticmethod
+    def _to_timestamp(value: Union[datetime, int]) -> int:
+        """Convert a database timestamp to epoch milliseconds sent to clients."""
+
+        if isinstance(value, datetime):
+            return to_epoch_milliseconds(value)
+
+        return value
 
     async def _make_request_to_asset_endpoint(self) -> str:
         """Make a request to the asset endpoint."""
@@ -126,8 +489,9 @@ class AssetProcessor:
             # Return empty values in a correct format to avoid further problems
             return 'null({"Rates": []}); '
 
-    def _parse_asset_text(self, text: str) -> Dict[str, List[dict]]:
-        """Parse text returned from the asset endpoint."""
+    @staticmethod
+    def _parse_asset_text(text: str) -> Dict[str, List[dict]]:
+        """Parse text returned from the asset endpoint. Can be called in a worker."""
 
         # Assets are returned in a format which is close but not exactly json, so we need to modify it a bit
         # Page format is `null({...}); `, so we need to remove extra symbols
@@ -143,72 +507,236 @@ class AssetProcessor:
 
         return payload
 
-    def _filter_unused_assets(self, asset_points: Dict[str, List[dict]]) -> List[dict]:
-        """Filter out unused assets."""
+    def _discover_new_assets(
+        self, asset_points: Dict[str, List[dict]], assets: AssetSnapshot
+    ):
+        """Register assets which are unknown to the database in a single bulk insert."""
+
+        # Previous discovery hasn't finished yet, so the snapshot is outdated
+        if self._discovery_task is not None and not self._discovery_task.done():
+            return
+
+        new_names: List[str] = sorted(
+            {
+                rate["Symbol"]
+                for rate in asset_points["Rates"]
+                if rate["Symbol"] not in assets.known_names
+            }
+        )
+
+        if new_names:
+            logger.info(f"Discovered new assets: {', '.join(new_names)}")
+
+            self._discovery_task = asyncio.create_task(
+                self._register_assets(names=new_names)
+            )
+
+    async def _register_assets(self, names: List[str]):
+        """Register discovered assets. Errors are only logged, discovery is retried next tick."""
+
+        try:
+            await self._asset_registry.discover_assets(names=names)
+        except Exception as e:
+            logger.exception(e)
+
+    def transform_data_to_database_format(
+        self, quotes: QuoteBatch, captured_at: datetime
+    ) -> List[dict]:
+        """
+        Transform quotes to the format used by the database.
+
+        All points of a tick share the capture timestamp.
+        """
 
         return [
-            rate
-            for rate in asset_points["Rates"]
-            if rate["Symbol"] in self._assets_name_to_id
+            {"asset_id": asset_id, "value": value, "ts": captured_at}
+            for asset_id, value in zip(quotes.asset_ids.tolist(), quotes.mids.tolist())
         ]
 
-    def _transform_data_to_database_format(self, asset_points: List[dict]):
+    async def store_points(self, values: List[dict]):
         """
-        Transform data to the format used by the database.
+        Write points in the database format, replacing values of points which already exist.
 
-        Change some field names and calculate `value` field.
+        Points are unique per asset and timestamp, so retried ticks and backfills
+        don't duplicate them. Large batches are written with binary COPY.
         """
 
-        return [
-            {
-                "asset_id": self._assets_name_to_id[point["Symbol"]],
-                "value": (float(point["Bid"]) + float(point["Ask"])) / 2,
-            }
-            for point in asset_points
+        # A statement can't update the same row twice, so the last value of a point wins
+        values = list(
+            {(value["asset_id"], value["ts"]): value for value in values}.values()
+        )
+
+        if self._copy_min_rows and len(values) >= self._copy_min_rows:
+            await self._db_client.copy_upsert(
+                table=Tables.point,
+                columns=["asset_id", "value", "ts"],
+                records=[
+                    (value["asset_id"], value["value"], value["ts"]) for value in values
+                ],
+                conflict_columns=["asset_id", "ts"],
+            )
+
+            return
+
+        for start in range(0, len(values), _MAX_INSERT_ROWS):
+            statement = insert(Tables.point).values(
+                values[start : start + _MAX_INSERT_ROWS]
+            )
+            await self._db_client.fetchall(
+                statement.on_conflict_do_update(
+                    index_elements=["asset_id", "ts"],
+                    set_={"value": statement.excluded.value},
+                )
+            )
+
+    async def process_quotes(
+        self, quotes: QuoteBatch, captured_at: datetime, broadcast: bool = True
+    ):
+        """
+        Write quotes of a tick to the database and broadcast them.
+
+        :param quotes: quotes of tracked assets.
+        :param captured_at: capture time of the tick.
+        :param broadcast: send points and indicators to clients.
+        """
+
+        if not len(quotes):
+            return
+
+        values: List[dict] = self.transform_data_to_database_format(
+            quotes=quotes, captured_at=captured_at
+        )
+        with self._span("insert"):
+            await self.store_points(values=values)
+
+        # Points are sent only after they are stored, so clients
+        # never see points which are missing from the history
+        time: int = to_epoch_milliseconds(captured_at)
+        asset_points: List[AssetPointRecord] = [
+            AssetPointRecord(asset_name, time, value["asset_id"], value["value"])
+            for asset_name, value in zip(quotes.asset_names, values)
         ]
 
-    async def _receive_asset_point(self):
-        """Receive an assets' points and write them to the database."""
+        if self._history_buffers is not None:
+            self._history_buffers.append(asset_points)
+
+        self._quote_cache.update(asset_points)
+
+        if not broadcast:
+            return
+
+        # WebsocketManager.broadcast_asset_points blocks execution until
+        # all data is broadcast to all websockets, but it is fine
+        with self._span("broadcast"):
+            await self._subscription_handler(asset_points)
+
+        with self._span("indicators"):
+            indicators: List[IndicatorRecord] = self._indicator_engine.update(
+                asset_points
+            )
+
+            if indicators and self._indicator_handler is not None:
+                await self._indicator_handler(indicators)
+
+    async def _request_rates(self) -> Optional[Tuple[datetime, Dict[str, List[dict]]]]:
+        """Request and parse rates. Return None if the endpoint failed."""
 
         try:
-            text: str = await self._make_request_to_asset_endpoint()
-            all_asset_points: Dict[str, List[dict]] = self._parse_asset_text(text=text)
-            useful_asset_points: List[dict] = self._filter_unused_assets(
-                asset_points=all_asset_points
+            with self._span("fetch"):
+                text: str = await self._make_request_to_asset_endpoint()
+
+            # The endpoint doesn't timestamp its rates, so the tick is stamped on arrival
+            captured_at: datetime = self._clock.now()
+
+            with self._span("parse"):
+                all_asset_points: Dict[str, List[dict]]
+
+                if self._offloader is not None:
+                    all_asset_points = await self._offloader.run(
+                        self._parse_asset_text, text, size=len(text)
+                    )
+                else:
+                    all_asset_points = self._parse_asset_text(text=text)
+        except Exception as e:
+            await self._handle_endpoint_failure(error=e)
+
+            return None
+
+        self._last_update = to_epoch_milliseconds(captured_at)
+
+        if self._circuit_breaker.record_success():
+            logger.info("Asset endpoint has recovered")
+
+            if self._status_handler is not None:
+                await self._status_handler(False, self._last_update)
+
+        return captured_at, all_asset_points
+
+    async def _handle_endpoint_failure(self, error: Exception):
+        """Count a failed request and log it without flooding logs during outages."""
+
+        # Error pages are included in messages, so they are truncated
+        description: str = f"{type(error).__name__}: {error}"[:500]
+
+        if self._circuit_breaker.record_failure():
+            logger.error(
+                f"Asset endpoint is unavailable, quotes are stale. "
+                f"Retrying in {self._circuit_breaker.retry_in:.1f}s. {description}"
             )
-            values: List[dict] = self._transform_data_to_database_format(
-                asset_points=useful_asset_points
+
+            if self._status_handler is not None:
+                await self._status_handler(True, self._last_update)
+        elif self._error_log_limiter is None or self._error_log_limiter.acquire():
+            logger.warning(
+                f"Asset endpoint request failed "
+                f"({self._suppressed_errors} similar errors suppressed). {description}"
             )
+            self._suppressed_errors = 0
+        else:
+            self._suppressed_errors += 1
 
-            if values:
-                # DB query and websocket can't be parallelized since timestamp
-                # is generated in SQLAlchemy model. It can be changed, though, and
-                # rather easily
-                raw_asset_points: List[dict] = await self._db_client.fetchall(
-                    Tables.point.insert()
-                    .values(values)
-                    .returning(
-                        Tables.point.c.asset_id.label("assetId"),
-                        Tables.point.c.value,
-                        Tables.point.c.ts.label("time"),
-                    )
+    async def _receive_asset_point(self):
+        """Receive an assets' points and write them to the database."""
+
+        try:
+            # The whole tick works with the same set of assets,
+            # even if the registry is refreshed in the meantime
+            assets: AssetSnapshot = self._asset_registry.snapshot
+
+            rates: Optional[
+                Tuple[datetime, Dict[str, List[dict]]]
+            ] = await self._request_rates()
+
+            if rates is None:
+                return
+
+            captured_at, all_asset_points = rates
+
+            if self._auto_discovery:
+                self._discover_new_assets(asset_points=all_asset_points, assets=assets)
+
+            # Filtering of untracked assets is a part of the transform
+            with self._span("transform"):
+                quotes: QuoteBatch = self._quote_transformer.transform(
+                    rates=all_asset_points["Rates"], assets=assets
                 )
-                asset_points: List[AssetPoint] = [
-                    AssetPoint(
-                        **raw_asset_point,
-                        assetName=self._assets_id_to_name[raw_asset_point["assetId"]]
+
+            # Ticks are journaled before the insert, so they can be backfilled
+            # if the database is unavailable
+            if self._tick_journal is not None and len(quotes):
+                with self._span("journal"):
+                    self._tick_journal.append(
+                        asset_ids=quotes.asset_ids,
+                        time=to_epoch_milliseconds(captured_at),
+                        bids=quotes.bids,
+                        asks=quotes.asks,
                     )
-                    for raw_asset_point in raw_asset_points
-                ]
 
-                # WebsocketManager.broadcast_asset_points blocks execution until
-                # all data is broadcast to all websockets, but it is fine
-                await self._subscription_handler(asset_points)
+            await self.process_quotes(quotes=quotes, captured_at=captured_at)
         except Exception as e:
+            # Nobody awaits the tick task, so the error is only logged
             logger.exception(e)
 
-            raise e
-
     async def start_receiving_asset_points(self):
         """Start an endless loop which receives data points every second."""
 
@@ -217,6 +745,16 @@ class AssetProcessor:
             # we need to launch logic in another task
             # This will still wait for more than 1 second, but I'm unsure than further precision
             # is necessary
-            asyncio.create_task(self._receive_asset_point())
+            # While the circuit is open, no requests are made until the backoff delay passes
+            if self._circuit_breaker.allow_request():
+                task: asyncio.Task = asyncio.create_task(self._receive_asset_point())
+                self._tick_tasks.add(task)
+                task.add_done_callback(self._tick_tasks.discard)
 
             await asyncio.sleep(1)
+
+    async def wait_for_ticks(self, timeout: float):
+        """Wait for ticks in progress to write and broadcast their points."""
+
+        if self._tick_tasks:
+            await asyncio.wait(set(self._tick_tasks), timeout=timeout)
@@ -0,0 +1,211 @@
+import asyncio
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional
+
+import orjson
+import sqlalchemy as sa  # type: ignore
+from loguru import logger
+from sqlalchemy.dialects.postgresql import insert  # type: ignore
+
+from ws_assets.database.tables import ASSET_NOTIFICATION_CHANNEL, Tables
+from ws_assets.exceptions import UnknownAssetIDError
+from ws_assets.models.asset import Asset
+from ws_assets.tools.db_client import DBClient
+from ws_assets.tools.frames import SharedFrame
+
+
+class AssetSnapshot:
+    __slots__ = ("assets", "name_to_id", "id_to_name", "known_names", "frame")
+
+    def __init__(self, assets: List[Asset], known_names: Iterable[str] = ()):
+        """
+        Immutable set of tracked assets with lookup tables and a pre-encoded `assets` frame.
+
+        Snapshots are never modified, only replaced, so code that took a snapshot
+        always sees consistent lookup tables.
+
+        :param assets: list of tracked assets.
+        :param known_names: names of all assets in the database, including untracked ones.
+        """
+
+        self.assets: List[Asset] = assets
+        self.name_to_id: Dict[str, int] = {asset.name: asset.id for asset in assets}
+        self.id_to_name: Dict[int, str] = {asset.id: asset.name for asset in assets}
+        self.known_names: FrozenSet[str] = frozenset(known_names).union(self.name_to_id)
+
+        # Frame follows `ResponseAssets`
+        self.frame: SharedFrame = SharedFrame(
+            orjson.dumps(
+                {
+                    "action": "assets",
+                    "message": {"assets": [asset.dict() for asset in assets]},
+                }
+            )
+        )
+
+
+class AssetRegistry:
+    def __init__(self, db_client: DBClient, refresh_interval: float = 60):
+        """
+        Cache of tracked assets.
+
+        Assets are reloaded from the database every `refresh_interval` seconds
+        or right after a database notification about changes in the asset table.
+
+        :param db_client: database client.
+        :param refresh_interval: time in seconds between reloads.
+        """
+
+        self._db_client: DBClient = db_client
+        self._refresh_interval: float = refresh_interval
+
+        self._snapshot: AssetSnapshot = AssetSnapshot([])
+        self.is_loaded: bool = False
+
+        # Called with a new snapshot after every swap
+        self._listeners: List[Callable[[AssetSnapshot], None]] = []
+
+        # Set when assets are known to be changed.
+        # Created in the refresh loop to bind it to the running event loop
+        self._changed: Optional[asyncio.Event] = None
+
+    @property
+    def snapshot(self) -> AssetSnapshot:
+        """Current set of assets."""
+
+        return self._snapshot
+
+    def add_listener(self, listener: Callable[[AssetSnapshot], None]):
+        """Call `listener` with every new snapshot."""
+
+        self._listeners.append(listener)
+
+    def swap(self, snapshot: AssetSnapshot):
+        """Replace the current set of assets."""
+
+        self._snapshot = snapshot
+        self.is_loaded = True
+
+        for listener in self._listeners:
+            listener(snapshot)
+
+    async def refresh(self) -> AssetSnapshot:
+        """Load assets from the database and replace the current snapshot."""
+
+        raw_assets: List[dict] = await self._db_client.fetchall(
+            sa.select(
+                [
+                    Tables.asset.c.id,
+                    Tables.asset.c.symbol.label("name"),
+                    Tables.asset.c.tracked,
+                ]
+            )
+            .where(True)
+            .order_by(Tables.asset.c.id),
+            # Changes made through the admin API must be visible at once
+            replica=False,
+        )
+
+        # Lookup tables are built aside and swapped in a single assignment
+        snapshot = AssetSnapshot(
+            assets=[
+                Asset(id=raw_asset["id"], name=raw_asset["name"])
+                for raw_asset in raw_assets
+                if raw_asset.get("tracked", True)
+            ],
+            known_names=[raw_asset["name"] for raw_asset in raw_assets],
+        )
+        self.swap(snapshot)
+
+        return snapshot
+
+    async def add_assets(self, names: List[str]) -> List[Asset]:
+        """Start tracking assets, creating them if necessary."""
+
+        # A statement can't update the same row twice, so repeated names are dropped
+        query = insert(Tables.asset).values(
+            [{"symbol": name, "tracked": True} for name in dict.fromkeys(names)]
+        )
+        raw_assets: List[dict] = await self._db_client.fetchall(
+            query.on_conflict_do_update(
+                index_elements=[Tables.asset.c.symbol], set_={"tracked": True}
+            ).returning(Tables.asset.c.id, Tables.asset.c.symbol.label("name"))
+        )
+
+        await self.refresh()
+
+        return [Asset(**raw_asset) for raw_asset in raw_assets]
+
+    async def discover_assets(self, names: List[str]) -> List[Asset]:
+        """
+        Create assets which are not in the database yet.
+
+        Untracked assets stay untracked, since they were removed on purpose.
+        """
+
+        raw_assets: List[dict] = await self._db_client.fetchall(
+            insert(Tables.asset)
+            .values([{"symbol": name, "tracked": True} for name in names])
+            .on_conflict_do_nothing(index_elements=[Tables.asset.c.symbol])
+            .returning(Tables.asset.c.id, Tables.asset.c.symbol.label("name"))
+        )
+
+        await self.refresh()
+
+        return [Asset(**raw_asset) for raw_asset in raw_assets]
+
+    async def remove_asset(self, asset_id: int):
+        """Stop tracking an asset. Its points are kept in the database."""
+
+        raw_asset: dict = await self._db_client.fetchone(
+            sa.update(Tables.asset)
+            .where(Tables.asset.c.id == asset_id)
+            .values(tracked=False)
+            .returning(Tables.asset.c.id)
+        )
+
+        if not raw_asset:
+            raise UnknownAssetIDError(asset_id=asset_id)
+
+        await self.refresh()
+
+    def notify(self, *args):
+        """Schedule a reload. Used as a database notification callback."""
+
+        if self._changed is not None:
+            self._changed.set()
+
+    async def start_refreshing(self):
+        """Start an endless loop which reloads assets on a timer or on notification."""
+
+        self._changed = asyncio.Event()
+
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._changed.wait(), timeout=self._refresh_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+
+            self._changed.clear()
+
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.exception(e)
+
+    async def start_listening(self):
+        """Start an endless loop which listens to notifications about asset changes."""
+
+        while True:
+            try:
+                # Notifications could be missed while we weren't listening
+                self.notify()
+
+                await self._db_client.listen(
+                    channel=ASSET_NOTIFICATION_CHANNEL, callback=self.notify
+                )
+            except Exception as e:
+                logger.exception(e)
+
+            await asyncio.sleep(self._refresh_interval)
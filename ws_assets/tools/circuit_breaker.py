@@ -0,0 +1,98 @@
+import random
+import time
+from typing import Literal
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        base_delay: float = 1,
+        max_delay: float = 60,
+        jitter: float = 0.5,
+    ):
+        """
+        Circuit breaker with exponential backoff for an unreliable upstream.
+
+        After `failure_threshold` consecutive failures the circuit opens and requests are skipped.
+        Once the backoff delay passes, a single probe request is let through.
+        A successful probe closes the circuit, a failed one opens it again with a doubled delay.
+
+        :param failure_threshold: number of consecutive failures which opens the circuit.
+        :param base_delay: first backoff delay in seconds.
+        :param max_delay: maximum backoff delay in seconds.
+        :param jitter: fraction of the delay which is random, so pods don't probe in lockstep.
+        """
+
+        self._failure_threshold: int = failure_threshold
+        self._base_delay: float = base_delay
+        self._max_delay: float = max_delay
+        self._jitter: float = jitter
+
+        self.state: CircuitState = "closed"
+
+        # Consecutive failures and consecutive openings without a success
+        self.failures: int = 0
+        self._openings: int = 0
+
+        self._retry_at: float = 0.0
+
+    @property
+    def retry_in(self) -> float:
+        """Time in seconds until the next probe. 0 if the circuit isn't open."""
+
+        if self.state != "open":
+            return 0.0
+
+        return max(self._retry_at - time.monotonic(), 0.0)
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be made now."""
+
+        if self.state == "closed":
+            return True
+
+        # Only one probe at a time
+        if self.state == "half_open" or time.monotonic() < self._retry_at:
+            return False
+
+        self.state = "half_open"
+
+        return True
+
+    def record_success(self) -> bool:
+        """Close the circuit. Return True if it wasn't closed."""
+
+        was_closed: bool = self.state == "closed"
+
+        self.state = "closed"
+        self.failures = 0
+        self._openings = 0
+
+        return not was_closed
+
+    def record_failure(self) -> bool:
+        """Count a failure. Return True if the circuit was closed and has opened."""
+
+        self.failures += 1
+
+        if self.state == "closed" and self.failures < self._failure_threshold:
+            return False
+
+        # Late failures of requests made before the circuit opened don't back off again
+        if self.state == "open":
+            return False
+
+        was_closed: bool = self.state == "closed"
+
+        delay: float = min(self._max_delay, self._base_delay * 2**self._openings)
+        delay *= 1 - self._jitter * random.random()
+
+        self.state = "open"
+        # Capped, so a long outage doesn't overflow the exponent
+        self._openings = min(self._openings + 1, 32)
+        self._retry_at = time.monotonic() + delay
+
+        return was_closed
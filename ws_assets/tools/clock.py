@@ -0,0 +1,49 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+EPOCH: datetime = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def to_epoch_milliseconds(value: datetime) -> int:
+    """Convert a datetime to epoch milliseconds. Naive datetimes are treated as UTC."""
+
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+
+    # Integer arithmetic, so milliseconds are not lost to float rounding
+    return (value - EPOCH) // timedelta(milliseconds=1)
+
+
+class Clock:
+    def __init__(self, resync_interval: float = 60):
+        """
+        Wall clock anchored to the monotonic clock.
+
+        Time passes at the monotonic rate, so system clock steps don't reorder ticks.
+        The anchor is moved to the system clock every `resync_interval` seconds,
+        but time never goes backwards.
+
+        :param resync_interval: time in seconds between resyncs with the system clock.
+        """
+
+        self._resync_interval: float = resync_interval
+
+        self._wall_anchor: float = time.time()
+        self._monotonic_anchor: float = time.monotonic()
+
+        self._last: float = self._wall_anchor
+
+    def now(self) -> datetime:
+        """Current UTC time with millisecond precision."""
+
+        monotonic: float = time.monotonic()
+
+        if monotonic - self._monotonic_anchor > self._resync_interval:
+            self._wall_anchor = time.time()
+            self._monotonic_anchor = monotonic
+
+        self._last = max(
+            self._last, self._wall_anchor + (monotonic - self._monotonic_anchor)
+        )
+
+        return EPOCH + timedelta(milliseconds=int(self._last * 1000))
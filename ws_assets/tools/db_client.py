@@ -1,6 +1,8 @@
+import asyncio
 import functools
 import time
-from typing import List
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List, Literal, Optional, Sequence
 
 import orjson
 import sqlalchemy as sa  # type: ignore
@@ -12,6 +14,7 @@ from sqlalchemy.ext.asyncio import (  # type: ignore
     create_async_engine,
 )
 
+from ws_assets.models.pool import PoolStatus
 from ws_assets.tools.meta.base_client import BaseClient
 
 
@@ -19,7 +22,9 @@ def log_query(func):
     """Log database query."""
 
     @functools.wraps(func)
-    async def wrapper(self, query, connection: AsyncConnection = None):
+    async def wrapper(
+        self, query, connection: AsyncConnection = None, replica: bool = True
+    ):
         # Datetime compilation is not implemented, so we simply ignore those queries
         compiled_query: str
         try:
@@ -33,7 +38,7 @@ def log_query(func):
 
         time_begin: float = time.time()
 
-        results = await func(self, query=query, connection=connection)
+        results = await func(self, query=query, connection=connection, replica=replica)
 
         execution_time: float = time.time() - time_begin
 
@@ -47,43 +52,170 @@ def log_query(func):
 
 
 def start_connection(func):
-    """Start a connection if connection is None."""
+    """
+    Start a connection if connection is None.
+
+    Selects go to the replica if it is available and `replica` is True.
+    If the replica fails, the query is retried on the primary.
+    """
 
     @functools.wraps(func)
-    async def wrapper(self, query, connection=None):
+    async def wrapper(self, query, connection=None, replica: bool = True):
         if connection:
             return await func(self, query=query, connection=connection)
-        else:
-            async with self.engine.begin() as connection:
-                return await func(self, query=query, connection=connection)
+
+        engine: AsyncEngine = self._get_engine(query=query, replica=replica)
+
+        if engine is not self.engine:
+            try:
+                async with self._begin(engine) as connection:
+                    return await func(self, query=query, connection=connection)
+            except (sa.exc.DBAPIError, OSError) as e:
+                logger.warning(f"Replica query failed, falling back to primary: {e}")
+
+                # Primary is used until the next successful lag check
+                self.replica_lag = None
+
+        async with self._begin(self.engine) as connection:
+            return await func(self, query=query, connection=connection)
 
     return wrapper
 
 
+class PoolStatistics:
+    __slots__ = ("checkouts", "checkout_wait", "checkout_wait_max", "timeouts")
+
+    def __init__(self):
+        """Counters of connection checkouts from a pool."""
+
+        self.checkouts: int = 0
+        self.checkout_wait: float = 0.0
+        self.checkout_wait_max: float = 0.0
+        self.timeouts: int = 0
+
+    def add_checkout(self, wait: float):
+        """Count a checkout which waited `wait` seconds."""
+
+        self.checkouts += 1
+        self.checkout_wait += wait
+        self.checkout_wait_max = max(self.checkout_wait_max, wait)
+
+
 class DBClient(BaseClient):
-    def __init__(self, dsn: str, pool_size: int):
+    def __init__(
+        self,
+        dsn: str,
+        pool_size: int,
+        replica_dsn: Optional[str] = None,
+        replica_max_lag: float = 5,
+        replica_check_interval: float = 1,
+        max_overflow: int = 10,
+        pool_timeout: float = 30,
+        pool_recycle: int = -1,
+        pre_ping: Literal["checkout", "background", "off"] = "checkout",
+        health_check_interval: float = 10,
+    ):
         """
         Database client.
 
+        Writes always go to the primary. Selects go to the replica if it is configured
+        and lags behind the primary by no more than `replica_max_lag` seconds.
+
+        Connections are checked either on every checkout (`pre_ping="checkout"`),
+        which costs a round trip per query, or every `health_check_interval` seconds
+        in `start_checking_pool` (`pre_ping="background"`).
+
         :param dsn: database dsn.
-        :param pool_size: maximum number of connections in the pool.
+        :param pool_size: number of connections kept in the pool.
+        :param replica_dsn: read replica dsn. Replica is not used if empty.
+        :param replica_max_lag: maximum replication lag in seconds to read from the replica.
+        :param replica_check_interval: time in seconds between replication lag checks.
+        :param max_overflow: number of connections allowed above `pool_size`.
+        :param pool_timeout: time in seconds to wait for a free connection.
+        :param pool_recycle: maximum age of a connection in seconds. Disabled if -1.
+        :param pre_ping: when connections are checked: "checkout", "background" or "off".
+        :param health_check_interval: time in seconds between background checks.
         """
 
         self._dsn: str = dsn
         self.pool_size: int = pool_size
 
+        self._replica_dsn: Optional[str] = replica_dsn or None
+        self._replica_max_lag: float = replica_max_lag
+        self._replica_check_interval: float = replica_check_interval
+
         self.engine: AsyncEngine
+        self.replica_engine: Optional[AsyncEngine] = None
 
-    async def open(self):
-        """Start the database client."""
+        # Replication lag in seconds, None until it is known
+        self.replica_lag: Optional[float] = None
+
+        self._max_overflow: int = max_overflow
+        self._pool_timeout: float = pool_timeout
+        self._pool_recycle: int = pool_recycle
+        self._pre_ping: str = pre_ping
+        self._health_check_interval: float = health_check_interval
+
+        self._pool_statistics: Dict[str, PoolStatistics] = {
+            "primary": PoolStatistics(),
+            "replica": PoolStatistics(),
+        }
+
+    def _create_engine(self, dsn: str) -> AsyncEngine:
+        """Create an engine with the configured pool."""
 
-        self.engine = create_async_engine(
-            self._dsn,
+        return create_async_engine(
+            dsn,
             json_deserializer=orjson.loads,
             pool_size=self.pool_size,
-            pool_pre_ping=True,
+            max_overflow=self._max_overflow,
+            pool_timeout=self._pool_timeout,
+            pool_recycle=self._pool_recycle,
+            pool_pre_ping=self._pre_ping == "checkout",
         )
 
+    @asynccontextmanager
+    async def _begin(self, engine: AsyncEngine) -> AsyncIterator[AsyncConnection]:
+        """Check out a connection, measuring the wait, and begin a transaction."""
+
+        pool_statistics: PoolStatistics = self._pool_statistics[
+            "primary" if engine is self.engine else "replica"
+        ]
+
+        connection: AsyncConnection = engine.connect()
+        time_begin: float = time.perf_counter()
+
+        try:
+            await connection.start()
+        except sa.exc.TimeoutError:
+            pool_statistics.timeouts += 1
+
+            raise
+
+        pool_statistics.add_checkout(time.perf_counter() - time_begin)
+
+        try:
+            async with connection.begin():
+                yield connection
+        finally:
+            await connection.close()
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[AsyncConnection]:
+        """
+        Run several queries in a single transaction on the primary.
+
+        Pass the connection to `fetchone` and `fetchall`.
+        """
+
+        async with self._begin(self.engine) as connection:
+            yield connection
+
+    async def open(self):
+        """Start the database client."""
+
+        self.engine = self._create_engine(self._dsn)
+
         async with self.engine.begin() as connection:
             await connection.execute(sa.select(sa.text("1")))
 
@@ -91,15 +223,121 @@ class DBClient(BaseClient):
             f"Established connection to the database: {make_url(self._dsn).render_as_string()}"
         )
 
+        if self._replica_dsn is not None:
+            self.replica_engine = self._create_engine(self._replica_dsn)
+
+            # Replica is optional, so the service starts even if it is down
+            await self.check_replica()
+
     async def close(self):
         """Stop the database client."""
 
         await self.engine.dispose()
 
+        if self.replica_engine is not None:
+            await self.replica_engine.dispose()
+
         logger.info(
             f"Closed connection to the database: {make_url(self._dsn).render_as_string()}"
         )
 
+    def _get_engine(self, query, replica: bool) -> AsyncEngine:
+        """Choose an engine for a query."""
+
+        if (
+            replica
+            and self.replica_engine is not None
+            and self.replica_lag is not None
+            and self.replica_lag <= self._replica_max_lag
+            and isinstance(query, sa.sql.Select)
+        ):
+            return self.replica_engine
+
+        return self.engine
+
+    async def check_replica(self):
+        """Measure replication lag. Lag is unknown if the replica is unreachable."""
+
+        if self.replica_engine is None:
+            return
+
+        try:
+            async with self.replica_engine.connect() as connection:
+                # Replica which has replayed everything it received isn't behind,
+                # even if the primary had no transactions for a while
+                lag: Optional[float] = (
+                    await connection.execute(
+                        sa.text(
+                            "SELECT CASE"
+                            " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+                            " ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())"
+                            " END"
+                        )
+                    )
+                ).scalar()
+        except (sa.exc.DBAPIError, OSError) as e:
+            logger.warning(f"Replica is unavailable: {e}")
+
+            self.replica_lag = None
+        else:
+            # Not a standby, e.g. the same server as the primary
+            self.replica_lag = float(lag) if lag is not None else 0.0
+
+    async def start_checking_replica(self):
+        """Start an endless loop which measures replication lag."""
+
+        while True:
+            await asyncio.sleep(self._replica_check_interval)
+            await self.check_replica()
+
+    async def check_pool(self, engine: AsyncEngine):
+        """
+        Check a pooled connection.
+
+        A disconnect invalidates the whole pool, so broken connections
+        are replaced before queries get them.
+        """
+
+        try:
+            async with engine.connect() as connection:
+                await connection.execute(sa.select(sa.text("1")))
+        except (sa.exc.DBAPIError, OSError) as e:
+            logger.warning(f"Database health check failed: {e}")
+
+    async def start_checking_pool(self):
+        """Start an endless loop which checks pooled connections instead of pre-ping."""
+
+        while True:
+            await asyncio.sleep(self._health_check_interval)
+
+            await self.check_pool(self.engine)
+
+            if self.replica_engine is not None:
+                await self.check_pool(self.replica_engine)
+
+    def get_pool_status(self) -> Dict[str, PoolStatus]:
+        """Return the state of connection pools."""
+
+        engines: Dict[str, Optional[AsyncEngine]] = {
+            "primary": self.engine,
+            "replica": self.replica_engine,
+        }
+
+        return {
+            name: PoolStatus(
+                size=engine.pool.size(),
+                checkedIn=engine.pool.checkedin(),
+                checkedOut=engine.pool.checkedout(),
+                overflow=max(engine.pool.overflow(), 0),
+                checkouts=self._pool_statistics[name].checkouts,
+                checkoutWaitTotal=self._pool_statistics[name].checkout_wait,
+                checkoutWaitMax=self._pool_statistics[name].checkout_wait_max,
+                timeouts=self._pool_statistics[name].timeouts,
+            )
+            for name, engine in engines.items()
+            if engine is not None
+        }
+
     def _transform_to_dict(self, element: Row):
         """Transform Row to dict. Default `dict(row)` uses non-str keys."""
 
@@ -113,6 +351,7 @@ class DBClient(BaseClient):
 
         :param query: SQLAlchemy query.
         :param connection: SQLAlchemy connection.
+        :param replica: allow reading from the replica.
         :return:
         """
 
@@ -135,6 +374,7 @@ class DBClient(BaseClient):
 
         :param query: SQLAlchemy query.
         :param connection: SQLAlchemy connection.
+        :param replica: allow reading from the replica.
         :return:
         """
 
@@ -148,3 +388,95 @@ class DBClient(BaseClient):
             results = []
 
         return results
+
+    async def copy_upsert(
+        self,
+        table: sa.Table,
+        columns: List[str],
+        records: Sequence[tuple],
+        conflict_columns: List[str],
+    ) -> int:
+        """
+        Write records with binary COPY, replacing rows which already exist.
+
+        Records are copied into a temporary staging table of the session and merged
+        with `INSERT ... ON CONFLICT DO UPDATE`, which COPY doesn't support by itself.
+        Only the last record of every key in the batch is kept. Returns the number of written rows.
+
+        :param table: target table.
+        :param columns: columns of records.
+        :param records: rows as tuples in the order of `columns`.
+        :param conflict_columns: columns of a unique constraint of the table.
+        """
+
+        staging: str = f"{table.name}_staging"
+        column_list: str = ", ".join(f'"{column}"' for column in columns)
+        key_list: str = ", ".join(f'"{column}"' for column in conflict_columns)
+        update_list: str = ", ".join(
+            f'"{column}" = EXCLUDED."{column}"'
+            for column in columns
+            if column not in conflict_columns
+        )
+        conflict_action: str = (
+            f"DO UPDATE SET {update_list}" if update_list else "DO NOTHING"
+        )
+
+        time_begin: float = time.time()
+
+        async with self._begin(self.engine) as connection:
+            raw_connection = await connection.get_raw_connection()
+            driver_connection = raw_connection.connection.driver_connection
+
+            # The driver connection bypasses the SQLAlchemy transaction,
+            # which is only started by its own queries
+            async with driver_connection.transaction():
+                # Kept for the whole session, rows are removed on commit
+                await driver_connection.execute(
+                    f'CREATE TEMPORARY TABLE IF NOT EXISTS "{staging}" ON COMMIT DELETE ROWS'
+                    f' AS SELECT {column_list} FROM "{table.name}" WITH NO DATA'
+                )
+                await driver_connection.copy_records_to_table(
+                    staging, records=records, columns=columns
+                )
+                status: str = await driver_connection.execute(
+                    f'INSERT INTO "{table.name}" ({column_list})'
+                    f" SELECT DISTINCT ON ({key_list}) {column_list}"
+                    f' FROM "{staging}" ORDER BY {key_list}, ctid DESC'
+                    f" ON CONFLICT ({key_list}) {conflict_action}"
+                )
+
+        logger.debug(
+            f"Copied {len(records)} rows into {table.name} in {time.time() - time_begin} seconds."
+        )
+
+        # Status is `INSERT 0 <rows>`
+        return int(status.rsplit(" ", 1)[-1])
+
+    async def listen(
+        self, channel: str, callback: Callable, check_interval: float = 5.0
+    ):
+        """
+        Call `callback` on every notification on the channel.
+
+        Holds a connection from the pool until the connection is closed
+        or the task is cancelled.
+
+        :param channel: PostgreSQL notification channel.
+        :param callback: function which receives (connection, pid, channel, payload).
+        :param check_interval: time in seconds between connection checks.
+        """
+
+        async with self.engine.connect() as connection:
+            raw_connection = await connection.get_raw_connection()
+            driver_connection = raw_connection.connection.driver_connection
+
+            await driver_connection.add_listener(channel, callback)
+
+            logger.info(f"Listening to database notifications on: {channel}")
+
+            try:
+                while not driver_connection.is_closed():
+                    await asyncio.sleep(check_interval)
+            finally:
+                if not driver_connection.is_closed():
+                    await driver_connection.remove_listener(channel, callback)
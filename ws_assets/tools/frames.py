@@ -0,0 +1,46 @@
+from typing import Optional, Union
+
+import orjson
+
+# Binary frames start with a single byte which describes their payload
+FRAME_HISTORY: bytes = b"\x02"
+
+
+class SharedFrame:
+    """
+    An encoded frame which is sent to one or more clients.
+
+    Frames are compressed by the transport with permessage-deflate, if the client negotiated it.
+    """
+
+    __slots__ = ("payload", "_text")
+
+    def __init__(self, payload: bytes):
+        self.payload: bytes = payload
+
+        self._text: Optional[str] = None
+
+    @property
+    def is_binary(self) -> bool:
+        """Payload is a tagged binary frame rather than JSON."""
+
+        return not self.payload.startswith(b"{")
+
+    @property
+    def text(self) -> str:
+        """Payload as a string for text frames."""
+
+        if self._text is None:
+            self._text = self.payload.decode()
+
+        return self._text
+
+
+def encode_frame(payload: Union[dict, bytes]) -> SharedFrame:
+    """
+    Encode a payload, so it can be done in a worker.
+
+    :param payload: frame payload. Binary payloads are used as is.
+    """
+
+    return SharedFrame(payload if isinstance(payload, bytes) else orjson.dumps(payload))
@@ -0,0 +1,130 @@
+from array import array
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional
+
+from ws_assets.models.asset import AssetPointRecord
+from ws_assets.tools.asset_registry import AssetSnapshot
+
+
+class HistoryBuffer:
+    __slots__ = ("start", "times", "values")
+
+    def __init__(self, start: int):
+        """
+        Recent points of a single asset in compact arrays, sorted by time.
+
+        :param start: the buffer has all points with time after `start` in epoch milliseconds.
+        """
+
+        self.start: int = start
+
+        self.times: array = array("q")
+        self.values: array = array("d")
+
+    def append(self, time: int, value: float):
+        """
+        Add a point. Points of concurrent ticks may arrive out of order.
+
+        A point with a time already in the buffer replaces its value, like in the database.
+        """
+
+        if not self.times or time > self.times[-1]:
+            self.times.append(time)
+            self.values.append(value)
+            return
+
+        index: int = bisect_right(self.times, time)
+
+        if index and self.times[index - 1] == time:
+            self.values[index - 1] = value
+        else:
+            self.times.insert(index, time)
+            self.values.insert(index, value)
+
+    def trim(self, since: int):
+        """Drop points with time up to `since`."""
+
+        index: int = bisect_right(self.times, since)
+
+        if index:
+            del self.times[:index]
+            del self.values[:index]
+
+        self.start = max(self.start, since)
+
+
+class HistoryBuffers:
+    def __init__(self, window: int):
+        """
+        Recent history of every asset, so subscribes don't query the database.
+
+        Buffers are loaded once on startup and then appended with every stored tick.
+        A buffer answers only requests it has all points for, others go to the database.
+
+        :param window: time in seconds of history kept for every asset.
+        """
+
+        self.window: int = window
+
+        self._buffers: Dict[int, HistoryBuffer] = {}
+
+    def load(self, asset_ids: Iterable[int], since: int, rows: List[dict]):
+        """
+        Fill buffers with points loaded from the database.
+
+        :param asset_ids: ids of loaded assets, including ones without points.
+        :param since: points were loaded with time after `since` in epoch milliseconds.
+        :param rows: points with `asset_id`, `time` in epoch milliseconds and `value`, sorted by time.
+        """
+
+        for asset_id in asset_ids:
+            self._buffers[asset_id] = HistoryBuffer(start=since)
+
+        for row in rows:
+            self._buffers[row["asset_id"]].append(row["time"], row["value"])
+
+    def append(self, asset_points: List[AssetPointRecord]):
+        """Add stored points and drop ones which are older than the window."""
+
+        for asset_point in asset_points:
+            buffer: Optional[HistoryBuffer] = self._buffers.get(asset_point.assetId)
+
+            # Asset has started being tracked, earlier points may be missing
+            if buffer is None:
+                buffer = self._buffers[asset_point.assetId] = HistoryBuffer(
+                    start=asset_point.time - 1
+                )
+
+            buffer.append(asset_point.time, asset_point.value)
+            buffer.trim(asset_point.time - self.window * 1000)
+
+    def get(
+        self, asset_id: int, asset_name: str, since: int
+    ) -> Optional[List[AssetPointRecord]]:
+        """
+        Return points with time after `since` or None if the buffer doesn't have all of them.
+
+        :param asset_id: asset id.
+        :param asset_name: asset name.
+        :param since: time in epoch milliseconds.
+        """
+
+        buffer: Optional[HistoryBuffer] = self._buffers.get(asset_id)
+
+        if buffer is None or buffer.start > since:
+            return None
+
+        index: int = bisect_right(buffer.times, since)
+
+        return [
+            AssetPointRecord(asset_name, time, asset_id, value)
+            for time, value in zip(buffer.times[index:], buffer.values[index:])
+        ]
+
+    def retain_assets(self, assets: AssetSnapshot):
+        """Drop buffers of assets which are not tracked anymore."""
+
+        for asset_id in [
+            asset_id for asset_id in self._buffers if asset_id not in assets.id_to_name
+        ]:
+            del self._buffers[asset_id]
@@ -0,0 +1,191 @@
+import struct
+from typing import List, Literal, Optional, Tuple, Union
+
+import numpy as np
+
+from ws_assets.models.asset import AssetPointRecord
+from ws_assets.tools.frames import FRAME_HISTORY, SharedFrame, encode_frame
+
+HistoryEncoding = Literal["full", "delta", "binary"]
+
+# Values are sent as integers with this many decimal digits
+DEFAULT_SCALE: int = 6
+
+# Tag, asset id, number of points, start time, interval (0 if time deltas follow),
+# base value, scale, width of deltas in bytes and length of the asset name
+_BINARY_HEADER = struct.Struct("<siIqqqBBH")
+
+_DELTA_TYPES = {2: "<i2", 4: "<i4", 8: "<i8"}
+
+
+def _to_deltas(
+    asset_history: List[AssetPointRecord], scale: int
+) -> Tuple[np.ndarray, np.ndarray, Optional[int], Optional[int]]:
+    """
+    Return time deltas, scaled value deltas, the interval if points are evenly spaced
+    and the first scaled value.
+    """
+
+    times: np.ndarray = np.fromiter(
+        (asset_point.time for asset_point in asset_history),
+        dtype=np.int64,
+        count=len(asset_history),
+    )
+    values: np.ndarray = np.rint(
+        np.fromiter(
+            (asset_point.value for asset_point in asset_history),
+            dtype=np.float64,
+            count=len(asset_history),
+        )
+        * 10**scale
+    ).astype(np.int64)
+
+    time_deltas: np.ndarray = np.diff(times)
+    interval: Optional[int] = (
+        int(time_deltas[0])
+        if len(time_deltas)
+        and time_deltas[0] > 0
+        and (time_deltas == time_deltas[0]).all()
+        else None
+    )
+
+    base: Optional[int] = int(values[0]) if len(values) else None
+
+    return time_deltas, np.diff(values), interval, base
+
+
+def encode_history_delta(
+    asset_id: int,
+    asset_name: str,
+    asset_history: List[AssetPointRecord],
+    scale: int = DEFAULT_SCALE,
+) -> dict:
+    """
+    Encode history as a start time and time deltas or a fixed interval,
+    and values as integer deltas from the first value. Follows `ResponseHistoryDelta`.
+
+    Values are rounded to `scale` decimal digits.
+    """
+
+    time_deltas, value_deltas, interval, base = _to_deltas(asset_history, scale)
+
+    return {
+        "action": "asset_history_delta",
+        "message": {
+            "assetName": asset_name,
+            "assetId": asset_id,
+            "count": len(asset_history),
+            "start": asset_history[0].time if asset_history else None,
+            "interval": interval,
+            "timeDeltas": [] if interval is not None else time_deltas.tolist(),
+            "scale": scale,
+            "base": base,
+            "valueDeltas": value_deltas.tolist(),
+        },
+    }
+
+
+def encode_history_binary(
+    asset_id: int,
+    asset_name: str,
+    asset_history: List[AssetPointRecord],
+    scale: int = DEFAULT_SCALE,
+) -> bytes:
+    """
+    Encode history like `encode_history_delta` into a binary frame.
+
+    Little-endian header `_BINARY_HEADER` is followed by the UTF-8 asset name,
+    time deltas if there is no interval and value deltas. Deltas are signed integers
+    of the smallest width which fits all of them.
+    """
+
+    time_deltas, value_deltas, interval, base = _to_deltas(asset_history, scale)
+
+    deltas: np.ndarray = (
+        value_deltas
+        if interval is not None
+        else np.concatenate((time_deltas, value_deltas))
+    )
+    largest: int = int(np.abs(deltas).max()) if len(deltas) else 0
+    width: int = 2 if largest < 2**15 else 4 if largest < 2**31 else 8
+
+    name: bytes = asset_name.encode()
+
+    return (
+        _BINARY_HEADER.pack(
+            FRAME_HISTORY,
+            asset_id,
+            len(asset_history),
+            asset_history[0].time if asset_history else 0,
+            interval or 0,
+            base or 0,
+            scale,
+            width,
+            len(name),
+        )
+        + name
+        + deltas.astype(_DELTA_TYPES[width]).tobytes()
+    )
+
+
+def decode_history_binary(data: bytes) -> Tuple[int, str, List[Tuple[int, float]]]:
+    """Decode a binary history frame into the asset id, asset name and (time, value) pairs."""
+
+    (
+        _,
+        asset_id,
+        count,
+        start,
+        interval,
+        base,
+        scale,
+        width,
+        name_length,
+    ) = _BINARY_HEADER.unpack_from(data)
+
+    offset: int = _BINARY_HEADER.size
+    asset_name: str = data[offset : offset + name_length].decode()
+    offset += name_length
+
+    deltas: np.ndarray = np.frombuffer(data, dtype=_DELTA_TYPES[width], offset=offset)
+
+    if not count:
+        return asset_id, asset_name, []
+
+    if interval:
+        time_deltas: np.ndarray = np.full(count - 1, interval, dtype=np.int64)
+        value_deltas: np.ndarray = deltas
+    else:
+        time_deltas, value_deltas = deltas[: count - 1], deltas[count - 1 :]
+
+    times: np.ndarray = np.concatenate(([start], start + np.cumsum(time_deltas)))
+    values: np.ndarray = np.concatenate(([base], base + np.cumsum(value_deltas))) / (
+        10**scale
+    )
+
+    return asset_id, asset_name, list(zip(times.tolist(), values.tolist()))
+
+
+def encode_history_frame(
+    asset_id: int,
+    asset_name: str,
+    asset_history: List[AssetPointRecord],
+    encoding: HistoryEncoding,
+    scale: int = DEFAULT_SCALE,
+) -> SharedFrame:
+    """
+    Encode a history frame, so it can be done in a worker. See `encode_frame`.
+
+    :param scale: number of decimal digits kept in `delta` and `binary` encodings.
+    """
+
+    payload: Union[dict, bytes]
+
+    if encoding == "delta":
+        payload = encode_history_delta(asset_id, asset_name, asset_history, scale)
+    elif encoding == "binary":
+        payload = encode_history_binary(asset_id, asset_name, asset_history, scale)
+    else:
+        payload = {"action": "asset_history", "message": {"points": asset_history}}
+
+    return encode_frame(payload)
@@ -0,0 +1,194 @@
+import math
+from typing import Dict, List, Optional, Tuple
+
+from ws_assets.exceptions import UnknownIndicatorWindowError
+from ws_assets.models.asset import AssetPointRecord
+from ws_assets.models.indicator import IndicatorRecord
+from ws_assets.tools.asset_registry import AssetSnapshot
+
+
+class RollingStatistics:
+    __slots__ = (
+        "window",
+        "_values",
+        "_returns",
+        "_index",
+        "_count",
+        "_seen",
+        "_sum",
+        "_return_sum",
+        "_return_square_sum",
+        "_ema",
+        "_alpha",
+        "_last",
+    )
+
+    def __init__(self, window: int):
+        """
+        Moving averages and volatility of the last `window` values in O(1) per value.
+
+        Values and log returns are kept in ring buffers with running sums.
+        Sums are recomputed exactly every time the buffer wraps around,
+        so floating point errors don't accumulate.
+
+        :param window: number of values in the window.
+        """
+
+        self.window: int = window
+
+        self._values: List[float] = [0.0] * window
+        self._returns: List[float] = [0.0] * window
+        self._index: int = 0
+        self._count: int = 0
+
+        # Number of values seen, capped at `window + 1`. The first value has no return
+        self._seen: int = 0
+
+        self._sum: float = 0.0
+        self._return_sum: float = 0.0
+        self._return_square_sum: float = 0.0
+
+        self._ema: Optional[float] = None
+        self._alpha: float = 2 / (window + 1)
+        self._last: Optional[float] = None
+
+    def update(self, value: float):
+        """Add a value, replacing the oldest one if the window is full."""
+
+        index: int = self._index
+        is_full: bool = self._count == self.window
+
+        # Values
+        self._sum += value - (self._values[index] if is_full else 0.0)
+        self._values[index] = value
+
+        # Log returns
+        if self._last is not None and self._last > 0 and value > 0:
+            value_return: float = math.log(value / self._last)
+        else:
+            value_return = 0.0
+
+        old_return: float = self._returns[index] if is_full else 0.0
+        self._return_sum += value_return - old_return
+        self._return_square_sum += value_return**2 - old_return**2
+        self._returns[index] = value_return
+
+        self._index = (index + 1) % self.window
+        self._count = min(self._count + 1, self.window)
+        self._seen = min(self._seen + 1, self.window + 1)
+        self._last = value
+
+        self._ema = (
+            value
+            if self._ema is None
+            else self._ema + self._alpha * (value - self._ema)
+        )
+
+        if self._index == 0:
+            self._sum = math.fsum(self._values)
+            self._return_sum = math.fsum(self._returns)
+            self._return_square_sum = math.fsum(r**2 for r in self._returns)
+
+    @property
+    def sma(self) -> float:
+        """Simple moving average."""
+
+        return self._sum / self._count
+
+    @property
+    def ema(self) -> float:
+        """Exponential moving average."""
+
+        return self._ema  # type: ignore
+
+    @property
+    def volatility(self) -> Optional[float]:
+        """Standard deviation of log returns. None until there are 2 returns."""
+
+        count: int = self._seen - 1
+
+        if count < 2:
+            return None
+
+        variance: float = (self._return_square_sum - self._return_sum**2 / count) / (
+            count - 1
+        )
+
+        return math.sqrt(max(variance, 0.0))
+
+
+class IndicatorEngine:
+    def __init__(self, windows: List[int]):
+        """
+        Rolling statistics of every asset for every window, updated on each tick.
+
+        :param windows: window lengths in ticks.
+        """
+
+        self._windows: List[int] = windows
+
+        self._statistics: Dict[Tuple[int, int], RollingStatistics] = {}
+
+        # Latest values to answer new subscribers
+        self._records: Dict[Tuple[int, int], IndicatorRecord] = {}
+
+        # Time of the last point of every asset
+        self._times: Dict[int, int] = {}
+
+    @property
+    def windows(self) -> List[int]:
+        return self._windows
+
+    def check_window(self, window: int):
+        """Raise `UnknownIndicatorWindowError` if the window isn't computed."""
+
+        if window not in self._windows:
+            raise UnknownIndicatorWindowError(window=window, windows=self._windows)
+
+    def update(self, asset_points: List[AssetPointRecord]) -> List[IndicatorRecord]:
+        """Update statistics with points of a tick and return new indicator values."""
+
+        records: List[IndicatorRecord] = []
+
+        for asset_point in asset_points:
+            # Ticks run concurrently, so a slow tick may finish after the next one
+            if asset_point.time <= self._times.get(asset_point.assetId, -1):
+                continue
+
+            self._times[asset_point.assetId] = asset_point.time
+
+            for window in self._windows:
+                key: Tuple[int, int] = (asset_point.assetId, window)
+
+                statistics: Optional[RollingStatistics] = self._statistics.get(key)
+                if statistics is None:
+                    statistics = self._statistics[key] = RollingStatistics(window)
+
+                statistics.update(asset_point.value)
+
+                record = IndicatorRecord(
+                    asset_point.assetName,
+                    asset_point.time,
+                    asset_point.assetId,
+                    window,
+                    statistics.sma,
+                    statistics.ema,
+                    statistics.volatility,
+                )
+                self._records[key] = record
+                records.append(record)
+
+        return records
+
+    def get(self, asset_id: int, window: int) -> Optional[IndicatorRecord]:
+        """Return the latest indicator values or None if there are no points yet."""
+
+        return self._records.get((asset_id, window))
+
+    def retain_assets(self, assets: AssetSnapshot):
+        """Drop statistics of assets which are not tracked anymore."""
+
+        for key in [key for key in self._statistics if key[0] not in assets.id_to_name]:
+            del self._statistics[key]
+            self._records.pop(key, None)
+            self._times.pop(key[0], None)
@@ -0,0 +1,65 @@
+import asyncio
+
+from loguru import logger
+
+from ws_assets.tools.rate_limiter import RateLimiter
+
+
+class LoopLagMonitor:
+    def __init__(self, interval: float = 0.1, warning_lag: float = 0.1):
+        """
+        Measures how late the event loop wakes up a sleeping task.
+
+        Lag shows how long the loop was blocked by synchronous work,
+        like encoding frames or compiling queries.
+
+        :param interval: time in seconds between samples.
+        :param warning_lag: lag in seconds above which a warning is logged. Disabled if 0.
+        """
+
+        self._interval: float = interval
+        self._warning_lag: float = warning_lag
+
+        # Warnings are logged at most once per 10 seconds
+        self._warning_limiter: RateLimiter = RateLimiter(rate=0.1, burst=1)
+
+        self.samples: int = 0
+        self.last: float = 0.0
+        self.max: float = 0.0
+
+        # Exponential moving average
+        self.average: float = 0.0
+
+    def add_sample(self, lag: float):
+        """Account a single lag measurement in seconds."""
+
+        self.samples += 1
+        self.last = lag
+        self.max = max(self.max, lag)
+        self.average = lag if self.samples == 1 else 0.9 * self.average + 0.1 * lag
+
+        if (
+            self._warning_lag
+            and lag > self._warning_lag
+            and self._warning_limiter.acquire()
+        ):
+            logger.warning(f"Event loop was blocked for {lag:.3f}s")
+
+    def reset_max(self) -> float:
+        """Return the maximum lag since the previous call and reset it."""
+
+        lag: float = self.max
+        self.max = 0.0
+
+        return lag
+
+    async def start_sampling(self):
+        """Start an endless loop which measures the lag every `interval` seconds."""
+
+        loop = asyncio.get_running_loop()
+
+        while True:
+            expected: float = loop.time() + self._interval
+            await asyncio.sleep(self._interval)
+
+            self.add_sample(max(loop.time() - expected, 0.0))
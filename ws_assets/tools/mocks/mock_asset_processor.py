@@ -1,23 +1,43 @@
 import asyncio
 from datetime import datetime
-from typing import Callable, Coroutine, List
+from typing import Callable, Coroutine, List, Optional
 
 import sqlalchemy as sa  # type: ignore
 
-from ws_assets.models.asset import Asset, AssetPoint
+from ws_assets.exceptions import UnknownAssetIDError
+from ws_assets.models.asset import Asset, AssetPointRecord
+from ws_assets.models.indicator import IndicatorRecord
+from ws_assets.tools.asset_registry import AssetSnapshot
+from ws_assets.tools.frames import SharedFrame
+from ws_assets.tools.indicators import IndicatorEngine
+from ws_assets.tools.quote_cache import QuoteCache
+from ws_assets.tools.tick_spans import TickSpans
 
 
 class MockAssetProcessor:
     """
-    Class that mocks `fetch_assets`, `fetch_asset_history`, and `start_receiving_asset_points` methods.
+    Class that mocks `fetch_assets`, `fetch_assets_frame`, `get_asset_name`, `get_quotes_frame`, `fetch_asset_history`, `warm_up_history`, and `start_receiving_asset_points` methods.
 
     Used for testing websocket endpoint.
     """
 
-    def __init__(self, subscription_handler: Callable[[List[AssetPoint]], Coroutine]):
+    def __init__(
+        self,
+        subscription_handler: Callable[[List[AssetPointRecord]], Coroutine],
+        indicator_handler: Optional[
+            Callable[[List[IndicatorRecord]], Coroutine]
+        ] = None,
+    ):
         self._subscription_handler: Callable[
-            [List[AssetPoint]], Coroutine
+            [List[AssetPointRecord]], Coroutine
         ] = subscription_handler
+        self._indicator_handler: Optional[
+            Callable[[List[IndicatorRecord]], Coroutine]
+        ] = indicator_handler
+
+        self.indicator_engine = IndicatorEngine(windows=[20])
+        self.quote_cache = QuoteCache()
+        self.tick_spans: Optional[TickSpans] = None
 
     async def fetch_assets(self) -> List[Asset]:
         raw_assets: List[dict] = [
@@ -31,53 +51,80 @@ class MockAssetProcessor:
 
         return assets
 
+    async def fetch_assets_frame(self) -> SharedFrame:
+        return AssetSnapshot(await self.fetch_assets()).frame
+
+    def get_asset_name(self, asset_id: int) -> str:
+        asset_names: List[str] = ["EURUSD", "USDJPY", "GBPUSD", "AUDUSD", "USDCAD"]
+
+        if not 1 <= asset_id <= len(asset_names):
+            raise UnknownAssetIDError(asset_id=asset_id)
+
+        return asset_names[asset_id - 1]
+
+    def get_quotes_frame(self, asset_ids: List[int]) -> SharedFrame:
+        for asset_id in asset_ids:
+            self.get_asset_name(asset_id=asset_id)
+
+        return self.quote_cache.frame(asset_ids)
+
     async def fetch_asset_history(
         self, asset_id: int, time: int = 30 * 60
-    ) -> List[AssetPoint]:
+    ) -> List[AssetPointRecord]:
         raw_asset_points: List[dict] = [
             {
                 "assetName": "EURUSD",
-                "time": 1647092464,
+                "time": 1647092464000,
                 "assetId": 1,
                 "value": 1.0911849999999998,
             },
             {
                 "assetName": "EURUSD",
-                "time": 1647092464,
+                "time": 1647092464000,
                 "assetId": 1,
                 "value": 0.8911849999999998,
             },
         ]
 
-        asset_points: List[AssetPoint] = [
-            AssetPoint(**raw_asset_point) for raw_asset_point in raw_asset_points
+        asset_points: List[AssetPointRecord] = [
+            AssetPointRecord(**raw_asset_point) for raw_asset_point in raw_asset_points
         ]
 
         return asset_points
 
+    async def warm_up_history(self):
+        pass
+
     async def _receive_asset_point(self):
         """Make a request to the asset endpoint."""
 
         raw_asset_points: List[dict] = [
             {
                 "assetName": "EURUSD",
-                "time": 1647092464,
+                "time": 1647092464000,
                 "assetId": 1,
                 "value": 1.0911849999999998,
             },
             {
                 "assetName": "USDJPY",
-                "time": 1647092464,
+                "time": 1647092464000,
                 "assetId": 2,
                 "value": 0.8911849999999998,
             },
         ]
-        asset_points: List[AssetPoint] = [
-            AssetPoint(**raw_asset_point) for raw_asset_point in raw_asset_points
+        asset_points: List[AssetPointRecord] = [
+            AssetPointRecord(**raw_asset_point) for raw_asset_point in raw_asset_points
         ]
 
+        self.quote_cache.update(asset_points)
+
         await self._subscription_handler(asset_points)
 
+        indicators: List[IndicatorRecord] = self.indicator_engine.update(asset_points)
+
+        if indicators and self._indicator_handler is not None:
+            await self._indicator_handler(indicators)
+
     async def start_receiving_asset_points(self):
         """Start an endless loop which receives data points every second."""
 
@@ -87,3 +134,6 @@ class MockAssetProcessor:
             asyncio.create_task(self._receive_asset_point())
 
             await asyncio.sleep(1)
+
+    async def wait_for_ticks(self, timeout: float):
+        pass
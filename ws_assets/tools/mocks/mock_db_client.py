@@ -5,7 +5,7 @@ from ws_assets.tools.meta.base_client import BaseClient
 
 class MockDBClient:
     """
-    Class that mocks `open`, `close`, `fetchone`, and `fetchall` methods.
+    Class that mocks `open`, `close`, `fetchone`, `fetchall`, and `copy_upsert` methods.
 
     Used for testing.
     """
@@ -13,5 +13,13 @@ class MockDBClient:
     def __init__(self, return_fetchall: Optional[List[dict]] = None):
         self.return_fetchall: Optional[List[dict]] = return_fetchall
 
+        # Records of every `copy_upsert` call
+        self.copied_records: List[list] = []
+
     async def fetchall(self, *args, **kwargs):
         return self.return_fetchall
+
+    async def copy_upsert(self, table, columns, records, conflict_columns) -> int:
+        self.copied_records.append(list(records))
+
+        return len(records)
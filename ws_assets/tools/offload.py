@@ -0,0 +1,67 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Literal, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Offloader:
+    def __init__(
+        self,
+        kind: Literal["thread", "process"] = "process",
+        workers: int = 2,
+        min_size: int = 64 * 1024,
+    ):
+        """
+        Runs CPU-heavy work on large inputs in a worker pool instead of the event loop.
+
+        Small inputs are processed inline, since handing them to a worker costs more
+        than processing them. orjson holds the GIL for the whole call, so a thread
+        which parses or encodes a large payload blocks the event loop just like inline
+        work. Processes don't share the GIL, but inputs and results are pickled.
+        Threads only help with work which releases the GIL.
+
+        :param kind: worker pool type.
+        :param workers: number of workers.
+        :param min_size: minimal input size in bytes to offload.
+        """
+
+        self._kind: Literal["thread", "process"] = kind
+        self._workers: int = workers
+        self._min_size: int = min_size
+
+        # Created on first use, so workers aren't started if nothing is large
+        self._executor: Optional[Executor] = None
+
+    async def run(self, func: Callable[..., T], *args, size: int) -> T:
+        """
+        Call `func(*args)`, in a worker if the input is large.
+
+        Functions and arguments must be picklable for process pools.
+
+        :param func: function to call.
+        :param size: input size in bytes.
+        """
+
+        if size < self._min_size:
+            return func(*args)
+
+        if self._executor is None:
+            self._executor = (
+                ProcessPoolExecutor(max_workers=self._workers)
+                if self._kind == "process"
+                else ThreadPoolExecutor(
+                    max_workers=self._workers, thread_name_prefix="offload"
+                )
+            )
+
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, func, *args
+        )
+
+    def close(self):
+        """Stop workers. Work in progress is finished in background."""
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
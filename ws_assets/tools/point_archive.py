@@ -0,0 +1,227 @@
+import asyncio
+import zlib
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import sqlalchemy as sa  # type: ignore
+from loguru import logger
+from sqlalchemy.dialects.postgresql import insert  # type: ignore
+
+from ws_assets.database.tables import Tables
+from ws_assets.models.asset import AssetPointRecord
+from ws_assets.tools.clock import Clock, to_epoch_milliseconds
+from ws_assets.tools.db_client import DBClient
+from ws_assets.tools.history_codec import decode_history_binary, encode_history_binary
+
+# Key of the advisory lock which lets a single pod compact at a time
+_COMPACTION_LOCK: int = 0x50_6F_69_6E_74
+
+
+def encode_archive(asset_id: int, points: List[Tuple[int, float]], scale: int) -> bytes:
+    """
+    Encode (time, value) pairs sorted by time as a compressed binary history frame.
+
+    Times are kept exactly, values are rounded to `scale` decimal digits.
+    """
+
+    return zlib.compress(
+        encode_history_binary(
+            asset_id,
+            "",
+            [AssetPointRecord("", time, asset_id, value) for time, value in points],
+            scale=scale,
+        )
+    )
+
+
+def decode_archive(data: bytes) -> List[Tuple[int, float]]:
+    """Decode (time, value) pairs of an archive."""
+
+    return decode_history_binary(zlib.decompress(data))[2]
+
+
+def merge_points(
+    archived: List[Tuple[int, float]], points: List[Tuple[int, float]]
+) -> List[Tuple[int, float]]:
+    """Merge points into archived ones. Points replace archived points with the same time."""
+
+    merged: Dict[int, float] = dict(archived)
+    merged.update(points)
+
+    return sorted(merged.items())
+
+
+class PointArchiver:
+    def __init__(
+        self,
+        db_client: DBClient,
+        age: float = 7 * 24 * 60 * 60,
+        interval: float = 60 * 60,
+        scale: int = 8,
+        clock: Optional[Clock] = None,
+    ):
+        """
+        Moves old points from `Point` into compressed per-asset per-day rows of `PointArchive`.
+
+        Only whole UTC days older than `age` are archived, so the hot table stays
+        about `age` long and its size and vacuum work stop growing with uptime.
+        Points written into archived days later, e.g. by a backfill, are merged
+        into the archive by the next compaction.
+
+        :param db_client: database client.
+        :param age: minimal age of archived points in seconds.
+        :param interval: time in seconds between compactions.
+        :param scale: number of decimal digits kept in archived values.
+        :param clock: source of the current time.
+        """
+
+        self._db_client: DBClient = db_client
+        self._age: float = age
+        self._interval: float = interval
+        self._scale: int = scale
+        self._clock: Clock = clock or Clock()
+
+    def cutoff(self) -> datetime:
+        """Points before this time may be archived."""
+
+        day: date = (self._clock.now() - timedelta(seconds=self._age)).date()
+
+        return datetime.combine(day, time(), tzinfo=timezone.utc)
+
+    async def read(
+        self, asset_id: int, asset_name: str, since: datetime
+    ) -> List[AssetPointRecord]:
+        """Return archived points of an asset after `since`, sorted by time."""
+
+        raw_archives: List[dict] = await self._db_client.fetchall(
+            sa.select([Tables.point_archive.c.data])
+            .where(Tables.point_archive.c.asset_id == asset_id)
+            .where(Tables.point_archive.c.day >= since.date())
+            .order_by(Tables.point_archive.c.day)
+        )
+
+        since_time: int = to_epoch_milliseconds(since)
+
+        return [
+            AssetPointRecord(asset_name, time, asset_id, value)
+            for raw_archive in raw_archives
+            for time, value in decode_archive(raw_archive["data"])
+            if time > since_time
+        ]
+
+    async def compact(self) -> int:
+        """
+        Archive points before the cutoff and return their number.
+
+        Every asset and day is moved in its own transaction. Stops at once
+        if another pod is compacting.
+        """
+
+        cutoff: datetime = self.cutoff()
+        archived: int = 0
+
+        while True:
+            async with self._db_client.transaction() as connection:
+                is_locked: dict = await self._db_client.fetchone(
+                    sa.select(
+                        [
+                            sa.func.pg_try_advisory_xact_lock(_COMPACTION_LOCK).label(
+                                "locked"
+                            )
+                        ]
+                    ),
+                    connection=connection,
+                )
+
+                if not is_locked["locked"]:
+                    break
+
+                # The oldest hot point chooses the next asset and day
+                oldest: dict = await self._db_client.fetchone(
+                    sa.select([Tables.point.c.asset_id, Tables.point.c.ts])
+                    .where(Tables.point.c.ts < cutoff)
+                    .order_by(Tables.point.c.ts)
+                    .limit(1),
+                    connection=connection,
+                )
+
+                if not oldest:
+                    break
+
+                archived += await self._compact_day(
+                    asset_id=oldest["asset_id"],
+                    day=oldest["ts"].astimezone(timezone.utc).date(),
+                    connection=connection,
+                )
+
+        if archived:
+            logger.info(f"Archived {archived} points before {cutoff.isoformat()}")
+
+        return archived
+
+    async def _compact_day(self, asset_id: int, day: date, connection) -> int:
+        """Move points of an asset and day into the archive and return their number."""
+
+        day_start: datetime = datetime.combine(day, time(), tzinfo=timezone.utc)
+        day_end: datetime = day_start + timedelta(days=1)
+
+        raw_asset_points: List[dict] = await self._db_client.fetchall(
+            sa.select([Tables.point.c.ts, Tables.point.c.value])
+            .where(Tables.point.c.asset_id == asset_id)
+            .where(Tables.point.c.ts >= day_start)
+            .where(Tables.point.c.ts < day_end)
+            .order_by(Tables.point.c.ts),
+            connection=connection,
+        )
+
+        raw_archive: dict = await self._db_client.fetchone(
+            sa.select([Tables.point_archive.c.data])
+            .where(Tables.point_archive.c.asset_id == asset_id)
+            .where(Tables.point_archive.c.day == day),
+            connection=connection,
+        )
+
+        points: List[Tuple[int, float]] = merge_points(
+            archived=decode_archive(raw_archive["data"]) if raw_archive else [],
+            points=[
+                (to_epoch_milliseconds(raw_asset_point["ts"]), raw_asset_point["value"])
+                for raw_asset_point in raw_asset_points
+            ],
+        )
+
+        statement = insert(Tables.point_archive).values(
+            asset_id=asset_id,
+            day=day,
+            count=len(points),
+            data=encode_archive(asset_id=asset_id, points=points, scale=self._scale),
+        )
+        await self._db_client.fetchall(
+            statement.on_conflict_do_update(
+                index_elements=["asset_id", "day"],
+                set_={
+                    "count": statement.excluded.count,
+                    "data": statement.excluded.data,
+                },
+            ),
+            connection=connection,
+        )
+        await self._db_client.fetchall(
+            sa.delete(Tables.point)
+            .where(Tables.point.c.asset_id == asset_id)
+            .where(Tables.point.c.ts >= day_start)
+            .where(Tables.point.c.ts < day_end),
+            connection=connection,
+        )
+
+        return len(raw_asset_points)
+
+    async def start_compacting(self):
+        """Start an endless loop which compacts every `interval` seconds."""
+
+        while True:
+            try:
+                await self.compact()
+            except Exception as e:
+                logger.exception(e)
+
+            await asyncio.sleep(self._interval)
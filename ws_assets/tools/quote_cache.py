@@ -0,0 +1,87 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import orjson
+
+from ws_assets.models.asset import AssetPointRecord
+from ws_assets.tools.asset_registry import AssetSnapshot
+from ws_assets.tools.frames import SharedFrame
+
+
+class QuoteCache:
+    def __init__(self, max_frames: int = 1024):
+        """
+        Latest point of every asset, updated on each tick.
+
+        Answers `quote` requests without the database. Frames are encoded once per
+        set of assets and reused until the next tick.
+
+        :param max_frames: maximum number of distinct asset sets with a cached frame.
+        """
+
+        self._max_frames: int = max_frames
+
+        self._asset_points: Dict[int, AssetPointRecord] = {}
+        self._frames: Dict[Tuple[int, ...], SharedFrame] = {}
+
+    def update(self, asset_points: List[AssetPointRecord]):
+        """Keep the latest points of a tick."""
+
+        for asset_point in asset_points:
+            latest: Optional[AssetPointRecord] = self._asset_points.get(
+                asset_point.assetId
+            )
+
+            # Ticks run concurrently, so a slow tick may finish after the next one
+            if latest is None or latest.time <= asset_point.time:
+                self._asset_points[asset_point.assetId] = asset_point
+
+        self._frames.clear()
+
+    def get(self, asset_id: int) -> Optional[AssetPointRecord]:
+        """Return the latest point or None if there are no points yet."""
+
+        return self._asset_points.get(asset_id)
+
+    def frame(self, asset_ids: Sequence[int]) -> SharedFrame:
+        """
+        Return a pre-encoded `quote` frame with the latest points of assets.
+
+        Frame follows `ResponseQuote`. Assets without points are omitted.
+        """
+
+        key: Tuple[int, ...] = tuple(asset_ids)
+
+        frame: Optional[SharedFrame] = self._frames.get(key)
+
+        if frame is None:
+            frame = SharedFrame(
+                orjson.dumps(
+                    {
+                        "action": "quote",
+                        "message": {
+                            "points": [
+                                self._asset_points[asset_id]
+                                for asset_id in key
+                                if asset_id in self._asset_points
+                            ]
+                        },
+                    }
+                )
+            )
+
+            if len(self._frames) < self._max_frames:
+                self._frames[key] = frame
+
+        return frame
+
+    def retain_assets(self, assets: AssetSnapshot):
+        """Drop points of assets which are not tracked anymore."""
+
+        for asset_id in [
+            asset_id
+            for asset_id in self._asset_points
+            if asset_id not in assets.id_to_name
+        ]:
+            del self._asset_points[asset_id]
+
+        self._frames.clear()
@@ -0,0 +1,137 @@
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ws_assets.tools.asset_registry import AssetSnapshot
+
+# Field getters keep loops over rates inside C
+_get_symbol = itemgetter("Symbol")
+_get_bid = itemgetter("Bid")
+_get_ask = itemgetter("Ask")
+
+
+class QuoteBatch:
+    __slots__ = (
+        "asset_ids",
+        "asset_names",
+        "bids",
+        "asks",
+        "mids",
+        "spreads",
+        "spread_pips",
+    )
+
+    def __init__(
+        self,
+        asset_ids: np.ndarray,
+        asset_names: List[str],
+        bids: np.ndarray,
+        asks: np.ndarray,
+        pip_sizes: np.ndarray,
+    ):
+        """
+        Quotes of tracked assets received in a single tick, one array element per asset.
+
+        :param asset_ids: asset ids.
+        :param asset_names: asset names.
+        :param bids: bid prices.
+        :param asks: ask prices.
+        :param pip_sizes: pip size of every asset, NaN if it is not configured.
+        """
+
+        self.asset_ids: np.ndarray = asset_ids
+        self.asset_names: List[str] = asset_names
+        self.bids: np.ndarray = bids
+        self.asks: np.ndarray = asks
+
+        self.mids: np.ndarray = (bids + asks) / 2
+        self.spreads: np.ndarray = asks - bids
+
+        # NaN for assets without a configured pip size
+        self.spread_pips: np.ndarray = self.spreads / pip_sizes
+
+    def __len__(self) -> int:
+        return len(self.asset_names)
+
+
+class QuoteTransformer:
+    def __init__(self, pip_sizes: Optional[Dict[str, float]] = None):
+        """
+        Batch transform of rates from the asset endpoint.
+
+        The endpoint returns rates in the same order every tick, so positions of tracked
+        assets are computed once per asset snapshot and feed layout and reused afterwards.
+        Mid prices and spreads are computed with NumPy for the whole tick at once.
+
+        :param pip_sizes: pip size by asset name. Spreads in pips are NaN for other assets.
+        """
+
+        self._pip_sizes_by_name: Dict[str, float] = pip_sizes or {}
+
+        # Layout is a snapshot and a tuple of symbols in the order of the feed
+        self._layout: Optional[Tuple[AssetSnapshot, Tuple[str, ...]]] = None
+
+        self._positions: List[int] = []
+        self._asset_ids: np.ndarray = np.empty(0, dtype=np.int64)
+        self._asset_names: List[str] = []
+        self._pip_sizes: np.ndarray = np.empty(0, dtype=np.float64)
+
+    def get_pip_sizes(self, asset_names: List[str]) -> np.ndarray:
+        """Return pip sizes of assets, NaN if a pip size is not configured."""
+
+        return np.array(
+            [self._pip_sizes_by_name.get(name, np.nan) for name in asset_names],
+            dtype=np.float64,
+        )
+
+    def _update_layout(self, symbols: Tuple[str, ...], assets: AssetSnapshot):
+        """Map positions of tracked assets in the feed to their ids."""
+
+        self._positions = [
+            position
+            for position, symbol in enumerate(symbols)
+            if symbol in assets.name_to_id
+        ]
+        self._asset_names = [symbols[position] for position in self._positions]
+        self._asset_ids = np.array(
+            [assets.name_to_id[name] for name in self._asset_names], dtype=np.int64
+        )
+        self._pip_sizes = self.get_pip_sizes(asset_names=self._asset_names)
+
+        self._layout = (assets, symbols)
+
+    def transform(self, rates: List[dict], assets: AssetSnapshot) -> QuoteBatch:
+        """
+        Filter out untracked assets and compute mid prices and spreads.
+
+        :param rates: rates from the asset endpoint.
+        :param assets: tracked assets.
+        """
+
+        symbols: Tuple[str, ...] = tuple(map(_get_symbol, rates))
+
+        if (
+            self._layout is None
+            or self._layout[0] is not assets
+            or self._layout[1] != symbols
+        ):
+            self._update_layout(symbols=symbols, assets=assets)
+
+        tracked_rates: List[dict] = [rates[position] for position in self._positions]
+        count: int = len(tracked_rates)
+
+        bids: np.ndarray = np.fromiter(
+            map(float, map(_get_bid, tracked_rates)), dtype=np.float64, count=count
+        )
+        asks: np.ndarray = np.fromiter(
+            map(float, map(_get_ask, tracked_rates)), dtype=np.float64, count=count
+        )
+
+        return QuoteBatch(
+            asset_ids=self._asset_ids,
+            asset_names=self._asset_names,
+            bids=bids,
+            asks=asks,
+            pip_sizes=self._pip_sizes,
+        )
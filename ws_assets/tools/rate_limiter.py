@@ -0,0 +1,36 @@
+import time
+
+
+class RateLimiter:
+    __slots__ = ("_rate", "_burst", "_tokens", "_updated_at")
+
+    def __init__(self, rate: float, burst: int):
+        """
+        Token bucket rate limiter.
+
+        :param rate: number of tokens added every second.
+        :param burst: maximum number of tokens.
+        """
+
+        self._rate: float = rate
+        self._burst: int = burst
+
+        self._tokens: float = burst
+        self._updated_at: float = time.monotonic()
+
+    def acquire(self, tokens: float = 1) -> bool:
+        """Take tokens from the bucket. Return False if there are not enough tokens."""
+
+        now: float = time.monotonic()
+
+        self._tokens = min(
+            self._burst, self._tokens + (now - self._updated_at) * self._rate
+        )
+        self._updated_at = now
+
+        if self._tokens < tokens:
+            return False
+
+        self._tokens -= tokens
+
+        return True
@@ -0,0 +1,52 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from loguru import logger
+
+
+class Readiness:
+    def __init__(self):
+        """
+        Readiness of the service and durations of its startup stages.
+
+        The service is ready once warm-up has finished, and stops being ready when it drains.
+        """
+
+        self.is_ready: bool = False
+
+        # Error which stopped warm-up
+        self.error: Optional[str] = None
+
+        # Duration of every startup stage in seconds, in order
+        self.stages: Dict[str, float] = {}
+
+        self._started_at: float = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Measure the duration of a startup stage."""
+
+        time_begin: float = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.stages[name] = time.perf_counter() - time_begin
+
+    def set_ready(self):
+        """Mark the service ready and log the startup profile."""
+
+        self.is_ready = True
+
+        logger.info(
+            f"Ready in {time.perf_counter() - self._started_at:.3f}s: "
+            + ", ".join(
+                f"{name} {duration:.3f}s" for name, duration in self.stages.items()
+            )
+        )
+
+    def set_failed(self, error: Exception):
+        """Remember the error which stopped warm-up."""
+
+        self.error = f"{type(error).__name__}: {error}"
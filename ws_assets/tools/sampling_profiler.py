@@ -0,0 +1,86 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import List, Optional
+
+from ws_assets.exceptions import ServiceOverloadedError
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = 0.005, max_depth: int = 64):
+        """
+        Statistical profiler of the event loop thread.
+
+        A worker thread periodically captures the stack of the event loop thread,
+        so profiling costs the loop almost nothing and can be done in production.
+
+        :param interval: time in seconds between samples.
+        :param max_depth: maximum number of frames in a sample.
+        """
+
+        self._interval: float = interval
+        self._max_depth: int = max_depth
+
+        self._is_running: bool = False
+
+    def _get_stack(self, thread_id: int) -> Optional[str]:
+        """Return the current stack of a thread from the outermost frame."""
+
+        frame = sys._current_frames().get(thread_id)
+
+        if frame is None:
+            return None
+
+        stack: List[str] = []
+
+        while frame is not None and len(stack) < self._max_depth:
+            code = frame.f_code
+            stack.append(
+                f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            )
+            frame = frame.f_back
+
+        return ";".join(reversed(stack))
+
+    def _sample(self, thread_id: int, duration: float) -> Counter:
+        """Capture stacks of a thread for `duration` seconds. Runs in a worker thread."""
+
+        samples: Counter = Counter()
+        deadline: float = time.monotonic() + duration
+
+        while time.monotonic() < deadline:
+            stack: Optional[str] = self._get_stack(thread_id)
+
+            if stack is not None:
+                samples[stack] += 1
+
+            time.sleep(self._interval)
+
+        return samples
+
+    async def profile(self, duration: float) -> str:
+        """
+        Profile the event loop for `duration` seconds.
+
+        Returns stacks in the collapsed format, one `frame;frame;frame count` per line,
+        which is accepted by flame graph tools.
+
+        :param duration: profiling time in seconds.
+        """
+
+        if self._is_running:
+            raise ServiceOverloadedError(resource="profiler")
+
+        self._is_running = True
+
+        try:
+            samples: Counter = await asyncio.get_running_loop().run_in_executor(
+                None, self._sample, threading.get_ident(), duration
+            )
+        finally:
+            self._is_running = False
+
+        return "\n".join(f"{stack} {count}" for stack, count in samples.most_common())
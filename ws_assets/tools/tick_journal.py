@@ -0,0 +1,251 @@
+import mmap
+import os
+import struct
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+# Header: magic, version, number of records
+_HEADER = struct.Struct("<4sHxxQ")
+_MAGIC: bytes = b"WSTJ"
+_VERSION: int = 1
+
+# Record: asset id, capture time in epoch milliseconds, bid, ask. 28 bytes, no padding
+RECORD_DTYPE = np.dtype(
+    [("asset_id", "<i4"), ("time", "<i8"), ("bid", "<f8"), ("ask", "<f8")]
+)
+
+# Capture time of a single record, read without mapping the whole journal
+_TIME = struct.Struct("<q")
+_TIME_OFFSET: int = RECORD_DTYPE.fields["time"][1]  # type: ignore
+
+# Journal grows by this many bytes at a time
+_GROWTH: int = 16 * 1024 * 1024
+
+# Records read at a time during replay, about 1.8 MB
+_CHUNK_SIZE: int = 64 * 1024
+
+
+class TickJournal:
+    def __init__(
+        self, path: str, growth: int = _GROWTH, max_size: int = 0, backups: int = 1
+    ):
+        """
+        Append-only memory-mapped journal of raw quotes.
+
+        The record count in the header is updated after records of a tick are written,
+        so a crash never exposes a half-written tick.
+
+        A journal which would grow past `max_size` is rotated before the next tick:
+        the file is renamed to `<path>.1`, older files are shifted to `<path>.2` and so on,
+        and a new journal is started. Ticks are never split between files.
+
+        :param path: path to the journal file. Created if it doesn't exist.
+        :param growth: size in bytes the file grows by when it is full.
+        :param max_size: maximum size of the journal file in bytes. Unlimited if 0.
+        :param backups: number of rotated files kept. Older ones are deleted.
+        """
+
+        self._path: str = path
+        self._growth: int = growth
+        self._max_size: int = max_size
+        self._backups: int = backups
+
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+        self.count: int = 0
+
+    def open(self):
+        """Map the journal file, creating it if necessary."""
+
+        is_new: bool = not os.path.exists(self._path) or not os.path.getsize(self._path)
+
+        self._file = open(self._path, "r+b" if not is_new else "w+b")
+
+        if is_new:
+            self._file.truncate(
+                max(min(_HEADER.size + self._growth, self._max_size), _HEADER.size)
+                if self._max_size
+                else _HEADER.size + self._growth
+            )
+
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+
+        if is_new:
+            _HEADER.pack_into(self._mmap, 0, _MAGIC, _VERSION, 0)
+
+        magic, version, self.count = _HEADER.unpack_from(self._mmap, 0)
+
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"Not a tick journal: {self._path}")
+
+    def close(self):
+        """Flush and unmap the journal."""
+
+        if self._mmap is not None:
+            self._mmap.flush()
+            self._mmap.close()
+            self._mmap = None
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        self.open()
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _reserve(self, size: int):
+        """Grow the file so `size` more bytes fit after the last record."""
+
+        end: int = _HEADER.size + self.count * RECORD_DTYPE.itemsize + size
+
+        if end <= len(self._mmap):  # type: ignore
+            return
+
+        size = end + self._growth
+
+        # File doesn't grow past the limit, unless a single tick doesn't fit in it
+        if self._max_size:
+            size = max(min(size, self._max_size), end)
+
+        self._mmap.close()  # type: ignore
+        self._file.truncate(size)  # type: ignore
+        self._mmap = mmap.mmap(self._file.fileno(), 0)  # type: ignore
+
+    def _rotate(self):
+        """Move the journal to `<path>.1`, shifting older files, and start a new one."""
+
+        self.close()
+
+        if self._backups:
+            for index in range(self._backups - 1, 0, -1):
+                if os.path.exists(f"{self._path}.{index}"):
+                    os.replace(f"{self._path}.{index}", f"{self._path}.{index + 1}")
+
+            os.replace(self._path, f"{self._path}.1")
+        else:
+            os.remove(self._path)
+
+        self.open()
+
+    def append(
+        self, asset_ids: np.ndarray, time: int, bids: np.ndarray, asks: np.ndarray
+    ):
+        """
+        Append quotes of a single tick.
+
+        :param asset_ids: asset ids.
+        :param time: capture time in epoch milliseconds.
+        :param bids: bid prices.
+        :param asks: ask prices.
+        """
+
+        records = np.empty(len(asset_ids), dtype=RECORD_DTYPE)
+        records["asset_id"] = asset_ids
+        records["time"] = time
+        records["bid"] = bids
+        records["ask"] = asks
+
+        data: bytes = records.tobytes()
+
+        if (
+            self._max_size
+            and self.count
+            and _HEADER.size + self.count * RECORD_DTYPE.itemsize + len(data)
+            > self._max_size
+        ):
+            self._rotate()
+
+        self._reserve(len(data))
+
+        offset: int = _HEADER.size + self.count * RECORD_DTYPE.itemsize
+        self._mmap[offset : offset + len(data)] = data  # type: ignore
+
+        # Records become visible only now
+        self.count += len(records)
+        _HEADER.pack_into(self._mmap, 0, _MAGIC, _VERSION, self.count)
+
+    def read(self, since: int = 0, until: Optional[int] = None) -> np.ndarray:
+        """
+        Return a copy of records with time in [since, until).
+
+        The whole journal is copied, use `read_ticks` to replay long journals.
+
+        :param since: start time in epoch milliseconds.
+        :param until: end time in epoch milliseconds. Unlimited if None.
+        """
+
+        records: np.ndarray = np.frombuffer(
+            self._mmap, dtype=RECORD_DTYPE, count=self.count, offset=_HEADER.size  # type: ignore
+        ).copy()
+
+        mask = records["time"] >= since
+        if until is not None:
+            mask &= records["time"] < until
+
+        return records[mask]
+
+    def read_ticks(
+        self, since: int = 0, until: Optional[int] = None, chunk_size: int = _CHUNK_SIZE
+    ) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Yield ticks with time in [since, until) like `iterate_ticks`.
+
+        Records are copied from the journal about `chunk_size` at a time,
+        so memory doesn't grow with the journal. Ticks are never split between chunks.
+
+        :param since: start time in epoch milliseconds.
+        :param until: end time in epoch milliseconds. Unlimited if None.
+        :param chunk_size: number of records copied at a time.
+        """
+
+        start: int = 0
+
+        while start < self.count:
+            end: int = min(start + chunk_size, self.count)
+
+            # Records of the last tick which continue past the chunk are added to it
+            last_time: int = self._get_time(end - 1)
+            while end < self.count and self._get_time(end) == last_time:
+                end += 1
+
+            # View of the mapping is released before ticks are yielded,
+            # so the journal can be closed or remapped meanwhile
+            records: np.ndarray = np.frombuffer(
+                self._mmap,  # type: ignore
+                dtype=RECORD_DTYPE,
+                count=end - start,
+                offset=_HEADER.size + start * RECORD_DTYPE.itemsize,
+            ).copy()
+            start = end
+
+            mask = records["time"] >= since
+            if until is not None:
+                mask &= records["time"] < until
+
+            yield from self.iterate_ticks(records[mask])
+
+    def _get_time(self, index: int) -> int:
+        """Return the capture time of a record."""
+
+        return _TIME.unpack_from(
+            self._mmap,  # type: ignore
+            _HEADER.size + index * RECORD_DTYPE.itemsize + _TIME_OFFSET,
+        )[0]
+
+    @staticmethod
+    def iterate_ticks(records: np.ndarray) -> Iterator[Tuple[int, np.ndarray]]:
+        """Split records into ticks, consecutive records with the same time."""
+
+        if not len(records):
+            return
+
+        boundaries: np.ndarray = np.flatnonzero(np.diff(records["time"])) + 1
+
+        for tick in np.split(records, boundaries):
+            yield int(tick["time"][0]), tick
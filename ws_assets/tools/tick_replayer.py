@@ -0,0 +1,133 @@
+import asyncio
+from datetime import timedelta
+from typing import List, Optional
+
+import numpy as np
+from loguru import logger
+
+from ws_assets.tools.asset_processor import AssetProcessor
+from ws_assets.tools.asset_registry import AssetSnapshot
+from ws_assets.tools.clock import EPOCH
+from ws_assets.tools.quote_transformer import QuoteBatch
+from ws_assets.tools.tick_journal import TickJournal
+
+
+class TickReplayer:
+    def __init__(
+        self, journal: TickJournal, asset_processor: AssetProcessor, speed: float = 1
+    ):
+        """
+        Feeds ticks from a journal back through `AssetProcessor`.
+
+        Ticks keep their original capture time and are spaced like they were received,
+        sped up `speed` times.
+
+        :param journal: opened tick journal.
+        :param asset_processor: processor which writes and broadcasts ticks.
+        :param speed: replay speed relative to real time. No delays if 0.
+        """
+
+        self._journal: TickJournal = journal
+        self._asset_processor: AssetProcessor = asset_processor
+        self._speed: float = speed
+
+    def _to_quotes(self, records: np.ndarray, assets: AssetSnapshot) -> QuoteBatch:
+        """Build quotes of tracked assets from journal records of a tick."""
+
+        records = records[np.isin(records["asset_id"], list(assets.id_to_name))]
+        asset_names: List[str] = [
+            assets.id_to_name[asset_id] for asset_id in records["asset_id"].tolist()
+        ]
+
+        return QuoteBatch(
+            asset_ids=records["asset_id"].astype(np.int64),
+            asset_names=asset_names,
+            bids=records["bid"],
+            asks=records["ask"],
+            pip_sizes=self._asset_processor.quote_transformer.get_pip_sizes(
+                asset_names=asset_names
+            ),
+        )
+
+    async def replay(
+        self, since: int = 0, until: Optional[int] = None, broadcast: bool = True
+    ) -> int:
+        """
+        Replay ticks with capture time in [since, until) and return their number.
+
+        :param since: start time in epoch milliseconds.
+        :param until: end time in epoch milliseconds. Unlimited if None.
+        :param broadcast: send points to clients. Disabled for backfills.
+        """
+
+        assets: AssetSnapshot = self._asset_processor.asset_registry.snapshot
+        loop = asyncio.get_running_loop()
+
+        replay_start: float = loop.time()
+        first_time: Optional[int] = None
+        ticks: int = 0
+
+        for time, records in self._journal.read_ticks(since=since, until=until):
+            if first_time is None:
+                first_time = time
+
+            # Delays are anchored to the replay start, so they don't accumulate
+            if self._speed:
+                delay: float = (
+                    replay_start
+                    + (time - first_time) / 1000 / self._speed
+                    - loop.time()
+                )
+
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            await self._asset_processor.process_quotes(
+                quotes=self._to_quotes(records=records, assets=assets),
+                captured_at=EPOCH + timedelta(milliseconds=time),
+                broadcast=broadcast,
+            )
+            ticks += 1
+
+        logger.info(f"Replayed {ticks} ticks")
+
+        return ticks
+
+    async def backfill(
+        self, since: int = 0, until: Optional[int] = None, batch_size: int = 100000
+    ) -> int:
+        """
+        Write ticks with capture time in [since, until) as fast as possible and return their number.
+
+        Points of many ticks are written in a single batch and nothing is broadcast.
+        Points which are already stored are replaced, so a backfill can be repeated.
+
+        :param since: start time in epoch milliseconds.
+        :param until: end time in epoch milliseconds. Unlimited if None.
+        :param batch_size: number of points written at once.
+        """
+
+        assets: AssetSnapshot = self._asset_processor.asset_registry.snapshot
+
+        values: List[dict] = []
+        ticks: int = 0
+
+        for time, records in self._journal.read_ticks(since=since, until=until):
+            values.extend(
+                self._asset_processor.transform_data_to_database_format(
+                    quotes=self._to_quotes(records=records, assets=assets),
+                    captured_at=EPOCH + timedelta(milliseconds=time),
+                )
+            )
+            ticks += 1
+
+            if len(values) >= batch_size:
+                await self._asset_processor.store_points(values=values)
+                values = []
+
+        if values:
+            await self._asset_processor.store_points(values=values)
+
+        logger.info(f"Backfilled {ticks} ticks")
+
+        return ticks
@@ -0,0 +1,46 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+
+class StageStatistics:
+    __slots__ = ("count", "total", "max", "last")
+
+    def __init__(self):
+        """Durations of a single tick stage in seconds."""
+
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+        self.last: float = 0.0
+
+    def add(self, duration: float):
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        self.last = duration
+
+
+class TickSpans:
+    def __init__(self):
+        """
+        Timing of tick stages: fetch, parse, transform, journal, insert, broadcast and indicators.
+
+        Stages which await include time other tasks spent on the event loop meanwhile.
+        """
+
+        self.stages: Dict[str, StageStatistics] = {}
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """Measure a stage. Failed stages are not accounted."""
+
+        time_begin: float = time.perf_counter()
+
+        yield
+
+        statistics = self.stages.get(stage)
+        if statistics is None:
+            statistics = self.stages[stage] = StageStatistics()
+
+        statistics.add(time.perf_counter() - time_begin)
@@ -0,0 +1,120 @@
+import asyncio
+import math
+from typing import Callable, Dict, Generic, Hashable, List, Optional, TypeVar
+
+T = TypeVar("T", bound=Hashable)
+
+
+class TimerWheel(Generic[T]):
+    def __init__(
+        self,
+        callback: Callable[[List[T]], None],
+        resolution: float = 0.1,
+        slots: int = 600,
+    ):
+        """
+        Hashed timing wheel which fires any number of timers from a single task.
+
+        Scheduling and cancelling are O(1), and the task only runs while timers are pending.
+        Timers fire no earlier than their delay and at most `resolution` seconds later.
+
+        :param callback: called once per tick with all expired items.
+        :param resolution: duration of a tick in seconds.
+        :param slots: number of ticks in a full turn of the wheel. Longer delays take several turns.
+        """
+
+        self._callback: Callable[[List[T]], None] = callback
+        self._resolution: float = resolution
+
+        # Remaining turns of every item in its slot
+        self._slots: List[Dict[T, int]] = [{} for _ in range(slots)]
+        self._positions: Dict[T, int] = {}
+        self._current: int = 0
+
+        self._task: Optional[asyncio.Task] = None
+        self._next_tick: float = 0.0
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, item: T) -> bool:
+        return item in self._positions
+
+    def schedule(self, item: T, delay: float):
+        """Fire `item` after `delay` seconds. Rescheduled if it is already pending."""
+
+        self.cancel(item)
+
+        loop = asyncio.get_running_loop()
+
+        if self._task is None:
+            self._next_tick = loop.time() + self._resolution
+            self._task = asyncio.create_task(self._run())
+
+        # Number of ticks, counting the next one, after which the delay has passed
+        ticks: int = max(
+            math.ceil((delay - (self._next_tick - loop.time())) / self._resolution),
+            0,
+        )
+        ticks += 1
+
+        slot: int = (self._current + ticks) % len(self._slots)
+        self._slots[slot][item] = (ticks - 1) // len(self._slots)
+        self._positions[item] = slot
+
+    def cancel(self, item: T):
+        """Remove a pending item. Does nothing if it is not pending."""
+
+        slot: Optional[int] = self._positions.pop(item, None)
+
+        if slot is not None:
+            del self._slots[slot][item]
+
+    def clear(self):
+        """Remove all pending items and stop the task."""
+
+        for slot in self._slots:
+            slot.clear()
+
+        self._positions.clear()
+
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _advance(self) -> List[T]:
+        """Move to the next slot and return expired items."""
+
+        self._current = (self._current + 1) % len(self._slots)
+        slot: Dict[T, int] = self._slots[self._current]
+
+        expired: List[T] = []
+
+        for item, turns in list(slot.items()):
+            if turns:
+                slot[item] = turns - 1
+            else:
+                expired.append(item)
+                del slot[item]
+                del self._positions[item]
+
+        return expired
+
+    async def _run(self):
+        """Tick while items are pending. Ticks missed while the loop was blocked are caught up."""
+
+        loop = asyncio.get_running_loop()
+
+        while self._positions:
+            await asyncio.sleep(max(self._next_tick - loop.time(), 0))
+
+            expired: List[T] = []
+
+            while self._next_tick <= loop.time():
+                expired.extend(self._advance())
+                self._next_tick += self._resolution
+
+            if expired:
+                self._callback(expired)
+
+        self._task = None
@@ -1,26 +1,88 @@
 import asyncio
-from typing import Dict, List
+import random
+import time
+from typing import Dict, List, Optional, Tuple
 from uuid import UUID
 
-from starlette.websockets import WebSocket
+import orjson
+from pydantic import ValidationError
+from starlette.status import WS_1012_SERVICE_RESTART
+from starlette.websockets import WebSocket, WebSocketDisconnect
 
-from ws_assets.models.asset import Asset, AssetPoint
-from ws_assets.models.client import WebsocketClient
+from ws_assets.exceptions import (
+    NotSubscribedError,
+    ServiceOverloadedError,
+    UnknownAssetIDError,
+)
+from ws_assets.models.asset import AssetPointRecord
+from ws_assets.models.client import ThrottledSubscription, WebsocketClient
+from ws_assets.models.indicator import IndicatorRecord
+from ws_assets.models.request import ConnectionParameters
 from ws_assets.models.response import (
-    ResponseAssets,
-    ResponseAssetsMessage,
     ResponseError,
     ResponseErrorMessage,
-    ResponseSubscribeHistory,
-    ResponseSubscribeHistoryMessage,
-    ResponseSubscribePoint,
+    ResponseReconnect,
+    ResponseReconnectMessage,
 )
+from ws_assets.tools.asset_registry import AssetSnapshot
+from ws_assets.tools.frames import SharedFrame
+from ws_assets.tools.history_codec import DEFAULT_SCALE, encode_history_frame
+from ws_assets.tools.offload import Offloader
+from ws_assets.tools.timer_wheel import TimerWheel
+
+# Approximate size of an encoded point in bytes
+_POINT_SIZE: int = 80
 
 
 class WebsocketManager:
-    def __init__(self):
+    def __init__(
+        self,
+        batch_window: float = 0,
+        max_subscriptions: int = 1,
+        offloader: Optional[Offloader] = None,
+        throttle_resolution: float = 0.1,
+        history_scale: int = DEFAULT_SCALE,
+    ):
+        """
+        Storage of websocket clients and their subscriptions.
+
+        :param batch_window: time in seconds to accumulate points before a broadcast.
+        :param max_subscriptions: maximum number of subscriptions of a single client.
+        :param offloader: worker pool which encodes large frames. Encoded inline if None.
+        :param throttle_resolution: tick of the timer wheel of throttled subscriptions in seconds.
+        :param history_scale: number of decimal digits kept in `delta` and `binary` history frames.
+        """
+
+        self._batch_window: float = batch_window
+        self._max_subscriptions: int = max_subscriptions
+        self._offloader: Optional[Offloader] = offloader
+        self._history_scale: int = history_scale
+
+        # Points waiting for the end of the batching window
+        self._pending_asset_points: List[AssetPointRecord] = []
+        self._flush_task: Optional[asyncio.Task] = None
+
         self._clients_by_client_id: Dict[UUID, WebsocketClient] = {}
         self._clients_by_asset_id: Dict[int, List[WebsocketClient]] = {}
+        self._clients_by_indicator: Dict[Tuple[int, int], List[WebsocketClient]] = {}
+
+        # Throttled subscriptions waiting for their next update share a single timer
+        self._throttle_wheel: TimerWheel[ThrottledSubscription] = TimerWheel(
+            callback=self._send_throttled, resolution=throttle_resolution
+        )
+
+        # Set to False during shutdown
+        self.is_accepting: bool = True
+
+        # Exponential moving average of broadcast duration in seconds
+        self.broadcast_latency: float = 0.0
+
+        # `status` frame sent to new clients while quotes are stale
+        self._stale_status: Optional[SharedFrame] = None
+
+    @property
+    def client_count(self) -> int:
+        return len(self._clients_by_client_id)
 
     async def add_client(self, websocket: WebSocket) -> UUID:
         """Add a client and return client_id."""
@@ -31,76 +93,591 @@ class WebsocketManager:
         # Accept websocket connection
         await client.websocket.accept()
 
+        try:
+            parameters = ConnectionParameters(**websocket.query_params)
+        except ValidationError as e:
+            await self.send_error(
+                client_id=client.client_id,
+                error_type=type(e).__name__,
+                error_text=str(e),
+            )
+            parameters = ConnectionParameters()
+
+        client.batch = parameters.batch
+        client.history_encoding = parameters.history
+
+        if self._stale_status is not None:
+            await self._send_frame(client, self._stale_status)
+
         return client.client_id
 
+    def _get_client(self, client_id: UUID) -> WebsocketClient:
+        """
+        Return a connected client.
+
+        Clients are removed during draining while their requests are still handled,
+        so a missing client is reported as a disconnect and its endpoint stops.
+        """
+
+        client: Optional[WebsocketClient] = self._clients_by_client_id.get(client_id)
+
+        if client is None:
+            raise WebSocketDisconnect(code=WS_1012_SERVICE_RESTART)
+
+        return client
+
     def remove_client(self, client_id: UUID):
         """Remove a client."""
 
-        client: WebsocketClient = self._clients_by_client_id.pop(client_id)
+        client: Optional[WebsocketClient] = self._clients_by_client_id.pop(
+            client_id, None
+        )
 
-        if client.is_subscribed and client.asset_id:
-            self._clients_by_asset_id[client.asset_id].remove(client)
+        # Client could be already removed during draining
+        if client is None:
+            return
 
-    def add_subscription(self, client_id: UUID, asset_id: int):
-        """Add a subscription for asset points."""
+        for asset_id in client.asset_ids:
+            self._clients_by_asset_id[asset_id].remove(client)
 
-        client = self._clients_by_client_id[client_id]
+        for subscription in client.throttles.values():
+            self._throttle_wheel.cancel(subscription)
 
-        # If this client is already subscribed, unsubscribe
-        if client.is_subscribed and client.asset_id:
-            self._clients_by_asset_id[client.asset_id].remove(client)
+        for key in client.indicator_keys:
+            self._clients_by_indicator[key].remove(client)
 
-        client.is_subscribed = True
-        client.asset_id = asset_id
+    def add_subscription(
+        self, client_id: UUID, asset_id: int, max_rate: Optional[float] = None
+    ):
+        """
+        Add a subscription for asset points.
+
+        Subscribing again only changes the maximum rate.
+
+        :param max_rate: maximum number of updates per second. Every tick is sent if None.
+        """
+
+        self.check_subscription_limit(client_id=client_id, asset_id=asset_id)
+
+        client = self._get_client(client_id)
+
+        self._set_throttle(client=client, asset_id=asset_id, max_rate=max_rate)
+
+        if asset_id in client.asset_ids:
+            return
+
+        client.asset_ids.append(asset_id)
 
         if asset_id in self._clients_by_asset_id:
             self._clients_by_asset_id[asset_id].append(client)
         else:
             self._clients_by_asset_id[asset_id] = [client]
 
-    async def send_error(self, client_id: UUID, error_type: str, error_text: str):
-        """Return an error to a client."""
+    def check_subscription_limit(self, client_id: UUID, asset_id: int):
+        """Raise an error if a new subscription would exceed the limit of the client."""
+
+        client = self._get_client(client_id)
+
+        if (
+            asset_id not in client.asset_ids
+            and len(client.asset_ids) >= self._max_subscriptions
+        ):
+            raise ServiceOverloadedError(resource="subscriptions per client")
+
+    def remove_subscription(self, client_id: UUID, asset_id: int):
+        """Remove a subscription for asset points."""
+
+        client = self._get_client(client_id)
+
+        if asset_id not in client.asset_ids:
+            raise NotSubscribedError(asset_id=asset_id)
+
+        client.asset_ids.remove(asset_id)
+        self._clients_by_asset_id[asset_id].remove(client)
+        self._set_throttle(client=client, asset_id=asset_id, max_rate=None)
+
+    def _set_throttle(
+        self, client: WebsocketClient, asset_id: int, max_rate: Optional[float]
+    ):
+        """Set or remove the maximum update rate of a subscription."""
+
+        subscription: Optional[ThrottledSubscription] = client.throttles.pop(
+            asset_id, None
+        )
+
+        if subscription is not None:
+            self._throttle_wheel.cancel(subscription)
+
+        if max_rate is not None:
+            client.throttles[asset_id] = ThrottledSubscription(
+                client=client, asset_id=asset_id, interval=1 / max_rate
+            )
 
-        await self._clients_by_client_id[client_id].websocket.send_json(
+    def add_indicator_subscription(self, client_id: UUID, asset_id: int, window: int):
+        """Add a subscription for indicators of an asset."""
+
+        client = self._get_client(client_id)
+        key: Tuple[int, int] = (asset_id, window)
+
+        if key in client.indicator_keys:
+            return
+
+        if len(client.indicator_keys) >= self._max_subscriptions:
+            raise ServiceOverloadedError(resource="indicator subscriptions per client")
+
+        client.indicator_keys.append(key)
+        self._clients_by_indicator.setdefault(key, []).append(client)
+
+    def remove_indicator_subscription(
+        self, client_id: UUID, asset_id: int, window: int
+    ):
+        """Remove a subscription for indicators of an asset."""
+
+        client = self._get_client(client_id)
+        key: Tuple[int, int] = (asset_id, window)
+
+        if key not in client.indicator_keys:
+            raise NotSubscribedError(asset_id=asset_id, window=window)
+
+        client.indicator_keys.remove(key)
+        self._clients_by_indicator[key].remove(client)
+
+    def retain_assets(self, assets: AssetSnapshot):
+        """Drop subscriptions to assets which are not tracked anymore."""
+
+        # Each client is notified once per asset
+        clients_by_asset_id: Dict[int, Dict[UUID, WebsocketClient]] = {}
+
+        for asset_id in list(self._clients_by_asset_id):
+            if asset_id in assets.id_to_name:
+                continue
+
+            for client in self._clients_by_asset_id.pop(asset_id):
+                client.asset_ids.remove(asset_id)
+                self._set_throttle(client=client, asset_id=asset_id, max_rate=None)
+                clients_by_asset_id.setdefault(asset_id, {})[client.client_id] = client
+
+        for key in list(self._clients_by_indicator):
+            if key[0] in assets.id_to_name:
+                continue
+
+            for client in self._clients_by_indicator.pop(key):
+                client.indicator_keys.remove(key)
+                clients_by_asset_id.setdefault(key[0], {})[client.client_id] = client
+
+        for asset_id, clients in clients_by_asset_id.items():
+            asyncio.create_task(
+                self._notify_unsubscribed(list(clients.values()), asset_id)
+            )
+
+    async def _notify_unsubscribed(self, clients: List[WebsocketClient], asset_id: int):
+        """Tell clients that their asset is not tracked anymore."""
+
+        error = UnknownAssetIDError(asset_id=asset_id)
+        frame: SharedFrame = self._encode(
             ResponseError(
                 message=ResponseErrorMessage(
-                    error_type=error_type, error_text=error_text
+                    error_type=type(error).__name__, error_text=str(error)
                 )
             ).dict()
         )
 
-    async def send_assets(self, client_id: UUID, assets: List[Asset]):
-        """Send a list of assets to the client."""
+        await asyncio.gather(
+            *(self._send_frame(client, frame) for client in clients),
+            return_exceptions=True,
+        )
+
+    def _encode(self, payload: dict) -> SharedFrame:
+        """Encode a payload once so it can be sent to any number of clients."""
+
+        return SharedFrame(orjson.dumps(payload))
+
+    async def _encode_history(
+        self,
+        client: WebsocketClient,
+        asset_id: int,
+        asset_name: str,
+        asset_history: List[AssetPointRecord],
+    ) -> SharedFrame:
+        """Encode a possibly long history for a client in the worker pool."""
 
-        await self._clients_by_client_id[client_id].websocket.send_json(
-            ResponseAssets(message=ResponseAssetsMessage(assets=assets)).dict()
+        if self._offloader is None:
+            return encode_history_frame(
+                asset_id,
+                asset_name,
+                asset_history,
+                client.history_encoding,
+                self._history_scale,
+            )
+
+        return await self._offloader.run(
+            encode_history_frame,
+            asset_id,
+            asset_name,
+            asset_history,
+            client.history_encoding,
+            self._history_scale,
+            size=len(asset_history) * _POINT_SIZE,
+        )
+
+    async def _send_frame(self, client: WebsocketClient, frame: SharedFrame):
+        """Send an encoded frame as a binary or a text frame."""
+
+        if frame.is_binary:
+            await client.websocket.send_bytes(frame.payload)
+        else:
+            await client.websocket.send_text(frame.text)
+
+    async def send_error(self, client_id: UUID, error_type: str, error_text: str):
+        """Return an error to a client. Errors of disconnected clients are dropped."""
+
+        client: Optional[WebsocketClient] = self._clients_by_client_id.get(client_id)
+
+        if client is None:
+            return
+
+        await self._send_frame(
+            client,
+            self._encode(
+                ResponseError(
+                    message=ResponseErrorMessage(
+                        error_type=error_type, error_text=error_text
+                    )
+                ).dict()
+            ),
         )
 
+    async def send_assets(self, client_id: UUID, assets: SharedFrame):
+        """Send a pre-encoded list of assets to the client."""
+
+        await self._send_frame(self._get_client(client_id), assets)
+
+    async def send_quotes(self, client_id: UUID, quotes: SharedFrame):
+        """Send a pre-encoded `quote` frame to the client."""
+
+        await self._send_frame(self._get_client(client_id), quotes)
+
     async def send_asset_history(
-        self, client_id: UUID, asset_history: List[AssetPoint]
+        self,
+        client_id: UUID,
+        asset_history: List[AssetPointRecord],
+        asset_id: int,
+        asset_name: str,
     ):
-        """Send asset history to a client."""
+        """
+        Send asset history to a client in the encoding it asked for.
 
-        await self._clients_by_client_id[client_id].websocket.send_json(
-            ResponseSubscribeHistory(
-                message=ResponseSubscribeHistoryMessage(points=asset_history)
-            ).dict()
+        Frame follows `ResponseSubscribeHistory`, `ResponseHistoryDelta`
+        or the binary format of `encode_history_binary`.
+        Long histories are encoded in the worker pool, so they don't delay broadcasts.
+        """
+
+        client: WebsocketClient = self._get_client(client_id)
+
+        frame: SharedFrame = await self._encode_history(
+            client, asset_id, asset_name, asset_history
         )
 
-    async def broadcast_asset_points(self, asset_points: List[AssetPoint]):
-        """Broadcast asset points to all subscribed clients."""
+        await self._send_frame(client, frame)
+
+    async def send_indicator(self, client_id: UUID, indicator: IndicatorRecord):
+        """Send indicator values to a client. Frame follows `ResponseIndicator`."""
+
+        await self._send_frame(
+            self._get_client(client_id),
+            self._encode({"action": "indicator", "message": indicator}),
+        )
+
+    async def broadcast_indicators(self, indicators: List[IndicatorRecord]):
+        """Send indicator values to subscribers. Every frame is encoded once."""
 
         broadcasts: list = []
 
+        for indicator in indicators:
+            clients: Optional[List[WebsocketClient]] = self._clients_by_indicator.get(
+                (indicator.assetId, indicator.window)
+            )
+
+            if clients:
+                frame: SharedFrame = self._encode(
+                    {"action": "indicator", "message": indicator}
+                )
+                broadcasts.extend(self._send_frame(client, frame) for client in clients)
+
+        await asyncio.gather(*broadcasts)
+
+    async def broadcast_status(self, stale: bool, last_update: Optional[int]):
+        """
+        Tell all clients whether quotes are stale. Frame follows `ResponseStatus`.
+
+        While quotes are stale, new clients receive the frame on connect.
+
+        :param stale: quotes are not updated.
+        :param last_update: time of the last received tick in epoch milliseconds.
+        """
+
+        frame: SharedFrame = self._encode(
+            {"action": "status", "message": {"stale": stale, "lastUpdate": last_update}}
+        )
+        self._stale_status = frame if stale else None
+
+        await asyncio.gather(
+            *(
+                self._send_frame(client, frame)
+                for client in list(self._clients_by_client_id.values())
+            ),
+            return_exceptions=True,
+        )
+
+    async def broadcast_asset_points(self, asset_points: List[AssetPointRecord]):
+        """
+        Broadcast asset points to all subscribed clients.
+
+        If the batching window is set, points are accumulated and sent later
+        by a single flush, so fast sources produce one frame per client per window.
+        """
+
+        if self._batch_window <= 0:
+            await self._broadcast(asset_points)
+
+            return
+
+        self._pending_asset_points.extend(asset_points)
+
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_after_window())
+
+    async def flush(self):
+        """Broadcast points waiting for the end of the batching window right away."""
+
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+
+        asset_points: List[AssetPointRecord] = self._pending_asset_points
+        self._pending_asset_points = []
+
+        if asset_points:
+            await self._broadcast(asset_points)
+
+    async def drain(self, reconnect_delay: float, reconnect_jitter: float):
+        """
+        Disconnect all clients before shutdown.
+
+        Every client receives a `reconnect` frame with its own delay,
+        so clients don't reconnect to other pods all at once.
+
+        :param reconnect_delay: minimal time in seconds before reconnect.
+        :param reconnect_jitter: maximum random time in seconds added to the delay.
+        """
+
+        self.is_accepting = False
+
+        await self.flush()
+
+        clients: List[WebsocketClient] = list(self._clients_by_client_id.values())
+
+        await asyncio.gather(
+            *(
+                self._disconnect_client(
+                    client,
+                    delay=reconnect_delay + random.uniform(0, reconnect_jitter),
+                )
+                for client in clients
+            ),
+            return_exceptions=True,
+        )
+
+        self._clients_by_client_id.clear()
+        self._clients_by_asset_id.clear()
+        self._clients_by_indicator.clear()
+        self._throttle_wheel.clear()
+
+    async def _disconnect_client(self, client: WebsocketClient, delay: float):
+        """Send a reconnect hint and close the connection."""
+
+        await self._send_frame(
+            client,
+            self._encode(
+                ResponseReconnect(message=ResponseReconnectMessage(delay=delay)).dict()
+            ),
+        )
+        await client.websocket.close(code=WS_1012_SERVICE_RESTART)
+
+    async def _flush_after_window(self):
+        """Broadcast accumulated points after the batching window."""
+
+        await asyncio.sleep(self._batch_window)
+
+        asset_points: List[AssetPointRecord] = self._pending_asset_points
+        self._pending_asset_points = []
+        self._flush_task = None
+
+        await self._broadcast(asset_points)
+
+    async def _broadcast(self, asset_points: List[AssetPointRecord]):
+        """
+        Send asset points to subscribers as `point` or batched `points` frames.
+
+        Frames follow `ResponseSubscribePoint` and `ResponseSubscribePoints`.
+        Throttled subscriptions only keep the latest point until their next update.
+        """
+
+        time_begin: float = time.perf_counter()
+        now: float = asyncio.get_running_loop().time()
+
+        asset_points_by_asset_id: Dict[int, List[AssetPointRecord]] = {}
+
         for asset_point in asset_points:
             if asset_point.assetId in self._clients_by_asset_id:
-                for client in self._clients_by_asset_id[asset_point.assetId]:
-                    broadcasts.append(
-                        client.websocket.send_json(
-                            ResponseSubscribePoint(message=asset_point).dict()
-                        )
+                asset_points_by_asset_id.setdefault(asset_point.assetId, []).append(
+                    asset_point
+                )
+
+        broadcasts: list = []
+        batch_clients: Dict[UUID, WebsocketClient] = {}
+        throttled: List[ThrottledSubscription] = []
+
+        for asset_id, asset_id_points in asset_points_by_asset_id.items():
+            clients: List[WebsocketClient] = []
+
+            for client in self._clients_by_asset_id[asset_id]:
+                subscription: Optional[ThrottledSubscription] = client.throttles.get(
+                    asset_id
+                )
+
+                if subscription is not None:
+                    if self._conflate(subscription, asset_id_points[-1], now):
+                        throttled.append(subscription)
+                elif client.batch:
+                    batch_clients[client.client_id] = client
+                else:
+                    clients.append(client)
+
+            # Every frame is encoded once for all subscribers
+            if clients:
+                for asset_point in asset_id_points:
+                    frame: SharedFrame = self._encode(
+                        {"action": "point", "message": asset_point}
+                    )
+
+                    broadcasts.extend(
+                        self._send_frame(client, frame) for client in clients
                     )
 
+        if throttled:
+            broadcasts.extend(self._throttled_sends(throttled, now))
+
+        # Clients with the same subscriptions share a batched frame
+        batch_frames: Dict[Tuple[int, ...], SharedFrame] = {}
+
+        for client in batch_clients.values():
+            key: Tuple[int, ...] = tuple(
+                asset_id
+                for asset_id in client.asset_ids
+                if asset_id in asset_points_by_asset_id
+                and asset_id not in client.throttles
+            )
+
+            if key not in batch_frames:
+                batch_frames[key] = self._encode(
+                    {
+                        "action": "points",
+                        "message": {
+                            "points": [
+                                asset_point
+                                for asset_id in key
+                                for asset_point in asset_points_by_asset_id[asset_id]
+                            ]
+                        },
+                    }
+                )
+
+            broadcasts.append(self._send_frame(client, batch_frames[key]))
+
         # Blocking is not a problem, since each `broadcast_asset_points`
         # is started in a new task.
         await asyncio.gather(*broadcasts)
+
+        self.broadcast_latency = 0.8 * self.broadcast_latency + 0.2 * (
+            time.perf_counter() - time_begin
+        )
+
+    def _conflate(
+        self,
+        subscription: ThrottledSubscription,
+        asset_point: AssetPointRecord,
+        now: float,
+    ) -> bool:
+        """
+        Keep the latest point of a throttled subscription.
+
+        Returns True if the point can be sent right away, otherwise the update
+        is scheduled on the timer wheel, unless it is already pending.
+        """
+
+        subscription.asset_point = asset_point
+
+        if subscription in self._throttle_wheel:
+            return False
+
+        if subscription.next_send <= now:
+            return True
+
+        self._throttle_wheel.schedule(subscription, subscription.next_send - now)
+
+        return False
+
+    def _throttled_sends(
+        self, subscriptions: List[ThrottledSubscription], now: float
+    ) -> list:
+        """
+        Return sends of the latest points of throttled subscriptions.
+
+        Frames are `point` frames, or `points` frames for batching clients,
+        and are encoded once per point.
+        """
+
+        # Points are kept with their frames, so their ids aren't reused meanwhile
+        frames: Dict[Tuple[int, bool], Tuple[AssetPointRecord, SharedFrame]] = {}
+        sends: list = []
+
+        for subscription in subscriptions:
+            asset_point: Optional[AssetPointRecord] = subscription.asset_point
+
+            if asset_point is None:
+                continue
+
+            batch: bool = subscription.client.batch
+            key: Tuple[int, bool] = (id(asset_point), batch)
+
+            if key not in frames:
+                frames[key] = (
+                    asset_point,
+                    self._encode(
+                        {"action": "points", "message": {"points": [asset_point]}}
+                        if batch
+                        else {"action": "point", "message": asset_point}
+                    ),
+                )
+
+            subscription.asset_point = None
+            subscription.next_send = now + subscription.interval
+
+            sends.append(self._send_frame(subscription.client, frames[key][1]))
+
+        return sends
+
+    def _send_throttled(self, subscriptions: List[ThrottledSubscription]):
+        """Send updates of throttled subscriptions which are due. Called by the timer wheel."""
+
+        sends: list = self._throttled_sends(
+            subscriptions, asyncio.get_running_loop().time()
+        )
+
+        if sends:
+            asyncio.create_task(self._gather_sends(sends))
+
+    async def _gather_sends(self, sends: list):
+        # Clients could disconnect meanwhile
+        await asyncio.gather(*sends, return_exceptions=True)